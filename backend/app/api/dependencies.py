@@ -1,6 +1,7 @@
 from fastapi import Request, HTTPException, status, Depends
 from sqlalchemy.orm import Session
-from app.db.database import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.db.database import get_db, get_async_db
 from app.models.users import Users
 from typing import Optional
 
@@ -23,6 +24,18 @@ async def get_current_user(request: Request, db: Session = Depends(get_db)) -> U
     
     return user
 
+async def get_session_user_id(request: Request) -> int:
+    """로그인 세션의 user_id만 확인 (DB 연결을 잡지 않아야 하는 장시간 스트림용)"""
+    user_id = request.session.get("user_id")
+    
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="로그인이 필요합니다."
+        )
+    
+    return user_id
+
 async def get_current_user_optional(request: Request, db: Session = Depends(get_db)) -> Optional[Users]:
     """선택적 사용자 인증 (로그인하지 않아도 접근 가능한 API용)"""
     user_id = request.session.get("user_id")
@@ -32,3 +45,31 @@ async def get_current_user_optional(request: Request, db: Session = Depends(get_
     
     user = db.query(Users).filter(Users.user_id == user_id).first()
     return user
+
+async def get_current_user_async(request: Request, db: AsyncSession = Depends(get_async_db)) -> Users:
+    """현재 로그인한 사용자 정보 반환 (비동기 세션 사용 라우트용)"""
+    user_id = request.session.get("user_id")
+    
+    if not user_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="로그인이 필요합니다."
+        )
+    
+    user = await db.get(Users, user_id)
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="사용자 정보를 찾을 수 없습니다."
+        )
+    
+    return user
+
+async def get_current_user_optional_async(request: Request, db: AsyncSession = Depends(get_async_db)) -> Optional[Users]:
+    """선택적 사용자 인증 (비동기 세션 사용 라우트용)"""
+    user_id = request.session.get("user_id")
+    
+    if not user_id:
+        return None
+    
+    return await db.get(Users, user_id)
@@ -4,6 +4,7 @@ from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 from typing import Optional
 import os
+import time
 import uuid
 import logging
 from pathlib import Path
@@ -13,11 +14,20 @@ from app.api.dependencies import get_current_user
 from app.models.users import Users
 from app.models.virtual_fittings import VirtualFittings
 from app.models.background_customs import BackgroundCustoms
-from app.utils.background_removal_service import background_removal_service
+from app.core.task_queue import task_queue
+from app.utils.cutout_cache import cutout_cache
+from app.utils.background_custom_service import background_custom_service
+from app.utils.image_worker_pool import (
+    image_worker_pool,
+    compose_background,
+    ImageWorkerBusy,
+    ImageJobError,
+)
 from app.schemas.background_custom import (
     BackgroundCustomRequest,
     BackgroundCustomResponse,
     BackgroundCustomPreviewResponse,
+    BackgroundCustomJobStatusResponse,
     BackgroundCustomListResponse,
 )
 
@@ -25,6 +35,78 @@ router = APIRouter(prefix="/api/background-custom", tags=["background-custom"])
 
 logger = logging.getLogger(__name__)
 
+# 미리보기 기본 배경 제거 모델 (최종 적용은 항상 기본 모델 REMBG_MODEL)
+PREVIEW_MODEL = os.getenv("REMBG_PREVIEW_MODEL") or None
+# 미리보기 인코딩 형식 (WEBP, JPEG, PNG)과 품질, 최종 적용 결과는 항상 PNG
+PREVIEW_FORMAT = os.getenv("BACKGROUND_PREVIEW_FORMAT", "WEBP").upper()
+PREVIEW_QUALITY = int(os.getenv("BACKGROUND_PREVIEW_QUALITY", 80))
+PREVIEW_EXTENSIONS = {"WEBP": ".webp", "JPEG": ".jpg", "JPG": ".jpg", "PNG": ".png"}
+# 미리보기는 긴 변을 이 크기로 줄여 배경 제거/합성 (0이면 원본 크기)
+PREVIEW_MAX_SIZE = int(os.getenv("BACKGROUND_PREVIEW_MAX_SIZE", 768)) or None
+# 미리보기 파일 보관 시간(초), 지난 파일은 다음 미리보기 생성 시 삭제
+PREVIEW_TTL = int(os.getenv("BACKGROUND_PREVIEW_TTL", 600))
+PREVIEW_DIR = Path(__file__).parent.parent.parent.parent / "uploads" / "background_custom" / "previews"
+
+
+def _read_background_file(project_root: Path, background_path: str) -> bytes:
+    """배경 이미지 파일 읽기 (경로가 '/'로 시작하는 경우 제거)"""
+    absolute_background_path = project_root / background_path.lstrip("/")
+    if not absolute_background_path.exists():
+        raise HTTPException(
+            status_code=404,
+            detail=f"배경 이미지 파일을 찾을 수 없습니다: {absolute_background_path}",
+        )
+    with open(absolute_background_path, "rb") as f:
+        return f.read()
+
+
+def _save_preview(user_id: int, image_bytes: bytes) -> str:
+    """미리보기 파일 저장 후 URL 반환 (보관 시간이 지난 미리보기는 정리)"""
+    PREVIEW_DIR.mkdir(parents=True, exist_ok=True)
+
+    expire_before = time.time() - PREVIEW_TTL
+    for old_file in PREVIEW_DIR.glob("preview_*"):
+        try:
+            if old_file.stat().st_mtime < expire_before:
+                old_file.unlink()
+        except OSError:
+            pass  # 다른 요청이 먼저 삭제함
+
+    extension = PREVIEW_EXTENSIONS.get(PREVIEW_FORMAT, ".png")
+    filename = f"preview_{user_id}_{uuid.uuid4().hex}{extension}"
+    with open(PREVIEW_DIR / filename, "wb") as f:
+        f.write(image_bytes)
+    return f"/uploads/background_custom/previews/{filename}"
+
+
+async def _compose_in_pool(
+    original_image_path: str,
+    background_bytes: Optional[bytes],
+    background_color: Optional[str],
+    model_name: Optional[str] = None,
+    fitting_id: Optional[int] = None,
+    output_format: str = "PNG",
+    quality: Optional[int] = None,
+    max_size: Optional[int] = None,
+) -> bytes:
+    """배경 제거 + 합성을 이미지 프로세스 풀에서 실행 (풀이 가득 차면 503)"""
+    try:
+        return await image_worker_pool.run(
+            compose_background,
+            original_image_path,
+            background_bytes,
+            background_color,
+            model_name,
+            fitting_id,
+            output_format,
+            quality,
+            max_size,
+        )
+    except ImageWorkerBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "5"})
+    except ImageJobError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 
 @router.post("/preview", response_model=BackgroundCustomPreviewResponse)
 async def preview_background_custom(
@@ -32,10 +114,13 @@ async def preview_background_custom(
     background_image: UploadFile = File(None, description="배경 이미지"),
     background_path: str = Form(None, description="기본 배경 이미지 경로"),
     background_color: str = Form(None, description="배경 색상"),
+    model: Optional[str] = Form(
+        None, description="배경 제거 모델 (u2net, u2netp, silueta, 기본: REMBG_PREVIEW_MODEL)"
+    ),
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user),
 ):
-    """배경 커스텀 미리보기 (DB 저장 없음)"""
+    """배경 커스텀 미리보기 (DB 저장 없음, 축소 이미지를 짧게 보관되는 파일 URL로 반환)"""
     try:
         # 가상피팅 결과 조회
         fitting_result = (
@@ -68,146 +153,39 @@ async def preview_background_custom(
         project_root = Path(__file__).parent.parent.parent.parent
 
         if background_image and background_image.filename:
-            # 업로드된 배경 이미지 임시 처리 (저장하지 않음)
+            # 업로드된 배경 이미지는 저장하지 않고 메모리에서 바로 사용 (미리보기용)
             print(f"업로드된 배경 이미지 미리보기 처리: {background_image.filename}")
-
-            try:
-                # 임시 파일로 저장해서 처리 (미리보기용)
-                import tempfile
-                import uuid
-
-                # 임시 파일 생성
-                file_ext = os.path.splitext(background_image.filename)[1]
-                temp_filename = f"temp_{uuid.uuid4().hex}{file_ext}"
-                temp_dir = project_root / "uploads" / "temp_images"
-                temp_dir.mkdir(parents=True, exist_ok=True)
-                temp_file_path = temp_dir / temp_filename
-
-                # 파일 내용을 임시 파일에 저장
-                file_content = await background_image.read()
-                with open(temp_file_path, "wb") as f:
-                    f.write(file_content)
-                print(f"임시 파일 저장 완료: {temp_file_path}")
-
-                # 로컬 배경 제거 서비스를 사용하여 원본 이미지의 배경 제거
-                foreground_bytes = (
-                    background_removal_service.remove_background_advanced(
-                        str(original_image_path)
-                    )
-                )
-                if not foreground_bytes:
-                    raise HTTPException(
-                        status_code=500, detail="배경 제거에 실패했습니다."
-                    )
-                print(f"배경 제거 완료, 전경 크기: {len(foreground_bytes)} bytes")
-
-                # 배경 이미지 파일에서 바이트 읽기
-                with open(temp_file_path, "rb") as f:
-                    background_bytes = f.read()
-
-                # 배경 이미지와 전경 이미지 결합
-                combined_bytes = background_removal_service.combine_with_background(
-                    foreground_bytes, background_bytes
-                )
-                if not combined_bytes:
-                    raise HTTPException(
-                        status_code=500, detail="이미지 결합에 실패했습니다."
-                    )
-                print(f"이미지 결합 완료, 결과 크기: {len(combined_bytes)} bytes")
-
-                # 임시 파일 삭제
-                try:
-                    temp_file_path.unlink()
-                    print(f"임시 파일 삭제 완료: {temp_file_path}")
-                except Exception as cleanup_error:
-                    print(f"임시 파일 삭제 실패: {cleanup_error}")
-
-                # Base64로 인코딩하여 반환
-                import base64
-
-                base64_image = base64.b64encode(combined_bytes).decode("utf-8")
-                image_url = f"data:image/png;base64,{base64_image}"
-
-                return BackgroundCustomPreviewResponse(
-                    success=True,
-                    message="미리보기가 생성되었습니다.",
-                    image_url=image_url,
-                )
-            except Exception as e:
-                print(f"미리보기 처리 중 오류 발생: {str(e)}")
-                import traceback
-
-                traceback.print_exc()
-                raise HTTPException(
-                    status_code=500,
-                    detail=f"미리보기 처리 중 오류가 발생했습니다: {str(e)}",
-                )
-
+            background_bytes = await background_image.read()
         elif background_path:
             # 기본 배경 이미지 경로 사용
             print(f"기본 배경 이미지 경로: {background_path}")
-            # 경로가 '/'로 시작하는 경우 제거
-            clean_path = background_path.lstrip("/")
-            absolute_background_path = project_root / clean_path
-
-            # 로컬 배경 제거 서비스를 사용하여 원본 이미지의 배경 제거
-            foreground_bytes = background_removal_service.remove_background_advanced(
-                str(original_image_path)
-            )
-            if not foreground_bytes:
-                raise HTTPException(status_code=500, detail="배경 제거에 실패했습니다.")
-
-            # 배경 이미지 파일 존재 확인
-            if not absolute_background_path.exists():
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"배경 이미지 파일을 찾을 수 없습니다: {absolute_background_path}",
-                )
-
-            # 배경 이미지 읽기
-            with open(absolute_background_path, "rb") as f:
-                background_bytes = f.read()
-
+            background_bytes = _read_background_file(project_root, background_path)
         elif background_color:
-            # 색상 배경 처리
+            # 색상 배경 처리 (워커에서 전경 크기에 맞춰 생성)
             print(f"색상 배경 처리: {background_color}")
-
-            # 로컬 배경 제거 서비스를 사용하여 원본 이미지의 배경 제거
-            foreground_bytes = background_removal_service.remove_background_advanced(
-                str(original_image_path)
-            )
-            if not foreground_bytes:
-                raise HTTPException(status_code=500, detail="배경 제거에 실패했습니다.")
-
-            # 색상 배경 생성
-            background_bytes = background_removal_service.create_color_background(
-                background_color, foreground_bytes
-            )
-            if not background_bytes:
-                raise HTTPException(
-                    status_code=500, detail="색상 배경 생성에 실패했습니다."
-                )
+            background_bytes = None
         else:
             raise HTTPException(
                 status_code=400, detail="배경 이미지 또는 색상이 필요합니다."
             )
 
-        # 이미지 합성
-        combined_bytes = background_removal_service.combine_with_background(
-            foreground_bytes, background_bytes
+        # 배경 제거 + 합성 (프로세스 풀에서 실행, 미리보기는 축소 이미지 + 가벼운 모델 선택 가능)
+        combined_bytes = await _compose_in_pool(
+            str(original_image_path),
+            background_bytes,
+            background_color,
+            model or PREVIEW_MODEL,
+            fitting_id,
+            PREVIEW_FORMAT,
+            PREVIEW_QUALITY,
+            PREVIEW_MAX_SIZE,
         )
-        if not combined_bytes:
-            raise HTTPException(status_code=500, detail="이미지 합성에 실패했습니다.")
-
-        # Base64로 인코딩하여 직접 반환 (파일 저장하지 않음)
-        import base64
-
-        image_base64 = base64.b64encode(combined_bytes).decode("utf-8")
 
+        # Base64 대신 짧게 보관되는 파일 URL로 반환 (응답 크기 감소)
         return BackgroundCustomPreviewResponse(
             success=True,
             message="미리보기가 생성되었습니다.",
-            image_url=f"data:image/png;base64,{image_base64}",  # Base64 데이터 URL
+            image_url=_save_preview(current_user.user_id, combined_bytes),
         )
 
     except HTTPException:
@@ -231,7 +209,7 @@ async def process_background_custom(
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user),
 ):
-    """가상피팅 결과에 배경 커스텀 적용"""
+    """가상피팅 결과에 배경 커스텀 적용 (작업 큐에 등록 후 바로 응답, 히스토리 재사용은 즉시 완료)"""
     try:
         print(f"배경 커스텀 요청 받음:")
         print(f"  fitting_id: {fitting_id}")
@@ -324,6 +302,8 @@ async def process_background_custom(
 
             shutil.copy2(history_image_path, existing_image_path)
 
+            cutout_cache.invalidate(fitting_id)
+
             print(
                 f"히스토리 이미지 복사 완료: {history_image_path} -> {existing_image_path}"
             )
@@ -337,168 +317,44 @@ async def process_background_custom(
             )
 
         if background_image and background_image.filename:
-            # 업로드된 배경 이미지 저장
+            # 업로드된 배경 이미지 저장 (워커가 저장된 경로에서 읽음)
             print(f"업로드된 배경 이미지 처리: {background_image.filename}")
-            saved_background_path = await save_background_image(
+            background_path = await save_background_image(
                 background_image, current_user.user_id
             )
-            absolute_background_path = project_root / saved_background_path
-
-            # 로컬 배경 제거 서비스를 사용하여 원본 이미지의 배경 제거
-            foreground_bytes = background_removal_service.remove_background_advanced(
-                str(original_image_path)
-            )
-            if not foreground_bytes:
-                raise HTTPException(status_code=500, detail="배경 제거에 실패했습니다.")
-
-            # 배경 이미지 파일 존재 확인
-            if not absolute_background_path.exists():
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"배경 이미지 파일을 찾을 수 없습니다: {absolute_background_path}",
-                )
-
-            # 배경 이미지 읽기
-            with open(absolute_background_path, "rb") as f:
-                background_bytes = f.read()
-
         elif background_path:
-            # 기본 배경 이미지 경로 사용
+            # 기본 배경 이미지 경로 사용 (없는 파일이면 큐에 넣기 전에 404)
             print(f"기본 배경 이미지 경로: {background_path}")
-            # 경로가 '/'로 시작하는 경우 제거
-            clean_path = background_path.lstrip("/")
-            absolute_background_path = project_root / clean_path
-
-            # 로컬 배경 제거 서비스를 사용하여 원본 이미지의 배경 제거
-            foreground_bytes = background_removal_service.remove_background_advanced(
-                str(original_image_path)
-            )
-            if not foreground_bytes:
-                raise HTTPException(status_code=500, detail="배경 제거에 실패했습니다.")
-
-            # 배경 이미지 파일 존재 확인
-            if not absolute_background_path.exists():
+            if not (project_root / background_path.lstrip("/")).exists():
                 raise HTTPException(
                     status_code=404,
-                    detail=f"배경 이미지 파일을 찾을 수 없습니다: {absolute_background_path}",
+                    detail=f"배경 이미지 파일을 찾을 수 없습니다: {background_path}",
                 )
-
-            # 배경 이미지 읽기
-            with open(absolute_background_path, "rb") as f:
-                background_bytes = f.read()
-
         elif background_color:
-            # 색상 배경 처리
+            # 색상 배경 처리 (워커에서 전경 크기에 맞춰 생성)
             print(f"색상 배경 처리: {background_color}")
-
-            # 로컬 배경 제거 서비스를 사용하여 원본 이미지의 배경 제거
-            foreground_bytes = background_removal_service.remove_background_advanced(
-                str(original_image_path)
-            )
-            if not foreground_bytes:
-                raise HTTPException(status_code=500, detail="배경 제거에 실패했습니다.")
-
-            # 색상 배경 생성
-            background_bytes = background_removal_service.create_color_background(
-                background_color, foreground_bytes
-            )
-            if not background_bytes:
-                raise HTTPException(
-                    status_code=500, detail="색상 배경 생성에 실패했습니다."
-                )
-
         else:
             raise HTTPException(
                 status_code=400, detail="배경 이미지 또는 색상이 필요합니다."
             )
 
-        # 이미지 합성
-        combined_bytes = background_removal_service.combine_with_background(
-            foreground_bytes, background_bytes
+        # 배경 제거/합성/저장은 워커에서 처리하고 바로 응답 (결과는 /jobs/{task_id}로 조회)
+        task_id = background_custom_service.enqueue(
+            current_user.user_id, fitting_id, title, background_path, background_color
         )
-        if not combined_bytes:
-            raise HTTPException(status_code=500, detail="이미지 합성에 실패했습니다.")
-
-        # 기존 가상피팅 결과의 이미지 경로 가져오기
-        virtual_fitting = (
-            db.query(VirtualFittings)
-            .filter(
-                VirtualFittings.fitting_id == fitting_id,
-                VirtualFittings.user_id == current_user.user_id,
-            )
-            .first()
-        )
-
-        if not virtual_fitting:
+        if not task_id:
             raise HTTPException(
-                status_code=404, detail="가상피팅 결과를 찾을 수 없습니다."
+                status_code=503,
+                detail="작업 큐를 사용할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                headers={"Retry-After": "5"},
             )
 
-        # 기존 이미지 파일 경로 (selected_fittings 폴더)
-        project_root = Path(__file__).parent.parent.parent.parent
-        existing_image_path = project_root / virtual_fitting.fitting_image_url
-
-        # 기존 이미지 파일이 존재하는지 확인
-        if not existing_image_path.exists():
-            raise HTTPException(
-                status_code=404,
-                detail=f"기존 가상피팅 이미지를 찾을 수 없습니다: {existing_image_path}",
-            )
-
-        # 배경 커스텀된 이미지를 기존 파일 경로에 덮어쓰기
-        if not background_removal_service.save_image(
-            combined_bytes, str(existing_image_path)
-        ):
-            raise HTTPException(
-                status_code=500, detail="배경 커스텀 이미지 저장에 실패했습니다."
-            )
-
-        print(f"배경 커스텀 완료: 기존 이미지 덮어쓰기 성공 - {existing_image_path}")
-
-        # 배경 커스텀 결과도 별도로 저장 (히스토리용)
-        result_filename = f"custom_{fitting_id}_{uuid.uuid4().hex[:8]}.png"
-        result_dir = (
-            Path(__file__).parent.parent.parent.parent / "uploads" / "background_custom"
-        )
-        result_dir.mkdir(parents=True, exist_ok=True)
-        result_path = result_dir / result_filename
-
-        if not background_removal_service.save_image(combined_bytes, str(result_path)):
-            raise HTTPException(
-                status_code=500, detail="배경 커스텀 히스토리 저장에 실패했습니다."
-            )
-
-        # 상대 경로로 변환 (히스토리용)
-        relative_result_path = f"uploads/background_custom/{result_filename}"
-
-        # 데이터베이스에 결과 저장 (삭제된 ID 재사용)
-        # 배경 이미지 경로 설정
-        if background_image and background_image.filename:
-            # 업로드된 배경 이미지의 경우 저장된 경로 사용
-            db_background_path = saved_background_path
-        else:
-            # 기본 배경 이미지의 경우 원본 경로 사용
-            db_background_path = background_path
-
-        # 새로운 레코드 생성
-        custom_result = BackgroundCustoms(
-            user_id=current_user.user_id,
-            fitting_id=fitting_id,
-            custom_image_url=relative_result_path,
-            background_image_url=db_background_path,
-            title=title,
-        )
-
-        db.add(custom_result)
-        db.commit()
-        db.refresh(custom_result)
-
         return BackgroundCustomResponse(
             success=True,
-            message="배경 커스텀이 완료되었습니다.",
-            custom_fitting_id=custom_result.custom_fitting_id,
-            image_url=f"/api/background-custom/result/{custom_result.custom_fitting_id}",
-            title=custom_result.title,
+            message="배경 커스텀 작업이 등록되었습니다.",
+            status="QUEUED",
+            task_id=task_id,
+            title=title,
         )
 
     except HTTPException:
@@ -509,6 +365,29 @@ async def process_background_custom(
         )
 
 
+@router.get("/jobs/{task_id}", response_model=BackgroundCustomJobStatusResponse)
+async def get_background_custom_job(
+    task_id: str,
+    current_user: Users = Depends(get_current_user),
+):
+    """배경 커스텀 작업 상태 조회 (COMPLETED면 결과 ID/이미지 URL 포함)"""
+    status_data = task_queue.get_task_status(task_id)
+    if not status_data or status_data.get("user_id") != current_user.user_id:
+        raise HTTPException(
+            status_code=404, detail="배경 커스텀 작업을 찾을 수 없습니다."
+        )
+
+    return BackgroundCustomJobStatusResponse(
+        task_id=task_id,
+        status=status_data.get("status", "QUEUED"),
+        custom_fitting_id=status_data.get("custom_fitting_id"),
+        image_url=status_data.get("image_url"),
+        title=status_data.get("title"),
+        error=status_data.get("error"),
+        updated_at=status_data.get("updated_at") or status_data.get("created_at"),
+    )
+
+
 @router.get("/result/{custom_fitting_id}")
 async def get_custom_result_image(
     custom_fitting_id: int,
@@ -518,12 +397,8 @@ async def get_custom_result_image(
     """배경 커스텀 결과 이미지 조회 (저장된 결과 또는 미리보기)"""
     # 미리보기 파일인 경우 (custom_fitting_id가 0이거나 파일명이 preview_로 시작)
     if custom_fitting_id == 0:
-        # 미리보기 파일 직접 접근
-        project_root = Path(__file__).parent.parent.parent.parent
-        preview_dir = project_root / "uploads" / "background_custom"
-
-        # 가장 최근 미리보기 파일 찾기
-        preview_files = list(preview_dir.glob("preview_*.png"))
+        # 현재 사용자의 가장 최근 미리보기 파일 찾기
+        preview_files = list(PREVIEW_DIR.glob(f"preview_{current_user.user_id}_*"))
         if preview_files:
             latest_preview = max(preview_files, key=lambda x: x.stat().st_mtime)
             return FileResponse(str(latest_preview))
@@ -4,6 +4,7 @@ from typing import Optional
 from app.db.database import get_db
 from app.crud import clothing_items as clothing_crud
 from app.schemas.clothing_items import ClothingItemsListResponse, ClothingItemResponse
+from app.utils.pagination import decode_cursor, next_cursor
 import math
 
 router = APIRouter(prefix="/api/clothing", tags=["clothing"])
@@ -63,9 +64,20 @@ async def browse_clothing_items(
     gender: Optional[str] = Query(None, description="성별"),
     brand: Optional[str] = Query(None, description="브랜드"),
     search: Optional[str] = Query(None, description="검색어"),
+    cursor: Optional[str] = Query(None, description="다음 페이지 커서 (지정 시 page 대신 사용)"),
+    include_total: Optional[bool] = Query(None, description="전체 개수 포함 여부 (기본: 커서 모드에서는 생략)"),
+    include_facets: bool = Query(False, description="카테고리/성별/브랜드별 상품 수 포함 여부"),
     db: Session = Depends(get_db)
 ):
     """필터링과 검색이 가능한 의류 아이템 브라우징"""
+    sort_key = f"clothing:{sort_by}:{order}"
+    try:
+        cursor_values = decode_cursor(cursor, sort_key)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if include_total is None:
+        include_total = cursor_values is None
+    
     try:
         skip = (page - 1) * size
         items, total = clothing_crud.get_clothing_items_with_filters(
@@ -78,17 +90,32 @@ async def browse_clothing_items(
             sub_category=sub_category,
             gender=gender,
             brand=brand,
-            search=search
+            search=search,
+            cursor=cursor_values,
+            include_total=include_total
         )
         
-        total_pages = math.ceil(total / size)
+        columns = clothing_crud.get_browse_sort_columns(sort_by)
+        
+        facets = None
+        if include_facets:
+            facets = clothing_crud.get_browse_facets(
+                db=db,
+                main_category=main_category,
+                sub_category=sub_category,
+                gender=gender,
+                brand=brand,
+                search=search
+            )
         
         return ClothingItemsListResponse(
             items=items,
             total=total,
             page=page,
             size=size,
-            total_pages=total_pages
+            total_pages=math.ceil(total / size) if total is not None else None,
+            next_cursor=next_cursor(items, size, sort_key, [c.key for c in columns]),
+            facets=facets
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"상품 브라우징 중 오류가 발생했습니다: {str(e)}")
@@ -1,8 +1,9 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.models.users import Users
 from app.models.feeds import Feeds
 from app.schemas.comments import (
@@ -13,6 +14,7 @@ from app.schemas.comments import (
 )
 from app.crud import comments as comment_crud
 from app.api.dependencies import get_current_user
+from app.utils.pagination import decode_cursor
 
 router = APIRouter(
     prefix="/api/feeds/{feed_id}/comments",
@@ -25,24 +27,35 @@ async def get_feed_comments(
     page: int = Query(1, ge=1),
     size: int = Query(20, ge=1, le=100),
     tree_structure: bool = Query(True, description="트리 구조로 반환할지 여부"),
-    db: Session = Depends(get_db)
+    cursor: Optional[str] = Query(None, description="다음 페이지 커서 (트리 구조에서만 사용)"),
+    include_total: Optional[bool] = Query(None, description="전체 개수 포함 여부 (기본: 커서 모드에서는 생략)"),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """피드의 댓글 목록 조회"""
     try:
+        cursor_values = decode_cursor(cursor, comment_crud.COMMENT_CURSOR_KEY)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if include_total is None:
+        include_total = cursor_values is None
+    
+    def load(session: Session):
         # 피드 존재 확인
-        feed = db.query(Feeds).filter(Feeds.feed_id == feed_id).first()
+        feed = session.query(Feeds).filter(Feeds.feed_id == feed_id).first()
         if not feed:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="피드를 찾을 수 없습니다."
-            )
+            return None
         
         skip = (page - 1) * size
         
         if tree_structure:
             # 트리 구조로 반환
-            comments, total = comment_crud.get_comment_tree_by_feed_id(
-                db, feed_id, skip, size
+            comments, total, cursor_token = comment_crud.get_comment_tree_by_feed_id(
+                session, feed_id, skip, size,
+                cursor=cursor_values,
+                include_total=include_total
             )
             
             return {
@@ -50,14 +63,15 @@ async def get_feed_comments(
                 "total": total,
                 "page": page,
                 "size": size,
-                "total_pages": (total + size - 1) // size
+                "total_pages": (total + size - 1) // size if total is not None else None,
+                "next_cursor": cursor_token
             }
         else:
             # 평면 구조로 반환 (모든 댓글)
             comments = comment_crud.get_comments_by_feed_id(
-                db, feed_id, skip, size, include_replies=True
+                session, feed_id, skip, size, include_replies=True
             )
-            total = comment_crud.count_comments_by_feed_id(db, feed_id)
+            total = comment_crud.count_comments_by_feed_id(session, feed_id)
             
             # 댓글 데이터 변환
             comment_responses = []
@@ -75,7 +89,7 @@ async def get_feed_comments(
                         "profile_picture": comment.user.profile_picture
                     } if comment.user else None,
                     "replies": [],
-                    "reply_count": comment_crud.count_replies_by_parent_id(db, comment.comment_id)
+                    "reply_count": comment_crud.count_replies_by_parent_id(session, comment.comment_id)
                 }
                 comment_responses.append(comment_data)
             
@@ -87,11 +101,20 @@ async def get_feed_comments(
                 "total_pages": (total + size - 1) // size
             }
     
+    try:
+        result = await db.run_sync(load)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"댓글 목록 조회 중 오류가 발생했습니다: {str(e)}"
         )
+    
+    if result is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="피드를 찾을 수 없습니다."
+        )
+    return result
 
 @router.post("/", response_model=CommentResponse)
 async def create_feed_comment(
@@ -1,13 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional
 import os
 import logging
 from pathlib import Path
 
-from app.db.database import get_db
-from app.api.dependencies import get_current_user
+from app.db.database import get_db, get_async_db, SessionLocal
+from app.api.dependencies import get_current_user, get_current_user_async, get_session_user_id
 from app.models.users import Users
 from app.models.person_images import PersonImages
 from app.models.liked_clothes import LikedClothes
@@ -15,6 +18,7 @@ from app.models.custom_clothing_items import CustomClothingItems
 from app.models.user_clothes import UserClothes
 from app.models.clothing_items import ClothingItems
 from app.utils.fast_fitting_service import fast_fitting_service
+from app.utils.status_stream import stream_process_status, SSE_HEADERS
 from app.schemas.virtual_fitting import (
     VirtualFittingStartResponse,
     VirtualFittingStatusResponse,
@@ -276,18 +280,8 @@ async def start_fast_fitting(
         logger.error(f"빠른 가상 피팅 시작 중 오류: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"빠른 가상 피팅 시작 중 오류가 발생했습니다: {str(e)}")
 
-@router.get("/status/{process_id}", response_model=VirtualFittingStatusResponse)
-async def get_fast_fitting_status(
-    process_id: int,
-    db: Session = Depends(get_db),
-    current_user: Users = Depends(get_current_user)
-):
-    """빠른 가상 피팅 처리 상태 조회"""
-    process = fast_fitting_service.get_fitting_status(db, process_id, current_user.user_id)
-    
-    if not process:
-        raise HTTPException(status_code=404, detail="빠른 가상 피팅 처리를 찾을 수 없습니다.")
-    
+def _build_fast_status_response(process) -> VirtualFittingStatusResponse:
+    """프로세스 레코드를 상태 응답으로 변환"""
     # 결과 이미지 URL 생성
     result_images = []
     if process.status == 'COMPLETED':
@@ -304,3 +298,51 @@ async def get_fast_fitting_status(
         started_at=process.started_at,
         completed_at=process.completed_at
     )
+
+
+@router.get("/status/{process_id}", response_model=VirtualFittingStatusResponse)
+async def get_fast_fitting_status(
+    process_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Users = Depends(get_current_user_async)
+):
+    """빠른 가상 피팅 처리 상태 조회 (비동기 세션 사용)"""
+    user_id = current_user.user_id
+    process = await db.run_sync(
+        lambda session: fast_fitting_service.get_fitting_status(session, process_id, user_id)
+    )
+    
+    if not process:
+        raise HTTPException(status_code=404, detail="빠른 가상 피팅 처리를 찾을 수 없습니다.")
+    
+    return _build_fast_status_response(process)
+
+
+@router.get("/status/{process_id}/stream")
+async def stream_fast_fitting_status(
+    process_id: int,
+    request: Request,
+    user_id: int = Depends(get_session_user_id),
+):
+    """빠른 가상 피팅 처리 상태 스트림 (SSE, 상태가 바뀔 때만 전송)"""
+    def load_snapshot():
+        # 요청 세션(Depends(get_db))은 응답이 끝날 때까지 반환되지 않으므로
+        # 스트림이 열려 있는 동안 풀 연결을 잡지 않도록 조회마다 짧은 세션 사용
+        session = SessionLocal()
+        try:
+            process = fast_fitting_service.get_fitting_status(session, process_id, user_id)
+            return jsonable_encoder(_build_fast_status_response(process)) if process else None
+        finally:
+            session.close()
+
+    # 소유권 확인 (동기 DB 조회는 이벤트 루프를 막지 않도록 스레드풀에서 실행)
+    if await run_in_threadpool(load_snapshot) is None:
+        raise HTTPException(
+            status_code=404, detail="빠른 가상 피팅 처리를 찾을 수 없습니다."
+        )
+
+    return StreamingResponse(
+        stream_process_status(request, process_id, load_snapshot),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS
+    )
@@ -1,110 +1,122 @@
 from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Request
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional
 import os
 import uuid
 from datetime import datetime
 
-from app.db.database import get_db
+from app.db.database import get_db, get_async_db
 from app.models.users import Users
 from app.models.feeds import Feeds
 from app.models.feed_images import FeedImages
 from app.schemas.feeds import FeedCreate, FeedResponse, FeedListResponse
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, get_current_user_optional_async
+from app.crud.search import apply_search
+from app.crud.feed_counters import increment_like_count, increment_comment_count, get_like_count
 from app.utils.file_upload import save_upload_file
+from app.utils.pagination import decode_cursor, keyset_filter, next_cursor
 
 router = APIRouter(
     prefix="/api/feeds",
     tags=["feeds"]
 )
 
+# 피드 목록 정렬 허용 컬럼 (커서 값이 NULL이면 keyset 조건이 아무 행도 찾지 못하므로 NULL이 없는 컬럼만)
+# created_at은 모델상 nullable이지만 서버 기본값(NOW())으로 항상 채워짐
+FEED_SORT_COLUMNS = {
+    "created_at": Feeds.created_at,
+    "like_count": Feeds.like_count,
+    "comment_count": Feeds.comment_count,
+}
+
+# 내 피드 목록 커서 정렬 기준 (created_at, feed_id 내림차순)
+MY_FEEDS_CURSOR_KEY = "my_feeds:created_at:desc"
+
+def get_feeds_with_user_status(feeds, current_user_id, db):
+    """피드 목록에 작성자/이미지/좋아요/댓글/현재 사용자 상태를 붙이는 헬퍼 함수
+
+    피드 수와 관계없이 IN 묶음 조회(최대 4회)로 처리, 좋아요/댓글 수는 피드의 카운터 컬럼 사용
+    """
+    if not feeds:
+        return []
+
+    from app.models.liked_feeds import LikedFeeds
+    from app.models.users import Followers
+
+    feed_ids = [feed.feed_id for feed in feeds]
+    author_ids = list({feed.user_id for feed in feeds})
+
+    # 작성자
+    users = {
+        user.user_id: user
+        for user in db.query(Users).filter(Users.user_id.in_(author_ids)).all()
+    }
+
+    # 이미지 (피드별 순서 유지)
+    images_by_feed = {feed_id: [] for feed_id in feed_ids}
+    for img in db.query(FeedImages).filter(
+        FeedImages.feed_id.in_(feed_ids)
+    ).order_by(FeedImages.feed_id, FeedImages.image_order).all():
+        images_by_feed[img.feed_id].append(img)
+
+    # 현재 사용자의 좋아요/팔로우 상태 (로그인한 경우에만)
+    liked_feed_ids = set()
+    following_ids = set()
+    if current_user_id:
+        liked_feed_ids = {
+            row.feed_id for row in db.query(LikedFeeds.feed_id).filter(
+                LikedFeeds.user_id == current_user_id,
+                LikedFeeds.feed_id.in_(feed_ids)
+            ).all()
+        }
+        following_ids = {
+            row.following_id for row in db.query(Followers.following_id).filter(
+                Followers.follower_id == current_user_id,
+                Followers.following_id.in_(author_ids)
+            ).all()
+        }
+
+    results = []
+    for feed in feeds:
+        user = users.get(feed.user_id)
+        is_following = bool(
+            current_user_id and user and current_user_id != user.user_id
+            and user.user_id in following_ids
+        )
+        results.append({
+            "feed_id": feed.feed_id,
+            "user_id": feed.user_id,
+            "title": feed.title,
+            "content": feed.content,
+            "created_at": feed.created_at,
+            "updated_at": feed.updated_at,
+            "user": {
+                "user_id": user.user_id,
+                "nickname": user.nickname,
+                "email": user.email,  # 이메일 정보 추가
+                "profile_picture": user.profile_picture,
+                "isFollowing": is_following  # 팔로우 상태 추가
+            } if user else None,
+            "images": [
+                {
+                    "id": img.id,
+                    "image_url": img.image_url,
+                    "image_order": img.image_order
+                }
+                for img in images_by_feed[feed.feed_id]
+            ],
+            "like_count": feed.like_count or 0,
+            "comment_count": feed.comment_count or 0,
+            "is_liked": feed.feed_id in liked_feed_ids
+        })
+
+    return results
+
 def get_feed_with_user_status(feed, current_user_id, db):
     """피드 정보에 현재 사용자의 상태 정보를 추가하는 헬퍼 함수"""
-    user = db.query(Users).filter(Users.user_id == feed.user_id).first()
-    images = db.query(FeedImages).filter(FeedImages.feed_id == feed.feed_id).order_by(FeedImages.image_order).all()
-    
-    # 기본값 설정
-    like_count = 0
-    comment_count = 0
-    is_liked = False
-    is_following = False
-    
-    # 좋아요 수와 현재 사용자의 좋아요 상태 확인
-    try:
-        from app.models.liked_feeds import LikedFeeds
-        
-        # 전체 좋아요 수 계산
-        like_count = db.query(LikedFeeds).filter(LikedFeeds.feed_id == feed.feed_id).count()
-        
-        # 현재 사용자의 좋아요 상태 확인 (로그인한 경우에만)
-        if current_user_id:
-            user_like = db.query(LikedFeeds).filter(
-                LikedFeeds.feed_id == feed.feed_id,
-                LikedFeeds.user_id == current_user_id
-            ).first()
-            is_liked = user_like is not None
-            
-    except ImportError:
-        pass
-    except Exception:
-        pass
-    
-    # 댓글 수 계산
-    try:
-        from app.models.feed_comments import FeedComments
-        comment_count = db.query(FeedComments).filter(FeedComments.feed_id == feed.feed_id).count()
-    except ImportError:
-        pass
-    except Exception:
-        pass
-    
-    # 팔로우 상태 확인
-    if current_user_id and user and current_user_id != user.user_id:
-        try:
-            from app.models.users import Followers
-            follow_record = db.query(Followers).filter(
-                Followers.follower_id == current_user_id,
-                Followers.following_id == user.user_id
-            ).first()
-            is_following = follow_record is not None
-        except ImportError:
-            # Followers 모델이 없는 경우
-            try:
-                from app.crud.followers import is_following as check_following
-                is_following = check_following(db, current_user_id, user.user_id)
-            except ImportError:
-                pass
-        except Exception:
-            pass
-    
-    result = {
-        "feed_id": feed.feed_id,
-        "user_id": feed.user_id,
-        "title": feed.title,
-        "content": feed.content,
-        "created_at": feed.created_at,
-        "updated_at": feed.updated_at,
-        "user": {
-            "user_id": user.user_id,
-            "nickname": user.nickname,
-            "email": user.email,  # 이메일 정보 추가
-            "profile_picture": user.profile_picture,
-            "isFollowing": is_following  # 팔로우 상태 추가
-        } if user else None,
-        "images": [
-            {
-                "id": img.id,
-                "image_url": img.image_url,
-                "image_order": img.image_order
-            }
-            for img in images
-        ],
-        "like_count": like_count,
-        "comment_count": comment_count,
-        "is_liked": is_liked
-    }
-    
-    return result
+    return get_feeds_with_user_status([feed], current_user_id, db)[0]
 
 # 피드 작성
 @router.post("/", response_model=FeedResponse)
@@ -170,50 +182,56 @@ async def get_feeds(
     size: int = 10,
     sort_by: str = "created_at",
     order: str = "desc",
-    db: Session = Depends(get_db),
-    request: Request = None
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Optional[Users] = Depends(get_current_user_optional_async)
 ):
-    """피드 목록 조회 API"""
+    """피드 목록 조회 API (cursor 지정 시 OFFSET 대신 keyset 조회, 기본적으로 전체 개수 생략)"""
+    # 정렬 컬럼 + 동률 처리용 feed_id (허용하지 않는 기준은 created_at)
+    sort_column = FEED_SORT_COLUMNS.get(sort_by, Feeds.created_at)
+    sort_columns = (sort_column, Feeds.feed_id)
+    descending = order.lower() == "desc"
+    sort_key = f"feeds:{sort_column.key}:{'desc' if descending else 'asc'}"
     try:
-        # 현재 사용자 확인
-        current_user_id = None
-        try:
-            if request and hasattr(request, 'session') and 'user_id' in request.session:
-                user_id = request.session['user_id']
-                current_user = db.query(Users).filter(Users.user_id == user_id).first()
-                if current_user:
-                    current_user_id = current_user.user_id
-        except Exception:
-            pass
-        
-        # 페이지네이션 설정
-        skip = (page - 1) * size
+        cursor_values = decode_cursor(cursor, sort_key)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if include_total is None:
+        include_total = cursor_values is None
+    
+    current_user_id = current_user.user_id if current_user else None
+    
+    def load(session: Session):
+        # 피드 목록 조회
+        query = session.query(Feeds)
+        if cursor_values is not None:
+            query = query.filter(keyset_filter(sort_columns, cursor_values, descending))
+        query = query.order_by(*[c.desc() if descending else c.asc() for c in sort_columns])
         
-        # 정렬 설정
-        order_by = getattr(Feeds, sort_by, Feeds.created_at)
-        if order.lower() == "desc":
-            order_by = order_by.desc()
+        if cursor_values is not None:
+            feeds = query.limit(size).all()
         else:
-            order_by = order_by.asc()
-        
-        # 피드 목록 조회
-        feeds = db.query(Feeds).order_by(order_by).offset(skip).limit(size).all()
-        total = db.query(Feeds).count()
+            feeds = query.offset((page - 1) * size).limit(size).all()
+        total = session.query(Feeds).count() if include_total else None
         
         # 응답 데이터 준비
-        feed_list = []
-        for feed in feeds:
-            feed_data = get_feed_with_user_status(feed, current_user_id, db)
-            feed_list.append(feed_data)
+        feed_list = get_feeds_with_user_status(feeds, current_user_id, session)
         
         return {
             "feeds": feed_list,
             "total": total,
             "page": page,
             "size": size,
-            "total_pages": (total + size - 1) // size
+            "total_pages": (total + size - 1) // size if total is not None else None,
+            "next_cursor": next_cursor(feeds, size, sort_key, [c.key for c in sort_columns])
         }
     
+    try:
+        return await db.run_sync(load)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -225,30 +243,45 @@ async def get_feeds(
 async def get_my_feeds(
     page: int = 1,
     size: int = 10,
+    cursor: Optional[str] = None,
+    include_total: Optional[bool] = None,
     current_user: Users = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
-    """내가 작성한 피드 목록 조회 API"""
+    """내가 작성한 피드 목록 조회 API (cursor 지정 시 OFFSET 대신 keyset 조회)"""
     try:
-        skip = (page - 1) * size
+        cursor_values = decode_cursor(cursor, MY_FEEDS_CURSOR_KEY)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    if include_total is None:
+        include_total = cursor_values is None
+
+    try:
+        query = db.query(Feeds).filter(Feeds.user_id == current_user.user_id)
+        total = query.count() if include_total else None
         
-        feeds = db.query(Feeds).filter(
-            Feeds.user_id == current_user.user_id
-        ).order_by(Feeds.created_at.desc()).offset(skip).limit(size).all()
+        sort_columns = (Feeds.created_at, Feeds.feed_id)
+        if cursor_values is not None:
+            query = query.filter(keyset_filter(sort_columns, cursor_values, descending=True))
+        query = query.order_by(*[c.desc() for c in sort_columns])
         
-        total = db.query(Feeds).filter(Feeds.user_id == current_user.user_id).count()
+        if cursor_values is not None:
+            feeds = query.limit(size).all()
+        else:
+            feeds = query.offset((page - 1) * size).limit(size).all()
         
-        feed_list = []
-        for feed in feeds:
-            feed_data = get_feed_with_user_status(feed, current_user.user_id, db)
-            feed_list.append(feed_data)
+        feed_list = get_feeds_with_user_status(feeds, current_user.user_id, db)
         
         return {
             "feeds": feed_list,
             "total": total,
             "page": page,
             "size": size,
-            "total_pages": (total + size - 1) // size
+            "total_pages": (total + size - 1) // size if total is not None else None,
+            "next_cursor": next_cursor(feeds, size, MY_FEEDS_CURSOR_KEY, [c.key for c in sort_columns])
         }
     
     except Exception as e:
@@ -263,34 +296,32 @@ async def search_feeds(
     q: str,
     page: int = 1,
     size: int = 10,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """피드 검색 API"""
+    # 현재 사용자 확인
+    current_user_id = None
     try:
+        if request and hasattr(request, 'session') and 'user_id' in request.session:
+            current_user_id = request.session['user_id']
+    except Exception:
+        pass
+    
+    def load(session: Session):
         skip = (page - 1) * size
         
-        # 제목이나 내용에서 검색
-        feeds = db.query(Feeds).filter(
-            (Feeds.title.contains(q)) | (Feeds.content.contains(q))
-        ).order_by(Feeds.created_at.desc()).offset(skip).limit(size).all()
+        # 제목이나 내용에서 검색 (FULLTEXT 사용 시 관련도순, 아니면 최신순)
+        query, score = apply_search(session.query(Feeds), session, "feeds", (Feeds.title, Feeds.content), q)
+        total = query.count()
         
-        total = db.query(Feeds).filter(
-            (Feeds.title.contains(q)) | (Feeds.content.contains(q))
-        ).count()
-        
-        # 현재 사용자 확인
-        current_user_id = None
-        try:
-            if request and hasattr(request, 'session') and 'user_id' in request.session:
-                current_user_id = request.session['user_id']
-        except Exception:
-            pass
+        if score is not None:
+            query = query.order_by(score.desc(), Feeds.created_at.desc())
+        else:
+            query = query.order_by(Feeds.created_at.desc())
+        feeds = query.offset(skip).limit(size).all()
         
-        feed_list = []
-        for feed in feeds:
-            feed_data = get_feed_with_user_status(feed, current_user_id, db)
-            feed_list.append(feed_data)
+        feed_list = get_feeds_with_user_status(feeds, current_user_id, session)
         
         return {
             "feeds": feed_list,
@@ -300,6 +331,8 @@ async def search_feeds(
             "total_pages": (total + size - 1) // size
         }
     
+    try:
+        return await db.run_sync(load)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -310,36 +343,38 @@ async def search_feeds(
 @router.get("/{feed_id}", response_model=FeedResponse)
 async def get_feed(
     feed_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     request: Request = None
 ):
     """특정 피드 조회 API"""
+    # 현재 사용자 확인
+    current_user_id = None
     try:
-        feed = db.query(Feeds).filter(Feeds.feed_id == feed_id).first()
+        if request and hasattr(request, 'session') and 'user_id' in request.session:
+            current_user_id = request.session['user_id']
+    except Exception:
+        pass
+    
+    def load(session: Session):
+        feed = session.query(Feeds).filter(Feeds.feed_id == feed_id).first()
         if not feed:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="피드를 찾을 수 없습니다."
-            )
-        
-        # 현재 사용자 확인
-        current_user_id = None
-        try:
-            if request and hasattr(request, 'session') and 'user_id' in request.session:
-                current_user_id = request.session['user_id']
-        except Exception:
-            pass
-        
-        response_data = get_feed_with_user_status(feed, current_user_id, db)
-        return response_data
+            return None
+        return get_feed_with_user_status(feed, current_user_id, session)
     
-    except HTTPException:
-        raise
+    try:
+        response_data = await db.run_sync(load)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"피드 조회 중 오류가 발생했습니다: {str(e)}"
         )
+    
+    if response_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="피드를 찾을 수 없습니다."
+        )
+    return response_data
 
 # 피드 수정
 @router.put("/{feed_id}", response_model=FeedResponse)
@@ -509,15 +544,14 @@ async def toggle_feed_like(
                 detail="피드를 찾을 수 없습니다."
             )
         
-        # 좋아요 여부 확인
-        liked = db.query(LikedFeeds).filter(
+        # 좋아요 취소 시도 (실제로 삭제된 경우에만 카운터 감소)
+        removed = db.query(LikedFeeds).filter(
             LikedFeeds.feed_id == feed_id,
             LikedFeeds.user_id == current_user.user_id
-        ).first()
+        ).delete(synchronize_session=False)
         
-        if liked:
-            # 좋아요 취소
-            db.delete(liked)
+        if removed:
+            increment_like_count(db, feed_id, -removed)
             db.commit()
             is_liked = False
             message = "좋아요를 취소했습니다."
@@ -529,12 +563,17 @@ async def toggle_feed_like(
                 liked_at=datetime.now()
             )
             db.add(new_like)
-            db.commit()
+            increment_like_count(db, feed_id, 1)
+            try:
+                db.commit()
+            except IntegrityError:
+                # 동시 요청으로 이미 좋아요된 경우 (카운터는 먼저 커밋된 요청에서 반영됨)
+                db.rollback()
             is_liked = True
             message = "좋아요를 추가했습니다."
         
-        # 좋아요 수 조회
-        like_count = db.query(LikedFeeds).filter(LikedFeeds.feed_id == feed_id).count()
+        # 좋아요 수 조회 (카운터 컬럼)
+        like_count = get_like_count(db, feed_id)
         
         return {
             "is_liked": is_liked,
@@ -579,6 +618,7 @@ async def create_feed_comment(
             created_at=datetime.now()
         )
         db.add(new_comment)
+        increment_comment_count(db, feed_id, 1)
         db.commit()
         db.refresh(new_comment)
         
@@ -7,19 +7,25 @@ from fastapi import (
     Form,
     Query,
     Body,
+    Request,
 )
-from fastapi.responses import JSONResponse, FileResponse
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from typing import Optional, List
 import os
 
-from app.db.database import get_db
-from app.api.dependencies import get_current_user
+from app.db.database import get_db, get_async_db, SessionLocal
+from app.api.dependencies import get_current_user, get_current_user_async, get_session_user_id
 from app.models.users import Users
 from app.models.virtual_fittings import VirtualFittings
 from app.utils.virtual_fitting_service import fitting_service_redis
 from app.crud.virtual_fitting import VirtualFittingCRUD
 from app.core.task_queue import task_queue
+from app.utils.status_stream import stream_process_status, SSE_HEADERS
+from app.utils.pagination import decode_cursor, next_cursor
 from app.schemas.virtual_fitting import (
     VirtualFittingStartRequest,
     VirtualFittingStartResponse,
@@ -33,6 +39,9 @@ from app.schemas.virtual_fitting import (
 
 router = APIRouter(prefix="/api/virtual-fitting-redis", tags=["virtual-fitting-redis"])
 
+# 히스토리 커서 정렬 기준 (created_at, fitting_id 내림차순)
+HISTORY_CURSOR_KEY = "fittings:created_at:desc"
+
 
 @router.post("/start", response_model=VirtualFittingStartResponse)
 async def start_virtual_fitting_redis(
@@ -95,22 +104,8 @@ async def start_virtual_fitting_redis(
         )
 
 
-@router.get("/status/{process_id}", response_model=VirtualFittingStatusResponse)
-async def get_fitting_status_redis(
-    process_id: int,
-    db: Session = Depends(get_db),
-    current_user: Users = Depends(get_current_user),
-):
-    """가상 피팅 처리 상태 조회 (Redis 큐 사용)"""
-    process = fitting_service_redis.get_fitting_status(
-        db, process_id, current_user.user_id
-    )
-
-    if not process:
-        raise HTTPException(
-            status_code=404, detail="가상 피팅 처리를 찾을 수 없습니다."
-        )
-
+def _build_status_response(process) -> VirtualFittingStatusResponse:
+    """프로세스 레코드를 상태 응답으로 변환"""
     # 결과 이미지 URL 생성 (정적 경로 반환하여 인증 없이 표시 가능)
     result_images = []
     result_items = []
@@ -140,7 +135,7 @@ async def get_fitting_status_redis(
             return None
 
     return VirtualFittingStatusResponse(
-        process_id=process_id,
+        process_id=process.id,
         status=process.status,
         started_at=process.started_at,
         completed_at=process.completed_at,
@@ -152,6 +147,58 @@ async def get_fitting_status_redis(
     )
 
 
+@router.get("/status/{process_id}", response_model=VirtualFittingStatusResponse)
+async def get_fitting_status_redis(
+    process_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Users = Depends(get_current_user_async),
+):
+    """가상 피팅 처리 상태 조회 (Redis 큐 사용, 폴링 요청이 이벤트 루프를 막지 않도록 비동기 세션 사용)"""
+    user_id = current_user.user_id
+    process = await db.run_sync(
+        lambda session: fitting_service_redis.get_fitting_status(
+            session, process_id, user_id
+        )
+    )
+
+    if not process:
+        raise HTTPException(
+            status_code=404, detail="가상 피팅 처리를 찾을 수 없습니다."
+        )
+
+    return _build_status_response(process)
+
+
+@router.get("/status/{process_id}/stream")
+async def stream_fitting_status_redis(
+    process_id: int,
+    request: Request,
+    user_id: int = Depends(get_session_user_id),
+):
+    """가상 피팅 처리 상태 스트림 (SSE, 상태가 바뀔 때만 전송)"""
+    def load_snapshot():
+        # 요청 세션(Depends(get_db))은 응답이 끝날 때까지 반환되지 않으므로
+        # 스트림이 열려 있는 동안 풀 연결을 잡지 않도록 조회마다 짧은 세션 사용
+        session = SessionLocal()
+        try:
+            process = fitting_service_redis.get_fitting_status(session, process_id, user_id)
+            return jsonable_encoder(_build_status_response(process)) if process else None
+        finally:
+            session.close()
+
+    # 소유권 확인 (동기 DB 조회는 이벤트 루프를 막지 않도록 스레드풀에서 실행)
+    if await run_in_threadpool(load_snapshot) is None:
+        raise HTTPException(
+            status_code=404, detail="가상 피팅 처리를 찾을 수 없습니다."
+        )
+
+    return StreamingResponse(
+        stream_process_status(request, process_id, load_snapshot),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
+    )
+
+
 @router.get("/processes", response_model=VirtualFittingProcessListResponse)
 async def get_user_processes(
     page: int = Query(1, ge=1, description="페이지 번호"),
@@ -390,17 +437,33 @@ async def get_fitting_result_image_redis(
 async def get_fitting_history_redis(
     page: int = Query(1, ge=1, description="페이지 번호"),
     per_page: int = Query(20, ge=1, le=50, description="페이지당 항목 수"),
+    cursor: Optional[str] = Query(None, description="다음 페이지 커서 (지정 시 page 대신 사용)"),
+    include_total: Optional[bool] = Query(
+        None, description="전체 개수 포함 여부 (기본: 커서 모드에서는 생략)"
+    ),
     db: Session = Depends(get_db),
     current_user: Users = Depends(get_current_user),
 ):
     """사용자의 가상 피팅 히스토리 조회"""
     skip = (page - 1) * per_page
 
+    try:
+        cursor_values = decode_cursor(cursor, HISTORY_CURSOR_KEY)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if include_total is None:
+        include_total = cursor_values is None
+
     results, total = VirtualFittingCRUD.get_user_fitting_results(
-        db=db, user_id=current_user.user_id, skip=skip, limit=per_page
+        db=db,
+        user_id=current_user.user_id,
+        skip=skip,
+        limit=per_page,
+        cursor=cursor_values,
+        include_total=include_total,
     )
 
-    total_pages = (total + per_page - 1) // per_page
+    total_pages = (total + per_page - 1) // per_page if total is not None else None
 
     return VirtualFittingListResponse(
         fittings=[
@@ -416,6 +479,9 @@ async def get_fitting_history_redis(
         page=page,
         per_page=per_page,
         total_pages=total_pages,
+        next_cursor=next_cursor(
+            results, per_page, HISTORY_CURSOR_KEY, ["created_at", "fitting_id"]
+        ),
     )
 
 
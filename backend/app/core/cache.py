@@ -0,0 +1,222 @@
+"""
+읽기 캐시 (프로세스 내 LRU + Redis 2단계)
+
+@cached로 감싼 함수의 결과를 인자 기준으로 보관한다.
+1) 프로세스 메모리(LRU)  2) Redis  3) 원래 함수(DB) 순으로 조회하며,
+값은 JSON으로 저장하므로 ORM 객체가 아닌 dict/list를 반환하는 함수에만 사용한다.
+
+태그별 버전 번호가 캐시 키에 포함되어, invalidate_tags("catalog")로 버전을 올리면
+그 태그를 가진 모든 항목이 모든 서버에서 한 번에 무효화된다.
+"""
+
+import os
+import json
+import time
+import hashlib
+import inspect
+import logging
+import functools
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.redis_config import redis_manager
+
+logger = logging.getLogger(__name__)
+
+# 상품 데이터(clothing_items)에 의존하는 캐시 태그
+CATALOG_TAG = "catalog"
+
+_MISSING = object()
+
+
+class CacheMetrics:
+    """네임스페이스별 적중/실패 카운터"""
+
+    def __init__(self):
+        self._counts: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def incr(self, namespace: str, name: str):
+        with self._lock:
+            counts = self._counts.setdefault(
+                namespace, {"local_hits": 0, "redis_hits": 0, "misses": 0, "errors": 0}
+            )
+            counts[name] += 1
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            result = {}
+            for namespace, counts in self._counts.items():
+                hits = counts["local_hits"] + counts["redis_hits"]
+                total = hits + counts["misses"]
+                result[namespace] = {**counts, "hit_rate": round(hits / total, 4) if total else None}
+            return result
+
+
+class CacheBackend:
+    def __init__(self):
+        self.enabled = os.getenv("CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.local_max_items = int(os.getenv("CACHE_LOCAL_MAX_ITEMS", 2048))
+        # 태그 버전을 Redis에서 다시 읽는 주기(초), 다른 서버의 무효화가 반영되기까지의 최대 지연
+        self.tag_refresh = float(os.getenv("CACHE_TAG_REFRESH_SECONDS", 1.0))
+        self.key_prefix = "cache"
+        self.metrics = CacheMetrics()
+
+        self._local: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._tag_versions: Dict[str, Tuple[float, str]] = {}
+        self._lock = threading.Lock()
+
+    # ===== 태그 =====
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.key_prefix}:tag:{tag}"
+
+    def tag_versions(self, tags: Iterable[str]) -> List[str]:
+        """태그별 현재 버전 (짧은 주기로 로컬 보관)"""
+        tags = list(tags)
+        now = time.time()
+        stale = [t for t in tags if t not in self._tag_versions or now - self._tag_versions[t][0] >= self.tag_refresh]
+
+        if stale:
+            redis_client = redis_manager.get_client()
+            values = [None] * len(stale)
+            if redis_client:
+                try:
+                    values = redis_client.mget([self._tag_key(t) for t in stale])
+                except Exception as e:
+                    logger.warning(f"캐시 태그 버전 조회 실패: {e}")
+            for tag, value in zip(stale, values):
+                previous = self._tag_versions.get(tag, (0, "0"))[1]
+                # Redis를 쓸 수 없으면 이 프로세스의 버전을 유지
+                self._tag_versions[tag] = (now, value if value is not None else previous)
+
+        return [self._tag_versions[t][1] for t in tags]
+
+    def invalidate_tags(self, *tags: str):
+        """태그 버전을 올려 해당 태그의 모든 캐시 항목 무효화"""
+        redis_client = redis_manager.get_client()
+        for tag in tags:
+            version = None
+            if redis_client:
+                try:
+                    version = str(redis_client.incr(self._tag_key(tag)))
+                except Exception as e:
+                    logger.warning(f"캐시 태그 무효화 실패 ({tag}): {e}")
+            if version is None:
+                version = str(int(self._tag_versions.get(tag, (0, "0"))[1]) + 1)
+            self._tag_versions[tag] = (time.time(), version)
+        logger.info(f"캐시 무효화: {', '.join(tags)}")
+
+    # ===== 로컬 LRU =====
+
+    def _local_get(self, key: str) -> Any:
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at < time.time():
+                del self._local[key]
+                return _MISSING
+            self._local.move_to_end(key)
+            return value
+
+    def _local_set(self, key: str, value: Any, ttl: int):
+        with self._lock:
+            self._local[key] = (time.time() + ttl, value)
+            self._local.move_to_end(key)
+            while len(self._local) > self.local_max_items:
+                self._local.popitem(last=False)
+
+    # ===== 조회 =====
+
+    def get_or_load(self, namespace: str, key: str, ttl: int, loader: Callable[[], Any]) -> Any:
+        """로컬 → Redis → loader 순 조회"""
+        value = self._local_get(key)
+        if value is not _MISSING:
+            self.metrics.incr(namespace, "local_hits")
+            return value
+
+        redis_client = redis_manager.get_client()
+        if redis_client:
+            try:
+                raw = redis_client.get(key)
+                if raw is not None:
+                    value = json.loads(raw)
+                    self._local_set(key, value, ttl)
+                    self.metrics.incr(namespace, "redis_hits")
+                    return value
+            except Exception as e:
+                self.metrics.incr(namespace, "errors")
+                logger.warning(f"Redis 캐시 조회 실패 ({namespace}): {e}")
+
+        self.metrics.incr(namespace, "misses")
+        value = loader()
+
+        # JSON 왕복으로 Redis에서 읽은 값과 같은 형태(list/dict/str)로 맞춤
+        raw = json.dumps(value, ensure_ascii=False, default=str)
+        value = json.loads(raw)
+        self._local_set(key, value, ttl)
+        if redis_client:
+            try:
+                redis_client.set(key, raw, ex=ttl)
+            except Exception as e:
+                self.metrics.incr(namespace, "errors")
+                logger.warning(f"Redis 캐시 저장 실패 ({namespace}): {e}")
+        return value
+
+    def make_key(self, namespace: str, args: Dict[str, Any], tags: Iterable[str]) -> str:
+        versions = self.tag_versions(tags)
+        payload = json.dumps(args, sort_keys=True, ensure_ascii=False, default=str)
+        digest = hashlib.sha1(payload.encode()).hexdigest()
+        return f"{self.key_prefix}:{namespace}:{'.'.join(versions)}:{digest}"
+
+    def clear_local(self):
+        with self._lock:
+            self._local.clear()
+
+
+# 전역 캐시 인스턴스
+cache_backend = CacheBackend()
+
+
+def cached(namespace: str, ttl: int = 300, tags: Iterable[str] = ()):
+    """읽기 캐시 데코레이터 (DB 세션 인자는 키에서 제외, 반환값은 JSON 직렬화 가능해야 함)"""
+    tags = tuple(tags)
+
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not cache_backend.enabled:
+                return func(*args, **kwargs)
+
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key_args = {name: value for name, value in bound.arguments.items() if not isinstance(value, Session)}
+
+            key = cache_backend.make_key(namespace, key_args, tags)
+            return cache_backend.get_or_load(namespace, key, ttl, lambda: func(*args, **kwargs))
+
+        wrapper.uncached = func
+        return wrapper
+
+    return decorator
+
+
+def invalidate_tags(*tags: str):
+    """태그 무효화 (모듈 함수 단축형)"""
+    cache_backend.invalidate_tags(*tags)
+
+
+def get_cache_metrics() -> Dict[str, Any]:
+    """네임스페이스별 적중률 등 캐시 지표"""
+    return {
+        "enabled": cache_backend.enabled,
+        "local_items": len(cache_backend._local),
+        "namespaces": cache_backend.metrics.snapshot(),
+    }
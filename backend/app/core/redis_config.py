@@ -1,5 +1,6 @@
 import os
 import redis
+import redis.asyncio as redis_async
 from typing import Optional
 import json
 import logging
@@ -9,8 +10,18 @@ logger = logging.getLogger(__name__)
 class RedisManager:
     def __init__(self):
         self.redis_client: Optional[redis.Redis] = None
+        self.async_client: Optional[redis_async.Redis] = None
         self._connect()
     
+    def _connection_kwargs(self) -> dict:
+        """환경변수 기반 Redis 연결 설정 (동기/비동기 클라이언트 공통)"""
+        return {
+            "decode_responses": True,
+            "socket_connect_timeout": 5,
+            "socket_timeout": 5,
+            "retry_on_timeout": True,
+        }
+
     def _connect(self):
         """Redis 연결 설정"""
         try:
@@ -23,13 +34,7 @@ class RedisManager:
             
             if redis_url:
                 # Redis URL이 있는 경우 (Upstash 등)
-                self.redis_client = redis.from_url(
-                    redis_url,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                    retry_on_timeout=True
-                )
+                self.redis_client = redis.from_url(redis_url, **self._connection_kwargs())
             else:
                 # 개별 설정으로 연결
                 self.redis_client = redis.Redis(
@@ -37,10 +42,7 @@ class RedisManager:
                     port=redis_port,
                     password=redis_password,
                     db=redis_db,
-                    decode_responses=True,
-                    socket_connect_timeout=5,
-                    socket_timeout=5,
-                    retry_on_timeout=True
+                    **self._connection_kwargs()
                 )
             
             # 연결 테스트
@@ -50,6 +52,25 @@ class RedisManager:
         except Exception as e:
             logger.error(f"Redis 연결 실패: {e}")
             self.redis_client = None
+
+    def get_async_client(self) -> redis_async.Redis:
+        """비동기 Redis 클라이언트 반환 (pub/sub 스트리밍용, 최초 호출 시 생성)"""
+        if self.async_client is None:
+            kwargs = self._connection_kwargs()
+            # 구독 대기는 이벤트 루프에서 타임아웃으로 제어하므로 소켓 읽기 타임아웃 해제
+            kwargs["socket_timeout"] = None
+            redis_url = os.getenv('REDIS_URL')
+            if redis_url:
+                self.async_client = redis_async.from_url(redis_url, **kwargs)
+            else:
+                self.async_client = redis_async.Redis(
+                    host=os.getenv('REDIS_HOST', 'localhost'),
+                    port=int(os.getenv('REDIS_PORT', 6379)),
+                    password=os.getenv('REDIS_PASSWORD'),
+                    db=int(os.getenv('REDIS_DB', 0)),
+                    **kwargs
+                )
+        return self.async_client
     
     def is_connected(self) -> bool:
         """Redis 연결 상태 확인"""
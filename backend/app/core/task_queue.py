@@ -1,6 +1,8 @@
+import os
 import json
 import uuid
 import time
+import random
 from typing import Dict, Any, Optional, List
 from datetime import datetime, timezone
 import pytz
@@ -9,12 +11,87 @@ from .redis_config import redis_manager
 
 logger = logging.getLogger(__name__)
 
+# 작업 타입별 서브 큐 가중치 (클수록 먼저 꺼내질 확률이 높음)
+# 짧은 작업(빠른 피팅)이 수 분짜리 diffusion 작업 뒤에서 기다리지 않도록 함
+QUEUE_PRIORITIES = {
+    "fast_fitting": 6,
+    "background_custom": 4,
+    "virtual_fitting": 1,
+}
+DEFAULT_QUEUE_PRIORITY = 1
+
+# 신뢰 큐 모드 (BLMOVE로 처리 중 리스트에 옮긴 뒤 완료 시 ack, 워커가 죽으면 리스가 만료되어 재투입)
+RELIABLE_QUEUE = os.getenv("TASK_QUEUE_RELIABLE", "true").lower() in ("1", "true", "yes")
+# 리스 유효 시간 (이 시간 동안 하트비트가 없으면 워커가 죽은 것으로 간주)
+VISIBILITY_TIMEOUT = int(os.getenv("TASK_VISIBILITY_TIMEOUT", 120))
+# 최대 시도 횟수 (초과 시 FAILED 처리)
+MAX_ATTEMPTS = int(os.getenv("TASK_MAX_ATTEMPTS", 3))
+
+# 만료된 작업 회수 (처리 중 리스트에서 제거에 성공한 쪽만 재투입하여 워커 간 중복 방지)
+# KEYS: processing_list, leases, inflight, target_queue / ARGV: old_raw, new_raw, task_id
+REAP_SCRIPT = """
+if redis.call('LREM', KEYS[1], 1, ARGV[1]) == 0 then
+    return 0
+end
+redis.call('ZREM', KEYS[2], ARGV[3])
+redis.call('HDEL', KEYS[3], ARGV[3])
+if ARGV[2] ~= '' then
+    redis.call('RPUSH', KEYS[4], ARGV[2])
+end
+return 1
+"""
+
 class TaskQueue:
-    def __init__(self, queue_name: str = "virtual_fitting_queue"):
+    def __init__(self, queue_name: str = "virtual_fitting_queue", priorities: Optional[Dict[str, int]] = None):
         self.queue_name = queue_name
+        self.priorities = priorities or QUEUE_PRIORITIES
         self.processing_set = f"{queue_name}:processing"
+        # 신뢰 큐 모드용 키
+        self.reliable = RELIABLE_QUEUE
+        self.processing_list = f"{queue_name}:processing_list"
+        self.lease_key = f"{queue_name}:leases"        # sorted set: task_id -> 리스 만료 시각
+        self.inflight_key = f"{queue_name}:inflight"   # hash: task_id -> 처리 중 리스트의 원본 payload
         self.result_prefix = f"{queue_name}:result"
         self.status_prefix = f"{queue_name}:status"
+        self.events_prefix = f"{queue_name}:events"  # pub/sub 채널 (프로세스별 상태 이벤트)
+
+    def events_channel(self, process_id: int) -> str:
+        """프로세스별 상태 이벤트 채널"""
+        return f"{self.events_prefix}:{process_id}"
+
+    def publish_event(self, process_id: Optional[int], event: Dict[str, Any]):
+        """상태 이벤트 발행 (구독자가 없으면 버려짐)"""
+        if process_id is None:
+            return
+        redis_client = redis_manager.get_client()
+        if not redis_client:
+            return
+        try:
+            redis_client.publish(self.events_channel(process_id), json.dumps(event))
+        except Exception as e:
+            logger.error(f"상태 이벤트 발행 실패: {e}")
+
+    def publish_progress(self, process_id: int, progress: int, message: Optional[str] = None):
+        """처리 진행률 이벤트 발행 (서비스에서 단계별로 호출)"""
+        self.publish_event(process_id, {
+            "process_id": process_id,
+            "status": "PROCESSING",
+            "progress": progress,
+            "message": message,
+            "updated_at": datetime.now(pytz.timezone('Asia/Seoul')).isoformat()
+        })
+
+    def sub_queue_name(self, task_type: str) -> str:
+        """작업 타입별 서브 큐 키"""
+        return f"{self.queue_name}:{task_type}"
+
+    def _weighted_order(self, task_types: List[str]) -> List[str]:
+        """가중치 기반 무작위 순서 (높은 우선순위가 대체로 앞서되 낮은 쪽도 굶지 않도록)"""
+        def sort_key(task_type: str) -> float:
+            weight = self.priorities.get(task_type, DEFAULT_QUEUE_PRIORITY)
+            return random.random() ** (1.0 / max(weight, 1))
+
+        return sorted(task_types, key=sort_key, reverse=True)
         
     def enqueue_task(self, task_type: str, task_data: Dict[str, Any]) -> Optional[str]:
         """작업을 큐에 추가"""
@@ -33,15 +110,27 @@ class TaskQueue:
                 "status": "QUEUED"
             }
             
-            # 작업을 큐에 추가
-            redis_client.lpush(self.queue_name, json.dumps(task))
+            # 작업 타입별 서브 큐에 추가
+            redis_client.lpush(self.sub_queue_name(task_type), json.dumps(task))
             
-            # 작업 상태 저장
+            # 작업 상태 저장 (이벤트 채널을 찾을 수 있도록 process_id, 조회 권한 확인용 user_id 보관)
+            process_id = task_data.get("process_id")
             redis_client.setex(
                 f"{self.status_prefix}:{task_id}",
                 3600 * 24,  # 24시간 TTL
-                json.dumps({"status": "QUEUED", "created_at": task["created_at"]})
+                json.dumps({
+                    "status": "QUEUED",
+                    "created_at": task["created_at"],
+                    "process_id": process_id,
+                    "user_id": task_data.get("user_id"),
+                })
             )
+            self.publish_event(process_id, {
+                "task_id": task_id,
+                "process_id": process_id,
+                "status": "QUEUED",
+                "updated_at": task["created_at"]
+            })
             
             logger.info(f"작업 큐에 추가됨: {task_id}")
             return task_id
@@ -50,31 +139,169 @@ class TaskQueue:
             logger.error(f"작업 큐 추가 실패: {e}")
             return None
     
-    def dequeue_task(self, timeout: int = 10) -> Optional[Dict[str, Any]]:
-        """큐에서 작업 가져오기 (블로킹)"""
+    def dequeue_task(self, timeout: int = 10, task_types: Optional[List[str]] = None) -> Optional[Dict[str, Any]]:
+        """큐에서 작업 가져오기 (블로킹, 지정한 타입의 서브 큐만 가중치 순으로 조회)"""
         redis_client = redis_manager.get_client()
         if not redis_client:
             return None
         
         try:
-            # 블로킹 방식으로 작업 가져오기
-            result = redis_client.brpop(self.queue_name, timeout=timeout)
-            if not result:
+            types = task_types if task_types is not None else list(self.priorities.keys())
+            if not types:
+                return None
+            keys = [self.sub_queue_name(t) for t in self._weighted_order(types)]
+
+            if self.reliable:
+                raw = self._move_to_processing(redis_client, keys, timeout)
+            else:
+                # 블로킹 방식으로 작업 가져오기 (BRPOP은 앞선 키부터 확인)
+                result = redis_client.brpop(keys, timeout=timeout)
+                raw = result[1] if result else None
+            if not raw:
                 return None
             
-            task_data = json.loads(result[1])
+            task_data = json.loads(raw)
             task_id = task_data["id"]
+
+            if self.reliable:
+                # 리스 부여 (이후 하트비트로 연장)
+                redis_client.zadd(self.lease_key, {task_id: time.time() + VISIBILITY_TIMEOUT})
+                redis_client.hset(self.inflight_key, task_id, raw)
             
             # 처리 중 상태로 변경
             redis_client.sadd(self.processing_set, task_id)
-            self.update_task_status(task_id, "PROCESSING")
+            self.update_task_status(task_id, "PROCESSING", {"attempts": task_data.get("attempts", 0) + 1})
             
             return task_data
             
         except Exception as e:
             logger.error(f"작업 큐에서 가져오기 실패: {e}")
             return None
+
+    def _move_to_processing(self, redis_client, keys: List[str], timeout: int) -> Optional[str]:
+        """서브 큐에서 처리 중 리스트로 원자적으로 이동 (꺼낸 순간 유실되지 않음)"""
+        deadline = time.time() + timeout
+        while True:
+            # 가중치 순으로 비블로킹 확인
+            for key in keys:
+                raw = redis_client.lmove(key, self.processing_list, "RIGHT", "LEFT")
+                if raw:
+                    return raw
+
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return None
+            # BLMOVE는 키 하나만 대기 가능하므로 가장 우선인 키에서 짧게 대기 후 다시 전체 확인
+            raw = redis_client.blmove(keys[0], self.processing_list, min(remaining, 1), "RIGHT", "LEFT")
+            if raw:
+                return raw
+            if time.time() >= deadline:
+                return None
+
+    def heartbeat(self, task_ids: List[str]) -> None:
+        """처리 중인 작업의 리스 연장"""
+        if not self.reliable or not task_ids:
+            return
+        redis_client = redis_manager.get_client()
+        if not redis_client:
+            return
+
+        try:
+            expires_at = time.time() + VISIBILITY_TIMEOUT
+            # XX: 이미 회수된 작업의 리스를 되살리지 않음
+            redis_client.zadd(self.lease_key, {task_id: expires_at for task_id in task_ids}, xx=True)
+        except Exception as e:
+            logger.error(f"리스 연장 실패: {e}")
+
+    def ack_task(self, task_id: str) -> None:
+        """처리가 끝난 작업을 처리 중 리스트에서 제거"""
+        if not self.reliable:
+            return
+        redis_client = redis_manager.get_client()
+        if not redis_client:
+            return
+
+        try:
+            raw = redis_client.hget(self.inflight_key, task_id)
+            pipe = redis_client.pipeline()
+            if raw:
+                pipe.lrem(self.processing_list, 1, raw)
+            pipe.zrem(self.lease_key, task_id)
+            pipe.hdel(self.inflight_key, task_id)
+            pipe.execute()
+        except Exception as e:
+            logger.error(f"작업 ack 실패: {e}")
+
+    def reap_expired(self) -> List[Dict[str, Any]]:
+        """리스가 만료된 작업을 큐로 되돌림 (최대 시도 초과 시 FAILED 처리 후 반환)"""
+        if not self.reliable:
+            return []
+        redis_client = redis_manager.get_client()
+        if not redis_client:
+            return []
+
+        dead_tasks = []
+        try:
+            now = time.time()
+            reap = redis_client.register_script(REAP_SCRIPT)
+
+            for raw in redis_client.lrange(self.processing_list, 0, -1):
+                task = json.loads(raw)
+                task_id = task["id"]
+
+                expires_at = redis_client.zscore(self.lease_key, task_id)
+                if expires_at is None:
+                    # 이동 직후 리스 부여 전에 워커가 죽은 경우: 지금부터 유예 시간 부여
+                    redis_client.zadd(self.lease_key, {task_id: now + VISIBILITY_TIMEOUT}, nx=True)
+                    continue
+                if expires_at > now:
+                    continue
+
+                task["attempts"] = task.get("attempts", 0) + 1
+                exhausted = task["attempts"] >= MAX_ATTEMPTS
+                new_raw = "" if exhausted else json.dumps(task)
+                target = self.sub_queue_name(task.get("type", "unknown"))
+
+                if not reap(keys=[self.processing_list, self.lease_key, self.inflight_key, target],
+                            args=[raw, new_raw, task_id]):
+                    continue  # 다른 워커가 먼저 회수함
+
+                if exhausted:
+                    logger.error(f"작업 최대 시도 초과: {task_id} ({task['attempts']}회)")
+                    self.update_task_status(task_id, "FAILED", {
+                        "error": "워커 응답 없음 (최대 시도 횟수 초과)",
+                        "attempts": task["attempts"],
+                    })
+                    dead_tasks.append(task)
+                else:
+                    logger.warning(f"리스 만료 작업 재투입: {task_id} ({task['attempts']}회 시도)")
+                    redis_client.srem(self.processing_set, task_id)
+                    self.update_task_status(task_id, "QUEUED", {"attempts": task["attempts"]})
+
+        except Exception as e:
+            logger.error(f"만료 작업 회수 실패: {e}")
+
+        return dead_tasks
     
+    def requeue_task(self, task: Dict[str, Any]) -> bool:
+        """가져간 작업을 처리하지 않고 큐로 되돌림 (다음에 가장 먼저 처리)"""
+        redis_client = redis_manager.get_client()
+        if not redis_client:
+            return False
+
+        try:
+            # 오른쪽에서 꺼내므로 오른쪽에 다시 넣어 순서 유지
+            redis_client.rpush(self.sub_queue_name(task["type"]), json.dumps(task))
+            self.ack_task(task["id"])
+            redis_client.srem(self.processing_set, task["id"])
+            self.update_task_status(task["id"], "QUEUED")
+            logger.info(f"작업 큐로 되돌림: {task['id']}")
+            return True
+
+        except Exception as e:
+            logger.error(f"작업 되돌리기 실패: {e}")
+            return False
+
     def update_task_status(self, task_id: str, status: str, result_data: Optional[Dict] = None):
         """작업 상태 업데이트"""
         redis_client = redis_manager.get_client()
@@ -82,19 +309,28 @@ class TaskQueue:
             return
         
         try:
+            status_key = f"{self.status_prefix}:{task_id}"
+            previous = json.loads(redis_client.get(status_key) or "{}")
+            process_id = previous.get("process_id")
+
             status_data = {
                 "status": status,
-                "updated_at": datetime.now(pytz.timezone('Asia/Seoul')).isoformat()
+                "updated_at": datetime.now(pytz.timezone('Asia/Seoul')).isoformat(),
+                "process_id": process_id,
+                "user_id": previous.get("user_id"),
             }
             
             if result_data:
                 status_data.update(result_data)
             
             redis_client.setex(
-                f"{self.status_prefix}:{task_id}",
+                status_key,
                 3600 * 24,  # 24시간 TTL
                 json.dumps(status_data)
             )
+
+            # 상태 스트림 구독자에게 알림
+            self.publish_event(process_id, {"task_id": task_id, **status_data})
             
             # 완료되거나 실패한 경우 처리 중 세트에서 제거
             if status in ["COMPLETED", "FAILED"]:
@@ -119,14 +355,40 @@ class TaskQueue:
             logger.error(f"작업 상태 조회 실패: {e}")
             return None
     
-    def get_queue_info(self) -> Dict[str, int]:
-        """큐 정보 조회"""
+    def migrate_legacy_queue(self) -> int:
+        """단일 큐(queue_name)에 남아 있는 기존 작업을 타입별 서브 큐로 이동"""
+        redis_client = redis_manager.get_client()
+        if not redis_client:
+            return 0
+
+        moved = 0
+        try:
+            while True:
+                raw = redis_client.rpop(self.queue_name)
+                if raw is None:
+                    break
+                task = json.loads(raw)
+                # 오래된 작업부터 꺼내므로 서브 큐 왼쪽에 넣어 기존 순서 유지
+                redis_client.lpush(self.sub_queue_name(task.get("type", "unknown")), raw)
+                moved += 1
+            if moved:
+                logger.info(f"기존 큐 작업 {moved}개를 서브 큐로 이동")
+        except Exception as e:
+            logger.error(f"기존 큐 작업 이동 실패: {e}")
+        return moved
+
+    def get_queue_info(self) -> Dict[str, Any]:
+        """큐 정보 조회 (서브 큐별 대기 수 포함)"""
         redis_client = redis_manager.get_client()
         if not redis_client:
-            return {"queued": 0, "processing": 0}
+            return {"queued": 0, "processing": 0, "queues": {}}
         
         try:
-            queued = redis_client.llen(self.queue_name)
+            queues = {
+                task_type: redis_client.llen(self.sub_queue_name(task_type))
+                for task_type in self.priorities
+            }
+            queued = sum(queues.values())
             # processing 집합 청소: PROCESSING 상태가 아닌 항목 제거
             processing_ids = list(redis_client.smembers(self.processing_set) or [])
             valid_processing = 0
@@ -146,11 +408,11 @@ class TaskQueue:
                 else:
                     # 상태 정보가 없으면 정리
                     redis_client.srem(self.processing_set, task_id)
-            return {"queued": queued, "processing": valid_processing}
+            return {"queued": queued, "processing": valid_processing, "queues": queues}
             
         except Exception as e:
             logger.error(f"큐 정보 조회 실패: {e}")
-            return {"queued": 0, "processing": 0}
+            return {"queued": 0, "processing": 0, "queues": {}}
 
 # 전역 작업 큐 인스턴스
 task_queue = TaskQueue()
@@ -1,8 +1,20 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import desc, asc
+from sqlalchemy import desc, asc, func
 from app.models.clothing_items import ClothingItems
 from app.schemas.clothing_items import ClothingItemCreate
-from typing import Optional
+from typing import Any, List, Optional
+from app.utils.pagination import keyset_filter
+from app.crud.search import apply_search
+from app.utils.catalog_facets import catalog_facet_index, FACET_FIELDS
+from app.core.cache import cached, CATALOG_TAG
+import os
+
+# 상품 읽기 캐시 보관 시간(초), 상품 적재/생성 시에는 catalog 태그로 즉시 무효화
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", 300))
+
+def _to_dict(item: ClothingItems) -> dict:
+    """캐시 저장용 dict 변환"""
+    return {column.name: getattr(item, column.name) for column in ClothingItems.__table__.columns}
 
 def get_clothing_items(
     db: Session, 
@@ -44,6 +56,21 @@ def get_clothing_items(
     
     return items, total
 
+# 검색 대상 컬럼 (FULLTEXT 인덱스 컬럼 순서와 같아야 함)
+SEARCH_COLUMNS = (ClothingItems.product_name, ClothingItems.brand_name)
+
+# 브라우징 정렬 기준별 정렬 컬럼 (마지막은 커서 동률 처리용 product_id)
+BROWSE_SORT_COLUMNS = {
+    "likes": (ClothingItems.likes, ClothingItems.product_id),
+    "latest": (ClothingItems.product_id,),
+    "name": (ClothingItems.product_name, ClothingItems.product_id),
+}
+
+def get_browse_sort_columns(sort_by: str):
+    """브라우징 정렬 컬럼 조회 (알 수 없는 기준은 product_id)"""
+    return BROWSE_SORT_COLUMNS.get(sort_by, (ClothingItems.product_id,))
+
+@cached("clothing_browse", ttl=CATALOG_CACHE_TTL, tags=[CATALOG_TAG])
 def get_clothing_items_with_filters(
     db: Session,
     skip: int = 0,
@@ -54,11 +81,11 @@ def get_clothing_items_with_filters(
     sub_category: Optional[str] = None,
     gender: Optional[str] = None,
     brand: Optional[str] = None,
-    search: Optional[str] = None
+    search: Optional[str] = None,
+    cursor: Optional[List[Any]] = None,
+    include_total: bool = True
 ):
-    """필터와 검색을 포함한 의류 아이템 목록 조회"""
-    from sqlalchemy import or_
-    
+    """필터와 검색을 포함한 의류 아이템 목록 조회 (cursor가 있으면 OFFSET 대신 keyset 조회, 캐시됨)"""
     query = db.query(ClothingItems)
     
     # 필터링
@@ -71,62 +98,77 @@ def get_clothing_items_with_filters(
     if brand:
         query = query.filter(ClothingItems.brand_name == brand)
     if search:
-        search_filter = or_(
-            ClothingItems.product_name.contains(search),
-            ClothingItems.brand_name.contains(search)
-        )
-        query = query.filter(search_filter)
+        # 브라우징은 사용자가 고른 정렬을 유지하므로 관련도 점수는 쓰지 않음
+        query, _ = apply_search(query, db, "clothing_items", SEARCH_COLUMNS, search)
+    
+    # 전체 개수는 정렬/커서와 무관하므로 필요할 때만 먼저 계산
+    total = query.count() if include_total else None
     
     # 정렬
-    if sort_by == "likes":
-        if order == "desc":
-            query = query.order_by(desc(ClothingItems.likes))
-        else:
-            query = query.order_by(asc(ClothingItems.likes))
-    elif sort_by == "latest":
-        if order == "desc":
-            query = query.order_by(desc(ClothingItems.product_id))
-        else:
-            query = query.order_by(asc(ClothingItems.product_id))
-    elif sort_by == "name":
-        if order == "desc":
-            query = query.order_by(desc(ClothingItems.product_name))
-        else:
-            query = query.order_by(asc(ClothingItems.product_name))
+    descending = order == "desc"
+    columns = get_browse_sort_columns(sort_by)
+    if cursor is not None:
+        query = query.filter(keyset_filter(columns, cursor, descending))
+    query = query.order_by(*[desc(c) if descending else asc(c) for c in columns])
     
-    total = query.count()
-    items = query.offset(skip).limit(limit).all()
+    if cursor is not None:
+        items = query.limit(limit).all()
+    else:
+        items = query.offset(skip).limit(limit).all()
     
-    return items, total
+    return [_to_dict(item) for item in items], total
 
 def get_categories(db: Session):
-    """카테고리 정보 조회"""
-    # 메인 카테고리 조회
-    main_categories = db.query(ClothingItems.main_category).distinct().all()
-    main_categories = [cat[0] for cat in main_categories if cat[0]]
-    
-    # 서브 카테고리 조회
-    sub_categories = db.query(ClothingItems.sub_category).distinct().all()
-    sub_categories = [cat[0] for cat in sub_categories if cat[0]]
+    """카테고리 정보 조회 (캐시된 패싯 집계 사용)"""
+    facets = catalog_facet_index.facet_counts(db, {})
+    brand_counts = facets["brand_name"]
     
-    # 성별 조회
-    genders = db.query(ClothingItems.gender).distinct().all()
-    genders = [gender[0] for gender in genders if gender[0]]
-    
-    # 브랜드 조회 (상위 50개)
-    brands = db.query(ClothingItems.brand_name).distinct().limit(50).all()
-    brands = [brand[0] for brand in brands if brand[0]]
+    # 브랜드는 상품 수 상위 50개
+    top_brands = sorted(brand_counts, key=lambda brand: brand_counts[brand], reverse=True)[:50]
     
     return {
-        "main_categories": sorted(main_categories),
-        "sub_categories": sorted(sub_categories),
-        "genders": sorted(genders),
-        "brands": sorted(brands)
+        "main_categories": sorted(facets["main_category"]),
+        "sub_categories": sorted(facets["sub_category"]),
+        "genders": sorted(facets["gender"]),
+        "brands": sorted(top_brands),
+        "counts": {
+            "main_categories": facets["main_category"],
+            "sub_categories": facets["sub_category"],
+            "genders": facets["gender"],
+            "brands": {brand: brand_counts[brand] for brand in top_brands}
+        }
+    }
+
+def get_browse_facets(
+    db: Session,
+    main_category: Optional[str] = None,
+    sub_category: Optional[str] = None,
+    gender: Optional[str] = None,
+    brand: Optional[str] = None,
+    search: Optional[str] = None
+):
+    """브라우징 필터 기준 패싯 개수 (검색어가 있으면 검색 결과만 집계)"""
+    filters = {
+        "main_category": main_category,
+        "sub_category": sub_category,
+        "gender": gender,
+        "brand_name": brand
     }
+    if not search:
+        return catalog_facet_index.facet_counts(db, filters)
+    
+    # 검색 결과는 캐시된 집계로 알 수 없으므로 검색 조건으로 한 번 집계
+    columns = [getattr(ClothingItems, field) for field in FACET_FIELDS]
+    query = db.query(*columns, func.count(ClothingItems.product_id))
+    query, _ = apply_search(query, db, "clothing_items", SEARCH_COLUMNS, search)
+    rows = [list(row) for row in query.group_by(*columns).all()]
+    return catalog_facet_index.count_rows(rows, filters)
 
+@cached("clothing_item", ttl=CATALOG_CACHE_TTL, tags=[CATALOG_TAG])
 def get_clothing_item_by_id(db: Session, product_id: int):
-    """특정 의류 아이템 조회"""
-    return db.query(ClothingItems).filter(ClothingItems.product_id == product_id).first()
+    """특정 의류 아이템 조회 (캐시됨, 없으면 None)"""
+    item = db.query(ClothingItems).filter(ClothingItems.product_id == product_id).first()
+    return _to_dict(item) if item else None
 
 def create_clothing_item(db: Session, clothing_item: ClothingItemCreate):
     """의류 아이템 생성"""
@@ -134,24 +176,30 @@ def create_clothing_item(db: Session, clothing_item: ClothingItemCreate):
     db.add(db_item)
     db.commit()
     db.refresh(db_item)
+    catalog_facet_index.invalidate()
     return db_item
 
+@cached("clothing_popular", ttl=CATALOG_CACHE_TTL, tags=[CATALOG_TAG])
 def get_popular_items(db: Session, limit: int = 6):
-    """인기 상품 조회 (좋아요 순)"""
-    return db.query(ClothingItems).order_by(desc(ClothingItems.likes)).limit(limit).all()
+    """인기 상품 조회 (좋아요 순, 캐시됨)"""
+    items = db.query(ClothingItems).order_by(desc(ClothingItems.likes)).limit(limit).all()
+    return [_to_dict(item) for item in items]
 
+@cached("clothing_latest", ttl=CATALOG_CACHE_TTL, tags=[CATALOG_TAG])
 def get_latest_items(db: Session, limit: int = 6):
-    """최신 상품 조회 (등록순)"""
-    return db.query(ClothingItems).order_by(desc(ClothingItems.product_id)).limit(limit).all()
+    """최신 상품 조회 (등록순, 캐시됨)"""
+    items = db.query(ClothingItems).order_by(desc(ClothingItems.product_id)).limit(limit).all()
+    return [_to_dict(item) for item in items]
 
 def search_clothing_items(db: Session, query: str, skip: int = 0, limit: int = 20):
-    """의류 아이템 검색"""
-    search_query = db.query(ClothingItems).filter(
-        ClothingItems.product_name.contains(query) |
-        ClothingItems.brand_name.contains(query)
+    """의류 아이템 검색 (FULLTEXT 사용 시 관련도순)"""
+    search_query, score = apply_search(
+        db.query(ClothingItems), db, "clothing_items", SEARCH_COLUMNS, query
     )
     
     total = search_query.count()
+    if score is not None:
+        search_query = search_query.order_by(desc(score), desc(ClothingItems.likes), desc(ClothingItems.product_id))
     items = search_query.offset(skip).limit(limit).all()
     
     return items, total
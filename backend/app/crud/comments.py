@@ -1,12 +1,17 @@
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, func
-from typing import List, Optional
+from typing import Any, List, Optional
 from app.models.feed_comments import FeedComments
 from app.models.users import Users
 from app.schemas.comments import CommentCreate, CommentUpdate
+from app.crud.feed_counters import increment_comment_count
+from app.utils.pagination import keyset_filter, next_cursor
 from datetime import datetime, timezone
 import pytz
 
+# 최상위 댓글 커서 정렬 기준 (created_at, comment_id 오름차순)
+COMMENT_CURSOR_KEY = "comments:created_at"
+
 def get_comment_by_id(db: Session, comment_id: int) -> Optional[FeedComments]:
     """댓글 ID로 댓글 조회 (사용자 정보 포함)"""
     try:
@@ -43,18 +48,29 @@ def get_top_level_comments(
     db: Session, 
     feed_id: int, 
     skip: int = 0, 
-    limit: int = 20
+    limit: int = 20,
+    cursor: Optional[List[Any]] = None
 ) -> List[FeedComments]:
     """최상위 댓글만 조회 (parent_id가 None인 댓글들, 사용자 정보 포함)"""
     try:
-        return db.query(FeedComments).options(
+        query = db.query(FeedComments).options(
             joinedload(FeedComments.user)
         ).filter(
             and_(
                 FeedComments.feed_id == feed_id,
                 FeedComments.parent_id.is_(None)
             )
-        ).order_by(FeedComments.created_at.asc()).offset(skip).limit(limit).all()
+        )
+        
+        sort_columns = (FeedComments.created_at, FeedComments.comment_id)
+        if cursor is not None:
+            # 커서 이후부터 조회 (OFFSET 없이 인덱스 범위 검색)
+            query = query.filter(keyset_filter(sort_columns, cursor, descending=False))
+        query = query.order_by(*[c.asc() for c in sort_columns])
+        
+        if cursor is not None:
+            return query.limit(limit).all()
+        return query.offset(skip).limit(limit).all()
     except Exception as e:
         print(f"❌ 최상위 댓글 조회 오류: {str(e)}")
         return []
@@ -105,6 +121,20 @@ def count_replies_by_parent_id(db: Session, parent_id: int) -> int:
         print(f"❌ 대댓글 수 조회 오류: {str(e)}")
         return 0
 
+def count_descendant_comments(db: Session, comment_id: int) -> int:
+    """댓글의 모든 하위 댓글 수 (답글의 답글 포함, 깊이 단위로 조회)"""
+    total = 0
+    parent_ids = [comment_id]
+    while parent_ids:
+        child_ids = [
+            row[0] for row in db.query(FeedComments.comment_id).filter(
+                FeedComments.parent_id.in_(parent_ids)
+            ).all()
+        ]
+        total += len(child_ids)
+        parent_ids = child_ids
+    return total
+
 def create_comment(
     db: Session, 
     comment: CommentCreate, 
@@ -141,8 +171,9 @@ def create_comment(
         
         print(f"📦 댓글 객체 생성 완료")
         
-        # 데이터베이스에 저장
+        # 데이터베이스에 저장 (피드 댓글 수도 같은 트랜잭션에서 증가)
         db.add(db_comment)
+        increment_comment_count(db, feed_id, 1)
         db.commit()
         db.refresh(db_comment)
         
@@ -201,13 +232,17 @@ def delete_comment(db: Session, comment_id: int, user_id: int) -> bool:
         if db_comment.user_id != user_id:
             raise ValueError("댓글을 삭제할 권한이 없습니다.")
         
+        # 삭제될 하위 댓글 수 (대댓글의 답글까지 DB CASCADE로 함께 지워지는 전체 하위 트리)
+        reply_count = count_descendant_comments(db, comment_id)
+        
         # 먼저 모든 대댓글 삭제
         replies = get_replies_by_parent_id(db, comment_id)
         for reply in replies:
             db.delete(reply)
         
-        # 부모 댓글 삭제
+        # 부모 댓글 삭제 (피드 댓글 수도 같은 트랜잭션에서 감소)
         db.delete(db_comment)
+        increment_comment_count(db, db_comment.feed_id, -(reply_count + 1))
         db.commit()
         return True
     except Exception as e:
@@ -267,16 +302,18 @@ def get_comment_tree_by_feed_id(
     db: Session, 
     feed_id: int, 
     skip: int = 0, 
-    limit: int = 20
-) -> tuple[List[dict], int]:
-    """피드의 댓글을 트리 구조로 조회"""
+    limit: int = 20,
+    cursor: Optional[List[Any]] = None,
+    include_total: bool = True
+) -> tuple[List[dict], Optional[int], Optional[str]]:
+    """피드의 댓글을 트리 구조로 조회 (트리, 최상위 댓글 수, 다음 커서)"""
     try:
         # 최상위 댓글 조회
-        top_comments = get_top_level_comments(db, feed_id, skip, limit)
-        total_top_comments = count_top_level_comments(db, feed_id)
+        top_comments = get_top_level_comments(db, feed_id, skip, limit, cursor)
+        total_top_comments = count_top_level_comments(db, feed_id) if include_total else None
         
         if not top_comments:
-            return [], total_top_comments
+            return [], total_top_comments, None
         
         # 각 최상위 댓글의 대댓글들도 조회
         all_comments = []
@@ -287,8 +324,9 @@ def get_comment_tree_by_feed_id(
         
         # 트리 구조로 변환
         comment_tree = build_comment_tree(all_comments)
+        cursor_token = next_cursor(top_comments, limit, COMMENT_CURSOR_KEY, ["created_at", "comment_id"])
         
-        return comment_tree, total_top_comments
+        return comment_tree, total_top_comments, cursor_token
     except Exception as e:
         print(f"❌ 댓글 트리 조회 오류: {str(e)}")
-        return [], 0
+        return [], 0, None
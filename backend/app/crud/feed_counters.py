@@ -0,0 +1,52 @@
+from sqlalchemy.orm import Session
+from sqlalchemy import func, select
+from typing import List, Optional
+from app.models.feeds import Feeds
+from app.models.liked_feeds import LikedFeeds
+from app.models.feed_comments import FeedComments
+
+def increment_like_count(db: Session, feed_id: int, delta: int) -> None:
+    """피드 좋아요 수 증감 (UPDATE 한 번으로 원자적으로 처리, 커밋은 호출 측 트랜잭션에서)"""
+    db.query(Feeds).filter(Feeds.feed_id == feed_id).update(
+        {Feeds.like_count: func.greatest(Feeds.like_count + delta, 0)},
+        synchronize_session=False
+    )
+
+def increment_comment_count(db: Session, feed_id: int, delta: int) -> None:
+    """피드 댓글 수 증감 (UPDATE 한 번으로 원자적으로 처리, 커밋은 호출 측 트랜잭션에서)"""
+    db.query(Feeds).filter(Feeds.feed_id == feed_id).update(
+        {Feeds.comment_count: func.greatest(Feeds.comment_count + delta, 0)},
+        synchronize_session=False
+    )
+
+def get_like_count(db: Session, feed_id: int) -> int:
+    """저장된 좋아요 수 조회"""
+    return db.query(Feeds.like_count).filter(Feeds.feed_id == feed_id).scalar() or 0
+
+def reconcile_feed_counters(db: Session, feed_ids: Optional[List[int]] = None) -> int:
+    """실제 좋아요/댓글 행 수와 카운터가 다른 피드를 보정하고 보정된 피드 수 반환"""
+    actual_likes = (
+        select(func.count())
+        .where(LikedFeeds.feed_id == Feeds.feed_id)
+        .correlate(Feeds)
+        .scalar_subquery()
+    )
+    actual_comments = (
+        select(func.count())
+        .where(FeedComments.feed_id == Feeds.feed_id)
+        .correlate(Feeds)
+        .scalar_subquery()
+    )
+
+    query = db.query(Feeds).filter(
+        (Feeds.like_count != actual_likes) | (Feeds.comment_count != actual_comments)
+    )
+    if feed_ids:
+        query = query.filter(Feeds.feed_id.in_(feed_ids))
+
+    fixed = query.update(
+        {Feeds.like_count: actual_likes, Feeds.comment_count: actual_comments},
+        synchronize_session=False
+    )
+    db.commit()
+    return fixed
@@ -0,0 +1,116 @@
+"""
+상품/피드 전문 검색 (MySQL FULLTEXT + ngram 파서)
+
+LIKE '%검색어%'는 인덱스를 쓰지 못해 매번 테이블 전체를 읽는다.
+ngram 파서를 쓴 FULLTEXT 인덱스는 띄어쓰기 없는 한국어도 2글자 단위로 색인하며,
+InnoDB가 INSERT/UPDATE 시 색인을 함께 갱신하므로 크롤링 데이터 적재 후 별도 재색인이 필요 없다.
+인덱스가 없거나 검색어가 ngram 토큰보다 짧으면 기존 LIKE 검색으로 대체한다.
+
+ngram 파서는 불용어를 "포함하는" 토큰을 모두 버리므로(기본 불용어에 "a", "i" 등이 있어
+nike, adidas, shirt 같은 영문 단어가 검색되지 않음) 인덱스는 불용어 없이 만들고,
+서버에 불용어가 켜져 있으면 불용어가 들어간 단어는 LIKE로 검색한다.
+"""
+
+import os
+import re
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import inspect, or_, text
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.orm import Query, Session
+
+logger = logging.getLogger(__name__)
+
+# 테이블별 FULLTEXT 인덱스 (이름, 컬럼), 불용어 없이 생성한 인덱스
+FULLTEXT_INDEXES = {
+    "clothing_items": ("ft_clothing_items_search_ns", ("product_name", "brand_name")),
+    "feeds": ("ft_feeds_search_ns", ("title", "content")),
+}
+
+# 기본 불용어로 생성되었던 이전 인덱스 (발견 시 삭제 후 재생성)
+LEGACY_FULLTEXT_INDEXES = {
+    "clothing_items": "ft_clothing_items_search",
+    "feeds": "ft_feeds_search",
+}
+
+# InnoDB 기본 불용어 목록 (INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD)
+DEFAULT_STOPWORDS = (
+    "a", "about", "an", "are", "as", "at", "be", "by", "com", "de", "en", "for",
+    "from", "how", "i", "in", "is", "it", "la", "of", "on", "or", "that", "the",
+    "this", "to", "was", "what", "when", "where", "who", "will", "with", "und", "www",
+)
+
+# MySQL ngram_token_size (기본 2) 보다 짧은 단어는 색인에 없음
+MIN_TOKEN_SIZE = int(os.getenv("FULLTEXT_NGRAM_TOKEN_SIZE", 2))
+
+# 불리언 모드 연산자로 해석되는 문자
+_BOOLEAN_OPERATORS = re.compile(r'[+\-<>()~*"@]')
+
+# 테이블별 인덱스 존재 여부 (프로세스당 한 번 확인)
+_fulltext_available: Dict[str, bool] = {}
+
+# 서버 불용어 사용 여부 (프로세스당 한 번 확인)
+_stopwords_enabled: Optional[bool] = None
+
+
+def set_fulltext_available(table: str, available: bool):
+    """인덱스 존재 여부 기록 (스키마 보완 시 호출)"""
+    _fulltext_available[table] = available
+
+
+def fulltext_available(db: Session, table: str) -> bool:
+    """테이블에 FULLTEXT 인덱스가 있는지 확인"""
+    if table not in _fulltext_available:
+        bind = db.get_bind()
+        available = False
+        if bind.dialect.name == "mysql":
+            try:
+                index_name = FULLTEXT_INDEXES[table][0]
+                available = any(idx["name"] == index_name for idx in inspect(bind).get_indexes(table))
+            except Exception as e:
+                logger.warning(f"FULLTEXT 인덱스 확인 실패 ({table}): {e}")
+        _fulltext_available[table] = available
+    return _fulltext_available[table]
+
+
+def stopwords_enabled(db: Session) -> bool:
+    """서버 전역 innodb_ft_enable_stopword 값 (새 연결의 기본값, 확인 실패 시 켜진 것으로 간주)"""
+    global _stopwords_enabled
+    if _stopwords_enabled is None:
+        try:
+            _stopwords_enabled = bool(int(db.execute(text("SELECT @@GLOBAL.innodb_ft_enable_stopword")).scalar()))
+        except Exception as e:
+            logger.warning(f"innodb_ft_enable_stopword 확인 실패: {e}")
+            _stopwords_enabled = True
+    return _stopwords_enabled
+
+
+def _contains_stopword(word: str) -> bool:
+    lowered = word.lower()
+    return any(stopword in lowered for stopword in DEFAULT_STOPWORDS)
+
+
+def build_boolean_query(q: str, stopwords: bool = False) -> Optional[str]:
+    """검색어를 불리언 모드 쿼리로 변환 (모든 단어 포함)
+
+    ngram보다 짧은 단어가 있거나, 불용어가 켜진 서버에서 불용어를 포함한 단어가 있으면 None
+    """
+    words = _BOOLEAN_OPERATORS.sub(" ", q).split()
+    if not words or any(len(word) < MIN_TOKEN_SIZE for word in words):
+        return None
+    if stopwords and any(_contains_stopword(word) for word in words):
+        return None
+    # ngram 파서에서 "단어"는 연속된 ngram 구문 검색이 되어 LIKE '%단어%'와 같은 의미가 됨
+    return " ".join(f'+"{word}"' for word in words)
+
+
+def apply_search(query: Query, db: Session, table: str, columns: Sequence, q: str) -> Tuple[Query, Optional[object]]:
+    """검색 조건 적용 (FULLTEXT 사용 시 관련도 점수 식도 반환, LIKE 대체 시 None)"""
+    if fulltext_available(db, table):
+        terms = build_boolean_query(q, stopwords_enabled(db))
+        if terms:
+            score = match(*columns, against=terms).in_boolean_mode()
+            return query.filter(score), score
+
+    return query.filter(or_(*[column.contains(q) for column in columns])), None
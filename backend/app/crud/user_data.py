@@ -26,21 +26,9 @@ def get_user_feeds(db: Session, user_id: int, skip: int = 0, limit: int = 20) ->
             FeedImages.feed_id == feed.feed_id
         ).order_by(FeedImages.image_order).all()
         
-        # 좋아요 수와 댓글 수 계산
-        like_count = 0
-        comment_count = 0
-        
-        try:
-            from app.models.liked_feeds import LikedFeeds
-            like_count = db.query(LikedFeeds).filter(LikedFeeds.feed_id == feed.feed_id).count()
-        except ImportError:
-            pass
-        
-        try:
-            from app.models.feed_comments import FeedComments
-            comment_count = db.query(FeedComments).filter(FeedComments.feed_id == feed.feed_id).count()
-        except ImportError:
-            pass
+        # 좋아요 수와 댓글 수 (피드 카운터 컬럼)
+        like_count = feed.like_count or 0
+        comment_count = feed.comment_count or 0
         
         feed_data = {
             "feed_id": feed.feed_id,
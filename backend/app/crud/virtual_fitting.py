@@ -1,7 +1,8 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import Any, List, Optional
 from app.models.virtual_fitting_process import VirtualFittingProcess
 from app.models.virtual_fittings import VirtualFittings
+from app.utils.pagination import keyset_filter
 
 class VirtualFittingCRUD:
     
@@ -34,17 +35,26 @@ class VirtualFittingCRUD:
         db: Session, 
         user_id: int, 
         skip: int = 0, 
-        limit: int = 20
-    ) -> tuple[List[VirtualFittings], int]:
-        """사용자의 가상 피팅 결과 목록 조회"""
+        limit: int = 20,
+        cursor: Optional[List[Any]] = None,
+        include_total: bool = True
+    ) -> tuple[List[VirtualFittings], Optional[int]]:
+        """사용자의 가상 피팅 결과 목록 조회 (cursor가 있으면 OFFSET 대신 keyset 조회)"""
         query = db.query(VirtualFittings).filter(
             VirtualFittings.user_id == user_id
         )
         
-        total = query.count()
-        results = query.order_by(
-            VirtualFittings.created_at.desc()
-        ).offset(skip).limit(limit).all()
+        total = query.count() if include_total else None
+        
+        sort_columns = (VirtualFittings.created_at, VirtualFittings.fitting_id)
+        if cursor is not None:
+            query = query.filter(keyset_filter(sort_columns, cursor, descending=True))
+        query = query.order_by(*[c.desc() for c in sort_columns])
+        
+        if cursor is not None:
+            results = query.limit(limit).all()
+        else:
+            results = query.offset(skip).limit(limit).all()
         
         return results, total
     
@@ -112,6 +122,10 @@ class VirtualFittingCRUD:
                 except Exception as e:
                     print(f"이미지 파일 삭제 실패: {e}")
             
+            # 배경 커스텀용 전경 캐시도 삭제
+            from app.utils.cutout_cache import cutout_cache
+            cutout_cache.invalidate(fitting_id)
+            
             db.delete(result)
             db.commit()
             return True
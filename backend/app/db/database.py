@@ -3,6 +3,7 @@ from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 from dotenv import load_dotenv
+from app.db.pool_metrics import InstrumentedQueuePool
 
 # 환경 변수 로드
 load_dotenv()
@@ -17,12 +18,63 @@ DB_NAME = os.getenv("MYSQL_DATABASE", os.getenv("DB_NAME", "capstone"))
 # MySQL 데이터베이스 연결 URL
 DB_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8"
 
-# SQLAlchemy 엔진 생성
-engine = create_engine(DB_URL)
+# 커넥션 풀 설정 (API 서버와 워커가 같은 MySQL을 사용하므로 환경별로 조정)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 10))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 20))
+# 풀이 가득 찼을 때 연결을 기다리는 최대 시간(초)
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", 10))
+# MySQL wait_timeout(기본 8시간)보다 먼저 연결을 교체
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", 1800))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true", "yes")
+# 비동기 엔진 풀 (동기 풀과 별도로 연결을 잡으므로 프로세스당 연결 수 = 동기 + 비동기 합계)
+# 상태 조회 등 일부 읽기 라우트만 사용하므로 동기 풀보다 작게 둠
+DB_ASYNC_POOL_SIZE = int(os.getenv("DB_ASYNC_POOL_SIZE", 5))
+DB_ASYNC_MAX_OVERFLOW = int(os.getenv("DB_ASYNC_MAX_OVERFLOW", 5))
+
+# SQLAlchemy 엔진 생성 (대기 시간/overflow를 기록하는 풀 사용)
+engine = create_engine(
+    DB_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
 
 # 세션 만들기
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# 비동기 엔진/세션 (API 라우트용, 워커는 동기 세션 사용)
+# aiomysql은 API 서버에만 필요하므로 처음 사용할 때 생성
+ASYNC_DB_URL = f"mysql+aiomysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}?charset=utf8"
+_async_engine = None
+_async_session_factory = None
+
+def get_async_engine():
+    """비동기 엔진 반환 (최초 호출 시 생성)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+
+        _async_engine = create_async_engine(
+            ASYNC_DB_URL,
+            pool_size=DB_ASYNC_POOL_SIZE,
+            max_overflow=DB_ASYNC_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=DB_POOL_PRE_PING,
+        )
+        _async_session_factory = async_sessionmaker(
+            bind=_async_engine, autoflush=False, expire_on_commit=False
+        )
+    return _async_engine
+
+def AsyncSessionLocal():
+    """비동기 세션 생성"""
+    get_async_engine()
+    return _async_session_factory()
+
 # Base 클래스 생성 (모든 모델은 이 클래스를 상속)
 Base = declarative_base()
 
@@ -32,4 +84,10 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# 의존성: 비동기 데이터베이스 세션 가져오기
+# 동기 ORM 코드는 `await db.run_sync(func)`로 실행하면 DB 대기 중에도 이벤트 루프를 막지 않음
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,96 @@
+"""
+DB 커넥션 풀 계측
+
+QueuePool에서 연결을 빌릴 때의 대기 시간, overflow 연결 사용, 풀 고갈(타임아웃) 횟수를 기록해
+요청 지연이 풀 부족 때문인지 확인할 수 있게 한다.
+"""
+
+import time
+import threading
+from typing import Any, Dict
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.overflow_checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        # 이 시간 이상 기다린 경우 (풀이 부족했던 요청)
+        self.slow_threshold = 0.1
+        self.slow_checkouts = 0
+
+    def record_checkout(self, wait: float, overflow: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            if overflow:
+                self.overflow_checkouts += 1
+            if wait >= self.slow_threshold:
+                self.slow_checkouts += 1
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "overflow_checkouts": self.overflow_checkouts,
+                "slow_checkouts": self.slow_checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(self.max_wait * 1000, 3),
+            }
+
+
+class InstrumentedQueuePool(QueuePool):
+    """연결 대기 시간과 overflow/고갈 횟수를 기록하는 QueuePool"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def recreate(self):
+        # dispose/재생성 후에도 누적 지표 유지
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+    def _do_get(self):
+        started = time.perf_counter()
+        # 풀이 pool_size를 넘은 상태인지가 아니라 이번 체크아웃이 overflow 연결을 새로 열었는지 기록
+        overflow_before = self.overflow()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record_timeout()
+            raise
+        self.metrics.record_checkout(time.perf_counter() - started, self.overflow() > overflow_before)
+        return connection
+
+
+def get_pool_metrics(engine) -> Dict[str, Any]:
+    """현재 풀 상태 + 누적 지표"""
+    pool = engine.pool
+    status = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        status.update(metrics.snapshot())
+    return status
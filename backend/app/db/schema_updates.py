@@ -0,0 +1,152 @@
+"""
+기존 테이블 스키마 보완
+
+Base.metadata.create_all은 이미 있는 테이블에 컬럼/인덱스를 추가하지 않으므로
+모델에 새로 추가된 항목을 서버 시작 시 확인해 반영한다.
+"""
+
+import logging
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+
+def ensure_feed_counter_columns(engine: Engine):
+    """feeds 테이블에 좋아요/댓글 카운터 컬럼이 없으면 추가 후 현재 값으로 채움"""
+    columns = {col["name"] for col in inspect(engine).get_columns("feeds")}
+    missing = [name for name in ("like_count", "comment_count") if name not in columns]
+    if not missing:
+        return
+
+    with engine.begin() as conn:
+        for name in missing:
+            conn.execute(text(f"ALTER TABLE feeds ADD COLUMN {name} INT NOT NULL DEFAULT 0"))
+            logger.info(f"feeds.{name} 컬럼 추가")
+
+    from app.db.database import SessionLocal
+    from app.crud.feed_counters import reconcile_feed_counters
+
+    db = SessionLocal()
+    try:
+        fixed = reconcile_feed_counters(db)
+        logger.info(f"피드 카운터 초기화: {fixed}개 피드")
+    finally:
+        db.close()
+
+
+def ensure_background_custom_task_id_column(engine: Engine):
+    """background_customs.task_id 컬럼(작업 재전달 시 중복 방지 키)이 없으면 추가"""
+    columns = {col["name"] for col in inspect(engine).get_columns("background_customs")}
+    if "task_id" in columns:
+        return
+
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE background_customs ADD COLUMN task_id VARCHAR(36) NULL"))
+        conn.execute(text("CREATE UNIQUE INDEX uq_background_customs_task_id ON background_customs (task_id)"))
+    logger.info("background_customs.task_id 컬럼 추가")
+
+
+def ensure_fulltext_indexes(engine: Engine):
+    """상품/피드 검색용 FULLTEXT(ngram) 인덱스가 없으면 불용어 없이 생성 (MySQL 전용, 실패 시 LIKE 검색 유지)"""
+    from app.crud.search import FULLTEXT_INDEXES, LEGACY_FULLTEXT_INDEXES, set_fulltext_available
+
+    if engine.dialect.name != "mysql":
+        return
+
+    inspector = inspect(engine)
+    for table, (index_name, columns) in FULLTEXT_INDEXES.items():
+        existing = {idx["name"] for idx in inspector.get_indexes(table)}
+        if index_name in existing:
+            set_fulltext_available(table, True)
+            continue
+
+        try:
+            # 기존 행 전체를 색인하므로 상품 수에 따라 시간이 걸릴 수 있음
+            with engine.begin() as conn:
+                # 불용어("a", "i" 등)를 포함한 ngram 토큰이 색인에서 빠지지 않도록 이 세션에서만 끔
+                conn.execute(text("SET SESSION innodb_ft_enable_stopword = OFF"))
+                legacy_name = LEGACY_FULLTEXT_INDEXES.get(table)
+                if legacy_name in existing:
+                    conn.execute(text(f"ALTER TABLE {table} DROP INDEX {legacy_name}"))
+                    logger.info(f"{table} 불용어 적용된 이전 FULLTEXT 인덱스 삭제: {legacy_name}")
+                conn.execute(text(
+                    f"ALTER TABLE {table} ADD FULLTEXT INDEX {index_name} "
+                    f"({', '.join(columns)}) WITH PARSER ngram"
+                ))
+            set_fulltext_available(table, True)
+            logger.info(f"{table} FULLTEXT 인덱스 생성: {index_name}")
+        except Exception as e:
+            set_fulltext_available(table, False)
+            logger.warning(f"{table} FULLTEXT 인덱스 생성 실패, LIKE 검색 사용: {e}")
+
+
+# product_url 중복 상품 정리 (가장 먼저 적재된 product_id만 남기고, 찜 목록은 남는 상품으로 옮김)
+CLOTHING_URL_DEDUPE_SQL = (
+    """
+    UPDATE IGNORE liked_clothes lc
+    JOIN clothing_items c ON c.product_id = lc.clothing_id
+    JOIN (
+        SELECT product_url, MIN(product_id) AS keep_id
+        FROM clothing_items GROUP BY product_url HAVING COUNT(*) > 1
+    ) d ON d.product_url = c.product_url
+    SET lc.clothing_id = d.keep_id
+    WHERE lc.clothing_id <> d.keep_id
+    """,
+    """
+    DELETE c FROM clothing_items c
+    JOIN (
+        SELECT product_url, MIN(product_id) AS keep_id
+        FROM clothing_items GROUP BY product_url HAVING COUNT(*) > 1
+    ) d ON d.product_url = c.product_url AND c.product_id <> d.keep_id
+    """,
+)
+CLOTHING_URL_UNIQUE_SQL = (
+    "ALTER TABLE clothing_items ADD UNIQUE INDEX uq_clothing_items_product_url (product_url)"
+)
+
+
+CLOTHING_URL_DUPLICATE_COUNT_SQL = """
+    SELECT COALESCE(SUM(cnt - 1), 0) FROM (
+        SELECT COUNT(*) AS cnt FROM clothing_items GROUP BY product_url HAVING COUNT(*) > 1
+    ) d
+"""
+
+
+def has_clothing_product_url_unique(engine: Engine) -> bool:
+    """clothing_items.product_url 유니크 인덱스 존재 여부"""
+    inspector = inspect(engine)
+    unique_columns = [idx["column_names"] for idx in inspector.get_indexes("clothing_items") if idx.get("unique")]
+    unique_columns += [uc["column_names"] for uc in inspector.get_unique_constraints("clothing_items")]
+    return ["product_url"] in unique_columns
+
+
+def check_clothing_product_url_unique(engine: Engine):
+    """서버 시작 시 확인만 수행 (유니크 인덱스가 없으면 경고, 상품 행은 건드리지 않음)"""
+    if engine.dialect.name != "mysql" or has_clothing_product_url_unique(engine):
+        return
+
+    try:
+        with engine.connect() as conn:
+            duplicates = conn.execute(text(CLOTHING_URL_DUPLICATE_COUNT_SQL)).scalar()
+    except Exception as e:
+        duplicates = f"확인 실패 ({e})"
+    logger.warning(
+        "clothing_items.product_url 유니크 인덱스가 없습니다 "
+        f"(중복 상품: {duplicates}). 상품 적재 전 "
+        "'python scripts/migrate_clothing_product_url.py --apply'로 중복 정리 후 인덱스를 추가하세요."
+    )
+
+
+def migrate_clothing_product_url_unique(engine: Engine) -> int:
+    """product_url 중복 상품 삭제 후 유니크 인덱스 추가 (명시적 마이그레이션 전용, 반환: 삭제된 행 수)"""
+    if has_clothing_product_url_unique(engine):
+        return 0
+
+    with engine.begin() as conn:
+        removed = 0
+        for statement in CLOTHING_URL_DEDUPE_SQL:
+            removed = conn.execute(text(statement)).rowcount
+        conn.execute(text(CLOTHING_URL_UNIQUE_SQL))
+    logger.info(f"clothing_items.product_url 유니크 인덱스 추가 (중복 상품 {removed}개 정리)")
+    return removed
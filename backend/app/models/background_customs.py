@@ -22,6 +22,8 @@ class BackgroundCustoms(Base):
         String(255), nullable=True
     )  # 사용자가 선택한 배경 이미지 URL
     title = Column(String(200), nullable=True)  # 커스텀 결과에 대한 제목
+    # 처리한 작업 큐 task_id (작업이 재전달돼도 같은 결과를 두 번 만들지 않도록)
+    task_id = Column(String(36), nullable=True, unique=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     updated_at = Column(
         DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String
+from sqlalchemy import Column, Integer, String, UniqueConstraint
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -16,4 +16,9 @@ class ClothingItems(Base):
     main_category = Column(String(20), nullable=False)
     sub_category = Column(String(30), nullable=False)
     
+    # 크롤링 데이터 재적재 시 product_url 기준 upsert
+    __table_args__ = (
+        UniqueConstraint("product_url", name="uq_clothing_items_product_url"),
+    )
+    
     liked_clothes = relationship("LikedClothes", back_populates="clothing_item", cascade="all, delete")
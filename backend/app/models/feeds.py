@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, func
+from sqlalchemy import Column, Integer, ForeignKey, String, Text, DateTime, func, text
 from sqlalchemy.orm import relationship
 from app.db.database import Base
 
@@ -11,6 +11,8 @@ class Feeds(Base):
     title = Column(String(50), nullable=False)
     content = Column(Text, nullable=False)
     image_url = Column(String(255), nullable=True) # 피드 이미지 URL
+    like_count = Column(Integer, nullable=False, default=0, server_default=text("0")) # 좋아요 수 (LikedFeeds 기준 비정규화)
+    comment_count = Column(Integer, nullable=False, default=0, server_default=text("0")) # 댓글 수 (FeedComments 기준 비정규화)
     created_at = Column(DateTime, server_default=func.now())
     updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
@@ -11,11 +11,24 @@ class BackgroundCustomRequest(BaseModel):
 class BackgroundCustomResponse(BaseModel):
     success: bool
     message: str
-    custom_fitting_id: int
-    image_url: str
+    # QUEUED면 task_id로 작업 상태를 조회 (완료 후 custom_fitting_id, image_url 채워짐)
+    status: str = "COMPLETED"
+    task_id: Optional[str] = None
+    custom_fitting_id: Optional[int] = None
+    image_url: Optional[str] = None
     title: str
 
 
+class BackgroundCustomJobStatusResponse(BaseModel):
+    task_id: str
+    status: str
+    custom_fitting_id: Optional[int] = None
+    image_url: Optional[str] = None
+    title: Optional[str] = None
+    error: Optional[str] = None
+    updated_at: Optional[str] = None
+
+
 class BackgroundCustomPreviewResponse(BaseModel):
     success: bool
     message: str
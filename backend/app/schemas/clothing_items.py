@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Optional
 
 class ClothingItemBase(BaseModel):
     product_name: str
@@ -22,7 +22,10 @@ class ClothingItemResponse(ClothingItemBase):
 
 class ClothingItemsListResponse(BaseModel):
     items: list[ClothingItemResponse]
-    total: int
+    total: Optional[int] = None  # 커서 모드에서는 include_total=true일 때만 포함
     page: int
     size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
+    # include_facets=true일 때 필드별 {값: 상품 수} (main_category, sub_category, gender, brand_name)
+    facets: Optional[Dict[str, Dict[str, int]]] = None
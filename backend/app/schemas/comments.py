@@ -42,7 +42,8 @@ CommentResponse.model_rebuild()
 # 댓글 목록 응답 스키마
 class CommentListResponse(BaseModel):
     comments: List[CommentResponse]
-    total: int
+    total: Optional[int] = None  # 커서 모드에서는 include_total=true일 때만 포함
     page: int
     size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
@@ -61,7 +61,8 @@ class FeedResponse(BaseModel):
 # 피드 목록 응답 스키마
 class FeedListResponse(BaseModel):
     feeds: List[FeedResponse]
-    total: int
+    total: Optional[int] = None  # 커서 모드에서는 include_total=true일 때만 포함
     page: int
     size: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
@@ -45,10 +45,11 @@ class VirtualFittingItem(BaseModel):
 
 class VirtualFittingListResponse(BaseModel):
     fittings: List[VirtualFittingItem]
-    total: int
+    total: Optional[int] = None  # 커서 모드에서는 include_total=true일 때만 포함
     page: int
     per_page: int
-    total_pages: int
+    total_pages: Optional[int] = None
+    next_cursor: Optional[str] = None
     
 class VirtualFittingProcessItem(BaseModel):
     process_id: int
@@ -0,0 +1,182 @@
+"""
+배경 커스텀 작업 서비스
+
+배경 제거/합성/파일 저장은 CPU를 수 초간 점유하므로 API 서버에서 처리하지 않고
+작업 큐(background_custom)에 넣어 워커가 처리한다. API는 task_id를 바로 돌려주고,
+클라이언트는 작업 상태(task_queue 상태 레코드)를 조회해 결과를 받는다.
+"""
+
+import os
+import uuid
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from sqlalchemy.exc import IntegrityError
+
+from app.core.task_queue import task_queue
+from app.db.database import SessionLocal
+from app.models.virtual_fittings import VirtualFittings
+from app.models.background_customs import BackgroundCustoms
+
+logger = logging.getLogger(__name__)
+
+# 프로젝트 루트 (backend)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+class BackgroundCustomService:
+    def enqueue(
+        self,
+        user_id: int,
+        fitting_id: int,
+        title: str,
+        background_path: Optional[str] = None,
+        background_color: Optional[str] = None,
+    ) -> Optional[str]:
+        """배경 커스텀 작업을 큐에 추가 (반환: task_id, 큐 사용 불가 시 None)"""
+        task_data = {
+            "user_id": user_id,
+            "fitting_id": fitting_id,
+            "title": title,
+            "background_path": background_path,
+            "background_color": background_color,
+        }
+        task_id = task_queue.enqueue_task("background_custom", task_data)
+        if task_id:
+            logger.info(f"배경 커스텀 작업 큐에 추가됨: {task_id} (fitting_id={fitting_id})")
+        else:
+            logger.error(f"배경 커스텀 작업 큐 추가 실패: fitting_id={fitting_id}")
+        return task_id
+
+    def _result(self, custom_result: BackgroundCustoms) -> Dict[str, Any]:
+        """작업 상태에 기록할 결과"""
+        return {
+            "custom_fitting_id": custom_result.custom_fitting_id,
+            "image_url": f"/api/background-custom/result/{custom_result.custom_fitting_id}",
+            "title": custom_result.title,
+        }
+
+    def _replace_fitting_image(self, fitting_id: int, source_path: Path, fitting_image_path: Path):
+        """피팅 이미지를 합성 결과로 교체 (임시 파일에 복사 후 rename, 중간에 죽어도 원본이 깨지지 않음)"""
+        from app.utils.cutout_cache import cutout_cache
+
+        staging = fitting_image_path.with_name(f".{fitting_image_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            shutil.copyfile(source_path, staging)
+            os.replace(staging, fitting_image_path)
+        finally:
+            staging.unlink(missing_ok=True)
+
+        # 원본이 합성 결과로 바뀌었으므로 이전 원본의 전경 캐시는 더 이상 사용하지 않음
+        cutout_cache.invalidate(fitting_id)
+
+    def process_background_custom_task(self, task_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """배경 커스텀 작업 처리 (Worker에서 호출, 반환: 작업 상태에 기록할 결과)
+
+        워커가 죽으면 작업이 재전달되므로 합성 결과를 히스토리 파일/레코드(task_id)로 먼저 남기고
+        피팅 이미지는 마지막에 교체한다. 재전달 시 이미 레코드가 있으면 다시 합성하지 않는다.
+        """
+        from app.utils.background_removal_service import background_removal_service
+        from app.utils.image_worker_pool import compose_background
+
+        task_id = task_data.get("task_id")
+        user_id = task_data["user_id"]
+        fitting_id = task_data["fitting_id"]
+        title = task_data.get("title") or "배경 커스텀 결과"
+        background_path = task_data.get("background_path")
+        background_color = task_data.get("background_color")
+
+        db = SessionLocal()
+
+        try:
+            fitting = db.query(VirtualFittings).filter(
+                VirtualFittings.fitting_id == fitting_id,
+                VirtualFittings.user_id == user_id
+            ).first()
+
+            if not fitting:
+                raise ValueError("가상피팅 결과를 찾을 수 없습니다.")
+
+            # 원본 이미지 경로 확인 (selected_fittings 폴더)
+            original_image_path = Path(fitting.fitting_image_url)
+            if not original_image_path.is_absolute():
+                original_image_path = PROJECT_ROOT / original_image_path
+
+            # 이전 시도가 레코드까지 남겼으면 다시 합성하지 않고 남은 피팅 이미지 교체만 수행
+            if task_id:
+                existing = db.query(BackgroundCustoms).filter(
+                    BackgroundCustoms.task_id == task_id
+                ).first()
+                if existing:
+                    logger.info(f"이미 처리된 배경 커스텀 작업: {task_id} (custom_fitting_id={existing.custom_fitting_id})")
+                    self._replace_fitting_image(
+                        fitting_id, PROJECT_ROOT / existing.custom_image_url, original_image_path
+                    )
+                    return self._result(existing)
+
+            if not original_image_path.exists():
+                raise ValueError("원본 이미지 파일을 찾을 수 없습니다.")
+
+            # 배경 이미지 읽기 (경로가 '/'로 시작하는 경우 제거)
+            background_bytes = None
+            if background_path:
+                absolute_background_path = PROJECT_ROOT / background_path.lstrip("/")
+                if not absolute_background_path.exists():
+                    raise ValueError(f"배경 이미지 파일을 찾을 수 없습니다: {background_path}")
+                background_bytes = absolute_background_path.read_bytes()
+
+            logger.info(f"배경 커스텀 처리 시작: fitting_id={fitting_id}")
+
+            # 배경 제거 + 합성 (워커 슬롯에서 직접 실행, 원본 크기 PNG)
+            combined_bytes = compose_background(
+                str(original_image_path), background_bytes, background_color, fitting_id=fitting_id
+            )
+
+            # 1. 히스토리 파일 저장 (피팅 이미지는 아직 원본 그대로)
+            result_filename = f"custom_{fitting_id}_{uuid.uuid4().hex[:8]}.png"
+            result_path = PROJECT_ROOT / "uploads" / "background_custom" / result_filename
+            if not background_removal_service.save_image(combined_bytes, str(result_path)):
+                raise RuntimeError("배경 커스텀 히스토리 저장에 실패했습니다.")
+
+            # 2. 레코드 저장 (task_id 유니크, 동시에 재전달된 시도가 먼저 저장했으면 그 결과 사용)
+            custom_result = BackgroundCustoms(
+                user_id=user_id,
+                fitting_id=fitting_id,
+                custom_image_url=f"uploads/background_custom/{result_filename}",
+                background_image_url=background_path,
+                title=title,
+                task_id=task_id,
+            )
+            db.add(custom_result)
+            try:
+                db.commit()
+            except IntegrityError:
+                db.rollback()
+                result_path.unlink(missing_ok=True)
+                custom_result = db.query(BackgroundCustoms).filter(
+                    BackgroundCustoms.task_id == task_id
+                ).first()
+                if not custom_result:
+                    raise
+                result_path = PROJECT_ROOT / custom_result.custom_image_url
+            else:
+                db.refresh(custom_result)
+
+            # 3. 마지막에 피팅 이미지 교체
+            self._replace_fitting_image(fitting_id, result_path, original_image_path)
+
+            logger.info(f"배경 커스텀 완료: fitting_id={fitting_id}, custom_fitting_id={custom_result.custom_fitting_id}")
+            return self._result(custom_result)
+
+        except Exception:
+            db.rollback()
+            raise
+
+        finally:
+            db.close()
+
+
+# 전역 서비스 인스턴스
+background_custom_service = BackgroundCustomService()
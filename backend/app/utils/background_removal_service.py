@@ -1,20 +1,116 @@
 import os
 import cv2
+import queue
+import threading
 import numpy as np
 from PIL import Image
 import io
 import logging
-from typing import Optional, Tuple
+from contextlib import contextmanager
+from typing import Dict, Optional, Tuple
 from rembg import remove, new_session
 
 logger = logging.getLogger(__name__)
 
+# 선택 가능한 rembg 모델 (u2netp/silueta는 가볍고 빨라 미리보기용)
+ALLOWED_MODELS = ("u2net", "u2netp", "silueta")
+DEFAULT_MODEL = os.getenv("REMBG_MODEL", "u2net")
+
+
+class RembgSessionPool:
+    """모델별 onnxruntime 세션 풀 (동시 요청이 세션 하나를 두고 경합하지 않도록 여러 개 유지)"""
+
+    def __init__(self):
+        cpu_count = os.cpu_count() or 1
+        # 이미지 처리 프로세스끼리 코어를 나눠 쓰도록 기본값 계산
+        processes = max(1, int(os.getenv("IMAGE_WORKER_PROCESSES", 2)))
+        self.intra_op_threads = int(os.getenv("REMBG_INTRA_OP_THREADS", max(1, cpu_count // processes)))
+        self.inter_op_threads = int(os.getenv("REMBG_INTER_OP_THREADS", 1))
+        self.max_sessions = int(os.getenv("REMBG_SESSION_POOL_SIZE", max(1, cpu_count // self.intra_op_threads)))
+        providers = os.getenv("REMBG_PROVIDERS")
+        self.providers = [p.strip() for p in providers.split(",") if p.strip()] if providers else None
+
+        self._idle: Dict[str, "queue.Queue"] = {}
+        self._created: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _create_session(self, model_name: str):
+        """스레드 설정을 적용한 세션 생성 후 작은 이미지로 예열"""
+        try:
+            import onnxruntime as ort
+            from rembg.sessions import sessions_class
+
+            sess_opts = ort.SessionOptions()
+            sess_opts.intra_op_num_threads = self.intra_op_threads
+            sess_opts.inter_op_num_threads = self.inter_op_threads
+            session_class = next(sc for sc in sessions_class if sc.name() == model_name)
+            session = session_class(model_name, sess_opts, self.providers)
+        except Exception as e:
+            # rembg 버전에 따라 세션 클래스 구조가 다르면 기본 설정으로 생성
+            logger.warning(f"rembg 세션 옵션 적용 실패, 기본 설정 사용: {e}")
+            session = new_session(model_name)
+
+        # 첫 추론 시 발생하는 그래프 최적화/메모리 할당을 미리 수행
+        warmup = io.BytesIO()
+        Image.new("RGB", (64, 64), (255, 255, 255)).save(warmup, format="PNG")
+        remove(warmup.getvalue(), session=session)
+        logger.info(
+            f"rembg 세션 생성: {model_name} "
+            f"(intra={self.intra_op_threads}, inter={self.inter_op_threads})"
+        )
+        return session
+
+    def warmup(self, model_name: str = DEFAULT_MODEL, count: int = 1):
+        """세션을 미리 생성해 첫 요청 지연 제거"""
+        for _ in range(min(count, self.max_sessions)):
+            with self._lock:
+                if self._created.get(model_name, 0) >= count:
+                    return
+                self._created[model_name] = self._created.get(model_name, 0) + 1
+                idle = self._idle.setdefault(model_name, queue.Queue())
+            idle.put(self._create_session(model_name))
+
+    @contextmanager
+    def session(self, model_name: str = DEFAULT_MODEL):
+        """세션 대여 (쉬는 세션이 없으면 최대 개수까지 새로 만들고, 그 이상은 반환될 때까지 대기)"""
+        with self._lock:
+            idle = self._idle.setdefault(model_name, queue.Queue())
+            create = idle.empty() and self._created.get(model_name, 0) < self.max_sessions
+            if create:
+                self._created[model_name] = self._created.get(model_name, 0) + 1
+
+        if create:
+            try:
+                session = self._create_session(model_name)
+            except Exception:
+                with self._lock:
+                    self._created[model_name] -= 1
+                raise
+        else:
+            session = idle.get()
+
+        try:
+            yield session
+        finally:
+            idle.put(session)
+
 
 class BackgroundRemovalService:
     def __init__(self):
-        """배경 제거 서비스 초기화"""
-        # rembg 세션 초기화 (u2net 모델 사용)
-        self.session = new_session("u2net")
+        """배경 제거 서비스 초기화 (세션은 처음 사용하거나 warmup()할 때 생성)"""
+        self.sessions = RembgSessionPool()
+
+    def resolve_model(self, model_name: Optional[str]) -> str:
+        """요청 모델명 확인 (허용되지 않은 값은 기본 모델)"""
+        if model_name in ALLOWED_MODELS:
+            return model_name
+        if model_name:
+            logger.warning(f"지원하지 않는 rembg 모델 요청: {model_name}, {DEFAULT_MODEL} 사용")
+        return DEFAULT_MODEL
+
+    def warmup(self, model_name: Optional[str] = None):
+        """모델 세션 예열 (이미지 처리 프로세스 시작 시 호출)"""
+        self.sessions.warmup(self.resolve_model(model_name))
 
     def remove_background_opencv(self, image_path: str) -> Optional[bytes]:
         """
@@ -72,12 +168,13 @@ class BackgroundRemovalService:
             logger.error(f"OpenCV 배경 제거 중 오류 발생: {e}")
             return None
 
-    def remove_background_rembg(self, image_path: str) -> Optional[bytes]:
+    def remove_background_rembg(self, image_path: str, model_name: Optional[str] = None) -> Optional[bytes]:
         """
         rembg 라이브러리를 사용한 AI 기반 배경 제거
 
         Args:
             image_path: 입력 이미지 경로
+            model_name: rembg 모델 (u2net, u2netp, silueta, 기본: REMBG_MODEL)
 
         Returns:
             배경 제거된 이미지의 바이트 데이터 (PNG 형식)
@@ -88,7 +185,8 @@ class BackgroundRemovalService:
                 input_image = f.read()
 
             # rembg를 사용하여 배경 제거
-            output_image = remove(input_image, session=self.session)
+            with self.sessions.session(self.resolve_model(model_name)) as session:
+                output_image = remove(input_image, session=session)
 
             logger.info("rembg 배경 제거 완료")
             return output_image
@@ -97,19 +195,21 @@ class BackgroundRemovalService:
             logger.error(f"rembg 배경 제거 중 오류 발생: {e}")
             return None
 
-    def remove_background_from_bytes(self, image_bytes: bytes) -> Optional[bytes]:
+    def remove_background_from_bytes(self, image_bytes: bytes, model_name: Optional[str] = None) -> Optional[bytes]:
         """
         바이트 데이터에서 직접 배경 제거
 
         Args:
             image_bytes: 입력 이미지 바이트 데이터
+            model_name: rembg 모델 (기본: REMBG_MODEL)
 
         Returns:
             배경 제거된 이미지의 바이트 데이터 (PNG 형식)
         """
         try:
             # rembg를 사용하여 배경 제거
-            output_image = remove(image_bytes, session=self.session)
+            with self.sessions.session(self.resolve_model(model_name)) as session:
+                output_image = remove(image_bytes, session=session)
 
             logger.info("rembg 배경 제거 완료 (바이트)")
             return output_image
@@ -118,43 +218,143 @@ class BackgroundRemovalService:
             logger.error(f"rembg 배경 제거 중 오류 발생 (바이트): {e}")
             return None
 
-    def combine_with_background(
-        self, foreground_bytes: bytes, background_bytes: bytes
+    def remove_background_downscaled(
+        self,
+        image_path: str,
+        max_size: int,
+        model_name: Optional[str] = None,
+        foreground_bytes: Optional[bytes] = None,
     ) -> Optional[bytes]:
         """
-        전경 이미지와 배경 이미지를 합성
+        긴 변을 max_size 이하로 줄인 뒤 배경 제거 (미리보기용)
 
         Args:
-            foreground_bytes: 전경 이미지 바이트 데이터 (투명 배경)
-            background_bytes: 배경 이미지 바이트 데이터
+            image_path: 입력 이미지 경로
+            max_size: 긴 변 최대 픽셀 수
+            model_name: rembg 모델 (기본: REMBG_MODEL)
+            foreground_bytes: 이미 계산된 원본 크기 전경 (있으면 추론 없이 축소만)
 
         Returns:
-            합성된 이미지의 바이트 데이터
+            축소된 전경 이미지의 바이트 데이터 (PNG 형식)
         """
         try:
-            # PIL Image 객체로 변환
-            foreground = Image.open(io.BytesIO(foreground_bytes))
-            background = Image.open(io.BytesIO(background_bytes))
+            if foreground_bytes is not None:
+                foreground = self.load_image(foreground_bytes)
+                foreground.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+                return self.encode_image(foreground)
+
+            image = Image.open(image_path)
+            image.load()
+            image.thumbnail((max_size, max_size), Image.Resampling.LANCZOS)
+
+            # 추론 비용은 픽셀 수에 비례하므로 축소한 이미지로 배경 제거
+            with self.sessions.session(self.resolve_model(model_name)) as session:
+                output_image = remove(image, session=session)
+
+            logger.info(f"rembg 배경 제거 완료 (축소 {image.size[0]}x{image.size[1]})")
+            return self.encode_image(output_image)
+
+        except Exception as e:
+            logger.error(f"축소 배경 제거 중 오류 발생: {e}")
+            return None
+
+    # ===== 배열 기반 합성 (중간 PNG 인코딩/디코딩 없이 메모리에서 처리) =====
+
+    @staticmethod
+    def load_image(image_bytes: bytes) -> Image.Image:
+        """이미지 바이트 디코딩 (한 번만 호출하고 이후 단계는 Image로 전달)"""
+        image = Image.open(io.BytesIO(image_bytes))
+        image.load()
+        return image
+
+    @staticmethod
+    def parse_color(color_hex: str) -> Tuple[int, int, int]:
+        """색상 코드 파싱 (예: #FF0000 → (255, 0, 0))"""
+        if color_hex.startswith("#"):
+            color_hex = color_hex[1:]
+        return tuple(int(color_hex[i : i + 2], 16) for i in (0, 2, 4))
+
+    def composite(
+        self,
+        foreground: Image.Image,
+        background: Optional[Image.Image] = None,
+        background_color: Optional[str] = None,
+    ) -> Image.Image:
+        """
+        전경(RGBA)을 배경 이미지 또는 단색 위에 합성
 
-            # 배경 이미지를 전경 이미지 크기에 맞게 리사이즈
+        Args:
+            foreground: 배경 제거된 전경 이미지
+            background: 배경 이미지 (전경 크기로 리사이즈)
+            background_color: 배경 이미지가 없을 때 사용할 색상 코드
+
+        Returns:
+            합성된 이미지 (배경이 불투명하면 RGB, 아니면 RGBA)
+        """
+        if foreground.mode != "RGBA":
+            foreground = foreground.convert("RGBA")
+
+        if background is None:
+            if not background_color:
+                raise ValueError("배경 이미지 또는 색상이 필요합니다.")
+            # 배경 이미지를 만들지 않고 색상 값을 바로 섞음
+            backdrop = np.array(self.parse_color(background_color), dtype=np.float32)
+        else:
             background = background.resize(foreground.size, Image.Resampling.LANCZOS)
+            if background.mode in ("RGBA", "LA", "PA") or "transparency" in background.info:
+                # 투명한 배경은 알파끼리도 합성해야 하므로 기존 방식 사용
+                return Image.alpha_composite(background.convert("RGBA"), foreground)
+            backdrop = np.asarray(background.convert("RGB"), dtype=np.float32)
+
+        # out = fg * a + bg * (1 - a), 배경이 불투명하므로 결과도 불투명
+        pixels = np.asarray(foreground, dtype=np.float32)
+        alpha = pixels[..., 3:] / 255.0
+        blended = pixels[..., :3] * alpha + backdrop * (1.0 - alpha)
+        return Image.fromarray(np.clip(blended + 0.5, 0, 255).astype(np.uint8), "RGB")
+
+    @staticmethod
+    def encode_image(image: Image.Image, image_format: str = "PNG", quality: Optional[int] = None) -> bytes:
+        """
+        합성 결과를 한 번만 인코딩
 
-            # RGBA 모드로 변환 (투명도 지원)
-            if foreground.mode != "RGBA":
-                foreground = foreground.convert("RGBA")
-            if background.mode != "RGBA":
-                background = background.convert("RGBA")
+        Args:
+            image: 인코딩할 이미지
+            image_format: PNG, WEBP, JPEG
+            quality: WEBP/JPEG 품질 (기본: 85)
 
-            # 이미지 합성 (전경을 배경 위에)
-            result = Image.alpha_composite(background, foreground)
+        Returns:
+            인코딩된 이미지 바이트
+        """
+        image_format = image_format.upper()
+        if image_format == "JPG":
+            image_format = "JPEG"
+
+        output = io.BytesIO()
+        if image_format == "PNG":
+            image.save(output, format="PNG")
+        else:
+            if image_format == "JPEG" and image.mode != "RGB":
+                image = image.convert("RGB")
+            image.save(output, format=image_format, quality=quality or 85)
+        return output.getvalue()
 
-            # 결과를 바이트로 변환
-            output = io.BytesIO()
-            result.save(output, format="PNG")
-            output.seek(0)
+    def combine_with_background(
+        self, foreground_bytes: bytes, background_bytes: bytes
+    ) -> Optional[bytes]:
+        """
+        전경 이미지와 배경 이미지를 합성
 
+        Args:
+            foreground_bytes: 전경 이미지 바이트 데이터 (투명 배경)
+            background_bytes: 배경 이미지 바이트 데이터
+
+        Returns:
+            합성된 이미지의 바이트 데이터 (PNG 형식)
+        """
+        try:
+            result = self.composite(self.load_image(foreground_bytes), self.load_image(background_bytes))
             logger.info("이미지 합성 완료")
-            return output.getvalue()
+            return self.encode_image(result)
 
         except Exception as e:
             logger.error(f"이미지 합성 중 오류 발생: {e}")
@@ -174,26 +374,12 @@ class BackgroundRemovalService:
             색상 배경 이미지의 바이트 데이터
         """
         try:
-            # PIL Image 객체로 변환
-            foreground = Image.open(io.BytesIO(foreground_bytes))
-
-            # 색상 코드 파싱
-            if color_hex.startswith("#"):
-                color_hex = color_hex[1:]
-
-            # RGB 값으로 변환
-            rgb = tuple(int(color_hex[i : i + 2], 16) for i in (0, 2, 4))
-
-            # 전경 이미지 크기에 맞는 색상 배경 생성
-            background = Image.new("RGBA", foreground.size, rgb + (255,))
-
-            # 결과를 바이트로 변환
-            output = io.BytesIO()
-            background.save(output, format="PNG")
-            output.seek(0)
+            # 전경 이미지 크기만 필요하므로 헤더만 읽음
+            size = Image.open(io.BytesIO(foreground_bytes)).size
+            background = Image.new("RGBA", size, self.parse_color(color_hex) + (255,))
 
             logger.info("색상 배경 생성 완료")
-            return output.getvalue()
+            return self.encode_image(background)
 
         except Exception as e:
             logger.error(f"색상 배경 생성 중 오류 발생: {e}")
@@ -223,18 +409,19 @@ class BackgroundRemovalService:
             logger.error(f"이미지 저장 중 오류 발생: {e}")
             return False
 
-    def remove_background_advanced(self, image_path: str) -> Optional[bytes]:
+    def remove_background_advanced(self, image_path: str, model_name: Optional[str] = None) -> Optional[bytes]:
         """
         고급 배경 제거 (여러 방법 시도)
 
         Args:
             image_path: 입력 이미지 경로
+            model_name: rembg 모델 (기본: REMBG_MODEL)
 
         Returns:
             배경 제거된 이미지의 바이트 데이터 (PNG 형식)
         """
         # 먼저 rembg 시도
-        result = self.remove_background_rembg(image_path)
+        result = self.remove_background_rembg(image_path, model_name)
         if result:
             return result
 
@@ -0,0 +1,122 @@
+"""
+상품 카탈로그 패싯(카테고리/성별/브랜드) 인덱스
+
+(main_category, sub_category, gender, brand_name) 조합별 상품 수를 GROUP BY 한 번으로 집계해
+메모리와 Redis에 보관하고, 카테고리 목록과 브라우징 패싯 개수를 이 집계에서 계산한다.
+집계는 읽기 캐시의 catalog 태그 버전을 따르므로, 상품 데이터를 적재한 뒤 invalidate()
+(또는 invalidate_tags("catalog"))로 버전을 올리면 모든 서버가 다음 요청에서 다시 집계한다.
+"""
+
+import os
+import json
+import time
+import logging
+import threading
+from typing import Any, Dict, List, Optional
+
+from app.core.redis_config import redis_manager
+from app.core.cache import cache_backend, CATALOG_TAG
+
+logger = logging.getLogger(__name__)
+
+FACET_FIELDS = ("main_category", "sub_category", "gender", "brand_name")
+
+
+class CatalogFacetIndex:
+    def __init__(self):
+        self.redis_key = "catalog:facets"
+        # 무효화 없이 데이터가 바뀐 경우를 대비한 최대 보관 시간(초)
+        self.ttl = int(os.getenv("CATALOG_FACET_TTL", 600))
+        self._rows: Optional[List[List[Any]]] = None
+        self._version: Optional[str] = None
+        self._loaded_at = 0.0
+        self._lock = threading.Lock()
+
+    def _current_version(self) -> str:
+        return cache_backend.tag_versions([CATALOG_TAG])[0]
+
+    def _build(self, db) -> List[List[Any]]:
+        """조합별 상품 수 집계 (카탈로그 전체 1회 스캔)"""
+        from sqlalchemy import func
+        from app.models.clothing_items import ClothingItems
+
+        columns = [getattr(ClothingItems, field) for field in FACET_FIELDS]
+        rows = db.query(*columns, func.count(ClothingItems.product_id)).group_by(*columns).all()
+        return [list(row) for row in rows]
+
+    def get_rows(self, db) -> List[List[Any]]:
+        """(main, sub, gender, brand, count) 목록 (메모리 → Redis → DB 순)"""
+        version = self._current_version()
+        now = time.time()
+        if self._rows is not None and self._version == version and now - self._loaded_at < self.ttl:
+            return self._rows
+
+        with self._lock:
+            if self._rows is not None and self._version == version and now - self._loaded_at < self.ttl:
+                return self._rows
+
+            rows = None
+            redis_client = redis_manager.get_client()
+            if redis_client:
+                try:
+                    cached = redis_client.get(self.redis_key)
+                    if cached:
+                        payload = json.loads(cached)
+                        if payload.get("version") == version:
+                            rows = payload["rows"]
+                except Exception as e:
+                    logger.warning(f"패싯 캐시 조회 실패: {e}")
+
+            if rows is None:
+                rows = self._build(db)
+                logger.info(f"카탈로그 패싯 집계: {len(rows)}개 조합")
+                if redis_client:
+                    try:
+                        redis_client.set(
+                            self.redis_key,
+                            json.dumps({"version": version, "rows": rows}, ensure_ascii=False),
+                            ex=self.ttl
+                        )
+                    except Exception as e:
+                        logger.warning(f"패싯 캐시 저장 실패: {e}")
+
+            self._rows, self._version, self._loaded_at = rows, version, now
+            return rows
+
+    def invalidate(self):
+        """상품 데이터 변경 후 호출 (모든 서버의 카탈로그 캐시 무효화)"""
+        self._rows = None
+        cache_backend.invalidate_tags(CATALOG_TAG)
+        redis_client = redis_manager.get_client()
+        if redis_client:
+            try:
+                redis_client.delete(self.redis_key)
+            except Exception as e:
+                logger.warning(f"패싯 캐시 삭제 실패: {e}")
+
+    @staticmethod
+    def count_rows(rows: List[List[Any]], filters: Dict[str, Optional[str]]) -> Dict[str, Dict[str, int]]:
+        """필터별 패싯 개수 (각 필드는 자기 자신을 제외한 나머지 필터만 적용)"""
+        facets: Dict[str, Dict[str, int]] = {field: {} for field in FACET_FIELDS}
+        active = {field: value for field, value in filters.items() if value}
+
+        for row in rows:
+            values, count = row[:len(FACET_FIELDS)], row[-1]
+            mismatched = [field for field, value in zip(FACET_FIELDS, values)
+                          if field in active and active[field] != value]
+            for field, value in zip(FACET_FIELDS, values):
+                if not value:
+                    continue
+                # 다른 필드가 모두 맞을 때만 이 필드의 선택지 개수에 포함
+                if any(m != field for m in mismatched):
+                    continue
+                facets[field][value] = facets[field].get(value, 0) + count
+        return facets
+
+    def facet_counts(self, db, filters: Dict[str, Optional[str]]) -> Dict[str, Dict[str, int]]:
+        """현재 필터 기준 패싯 개수"""
+        return self.count_rows(self.get_rows(db), filters)
+
+
+# 전역 패싯 인덱스 인스턴스
+catalog_facet_index = CatalogFacetIndex()
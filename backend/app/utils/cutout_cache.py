@@ -0,0 +1,113 @@
+"""
+배경 커스텀 전경(누끼) 캐시
+
+배경 커스텀은 같은 피팅 결과에 배경만 바꿔 미리보기를 여러 번 요청하는데,
+매번 u2net으로 같은 이미지의 배경을 다시 제거하는 것이 처리 시간의 대부분이다.
+피팅 결과별로 배경 제거된 RGBA 전경을 디스크에 한 번만 저장해 두고 모든 합성에 재사용한다.
+키는 원본 파일의 수정 시각/크기 + 모델이므로 원본이 덮어써지면 자동으로 다시 계산되고,
+피팅 결과 삭제 시 invalidate()로 함께 지운다.
+"""
+
+import os
+import uuid
+import shutil
+import logging
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+# 프로젝트 루트 (backend)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+class ForegroundCutoutCache:
+    def __init__(self, cache_dir: Optional[Path] = None):
+        self.enabled = os.getenv("CUTOUT_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.cache_dir = cache_dir or PROJECT_ROOT / "uploads" / "background_custom" / "cutouts"
+
+    def _entry_dir(self, fitting_id: int) -> Path:
+        return self.cache_dir / str(int(fitting_id))
+
+    def _signature(self, image_path: str) -> Optional[str]:
+        """원본 파일 서명 (수정 시각 + 크기, 파일이 없으면 None)"""
+        try:
+            stat = os.stat(image_path)
+        except OSError:
+            return None
+        return f"{stat.st_mtime_ns}-{stat.st_size}"
+
+    def _filename(self, signature: str, model_name: str, max_size: Optional[int]) -> str:
+        # 미리보기용 축소 전경은 원본 크기 전경과 따로 보관
+        suffix = f"_{max_size}" if max_size else ""
+        return f"{signature}_{model_name}{suffix}.png"
+
+    def get(
+        self, fitting_id: Optional[int], image_path: str, model_name: str, max_size: Optional[int] = None
+    ) -> Optional[bytes]:
+        """저장된 전경 PNG 바이트 (없거나 원본이 바뀌었으면 None)"""
+        if fitting_id is None or not self.enabled:
+            return None
+
+        signature = self._signature(image_path)
+        if signature is None:
+            return None
+
+        path = self._entry_dir(fitting_id) / self._filename(signature, model_name, max_size)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except OSError as e:
+            logger.warning(f"전경 캐시 읽기 실패: {e}")
+            return None
+
+        logger.info(f"전경 캐시 적중: fitting_id={fitting_id}, model={model_name}, max_size={max_size}")
+        return data
+
+    def put(
+        self,
+        fitting_id: Optional[int],
+        image_path: str,
+        model_name: str,
+        foreground_bytes: bytes,
+        max_size: Optional[int] = None,
+    ):
+        """전경 저장 (같은 피팅의 이전 원본 기준 항목은 삭제)"""
+        if fitting_id is None or not self.enabled or not foreground_bytes:
+            return
+
+        signature = self._signature(image_path)
+        if signature is None:
+            return
+
+        entry = self._entry_dir(fitting_id)
+        filename = self._filename(signature, model_name, max_size)
+        # 임시 파일에 쓴 뒤 교체하여 다른 프로세스가 반쯤 쓰인 파일을 읽지 않도록 함
+        staging = entry / f".tmp_{uuid.uuid4().hex}"
+        try:
+            entry.mkdir(parents=True, exist_ok=True)
+            with open(staging, "wb") as f:
+                f.write(foreground_bytes)
+            os.replace(staging, entry / filename)
+        except OSError as e:
+            logger.warning(f"전경 캐시 저장 실패: {e}")
+            staging.unlink(missing_ok=True)
+            return
+
+        # 원본이 덮어써지기 전의 전경은 다시 쓰이지 않음
+        for stale in entry.glob("*.png"):
+            if not stale.name.startswith(f"{signature}_"):
+                stale.unlink(missing_ok=True)
+
+    def invalidate(self, fitting_id: int):
+        """피팅 결과의 전경 캐시 삭제 (결과 삭제/원본 교체 시 호출)"""
+        entry = self._entry_dir(fitting_id)
+        if entry.exists():
+            shutil.rmtree(entry, ignore_errors=True)
+            logger.info(f"전경 캐시 삭제: fitting_id={fitting_id}")
+
+
+# 전역 전경 캐시 인스턴스
+cutout_cache = ForegroundCutoutCache()
@@ -16,6 +16,7 @@ from app.db.database import SessionLocal
 from app.models.virtual_fitting_process import VirtualFittingProcess
 from app.models.virtual_fittings import VirtualFittings
 from app.core.task_queue import task_queue
+from app.utils.fitting_result_cache import fitting_result_cache
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -177,6 +178,28 @@ class FastFittingService:
             logger.warning(f"입력 이미지 경로 저장 실패(무시): {e}")
         
         logger.info(f"빠른 가상 피팅 프로세스 생성: {process.id}")
+
+        # 동일 입력/옵션 결과가 캐시에 있으면 큐를 거치지 않고 바로 완료
+        cache_key = fitting_result_cache.make_key(
+            "fast_fitting",
+            [person_image_path, upper_cloth_image_path, lower_cloth_image_path],
+            {
+                "fitting_type": fitting_type,
+                "garment_description": garment_description,
+                "model_type": model_type,
+                "leffa_options": leffa_options,
+            }
+        )
+        cached_paths = fitting_result_cache.get(cache_key)
+        if cached_paths:
+            process.result_image_1 = cached_paths[0]
+            process.status = 'COMPLETED'
+            process.completed_at = datetime.now(pytz.timezone('Asia/Seoul'))
+            db.commit()
+            # 워커를 거치지 않으므로 업로드된 임시 입력 파일은 여기서 정리
+            self._cleanup_temp_files(person_image_path, upper_cloth_image_path, lower_cloth_image_path)
+            logger.info(f"캐시된 결과로 빠른 가상 피팅 완료: {process.id}")
+            return process.id
         
         # 작업 데이터 준비
         task_data = {
@@ -188,7 +211,8 @@ class FastFittingService:
             "fitting_type": fitting_type,
             "garment_description": garment_description,
             "model_type": model_type,
-            "leffa_options": leffa_options
+            "leffa_options": leffa_options,
+            "cache_key": cache_key
         }
         
         # Redis 큐에 작업 추가
@@ -237,6 +261,7 @@ class FastFittingService:
             db.commit()
             
             logger.info(f"빠른 가상 피팅 처리 시작: {process_id}, 타입: {fitting_type}")
+            task_queue.publish_progress(process_id, 10, "이미지 생성 중")
             
             # 피팅 타입에 따라 처리
             if fitting_type == "상의+하의":
@@ -253,6 +278,7 @@ class FastFittingService:
                 
                 # 상의 결과 저장
                 upper_result_path = self._save_result_image(upper_result[0], user_id, "upper")
+                task_queue.publish_progress(process_id, 50, "상의 피팅 완료, 하의 피팅 중")
                 
                 # 2. 하의 피팅 (상의 결과 이미지를 입력으로 사용)
                 logger.info("하의 피팅 시작")
@@ -301,6 +327,8 @@ class FastFittingService:
             process.status = 'COMPLETED'
             process.completed_at = datetime.now(pytz.timezone('Asia/Seoul'))
             db.commit()
+
+            fitting_result_cache.put(task_data.get("cache_key"), [process.result_image_1])
             
             # 임시 파일 정리 (원본 person_images는 절대 삭제 금지!)
             self._cleanup_temp_files(person_image_path, upper_cloth_image_path, lower_cloth_image_path)
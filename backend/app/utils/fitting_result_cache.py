@@ -0,0 +1,178 @@
+"""
+가상 피팅 결과 캐시
+
+입력 이미지 내용 해시 + 피팅 파라미터를 키로 결과 이미지를 디스크에 보관한다.
+같은 인물/의류/옵션 조합이 다시 들어오면 diffusion 또는 Gradio 호출 없이 결과를 복사해 돌려준다.
+용량을 넘으면 가장 오래 사용되지 않은 항목부터 삭제한다 (LRU).
+"""
+
+import os
+import json
+import uuid
+import shutil
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 프로젝트 루트 (backend)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+
+class FittingResultCache:
+    def __init__(self, cache_dir: Optional[Path] = None, max_bytes: Optional[int] = None):
+        self.enabled = os.getenv("FITTING_CACHE_ENABLED", "true").lower() in ("1", "true", "yes")
+        self.cache_dir = cache_dir or PROJECT_ROOT / "uploads" / "fitting_cache"
+        self.result_dir = PROJECT_ROOT / "uploads" / "virtual_fitting_results"
+        self.max_bytes = max_bytes or int(os.getenv("FITTING_CACHE_MAX_MB", 2048)) * 1024 * 1024
+        self._lock = threading.Lock()
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.result_dir.mkdir(parents=True, exist_ok=True)
+
+    def _resolve(self, image_path: str) -> Optional[Path]:
+        """저장된 경로(상대/절대 혼재)를 실제 파일 경로로 변환"""
+        path = Path(image_path.replace('\\', '/'))
+        if path.is_absolute():
+            return path if path.exists() else None
+        for candidate in (PROJECT_ROOT / path, path.resolve()):
+            if candidate.exists():
+                return candidate
+        return None
+
+    def file_digest(self, image_path: Optional[str]) -> Optional[str]:
+        """입력 이미지 내용 해시 (URL은 주소 문자열 기준)"""
+        if not image_path:
+            return "none"
+        if image_path.startswith('http://') or image_path.startswith('https://'):
+            return hashlib.sha256(image_path.encode()).hexdigest()
+
+        path = self._resolve(image_path)
+        if path is None:
+            return None
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def make_key(self, kind: str, image_paths: List[Optional[str]], params: Dict[str, Any]) -> Optional[str]:
+        """캐시 키 생성 (입력 파일을 읽을 수 없으면 None)"""
+        if not self.enabled:
+            return None
+
+        try:
+            digests = [self.file_digest(p) for p in image_paths]
+        except OSError as e:
+            logger.warning(f"캐시 키 생성 실패 (입력 이미지 읽기 오류): {e}")
+            return None
+        if any(d is None for d in digests):
+            return None
+
+        payload = json.dumps({"kind": kind, "inputs": digests, "params": params}, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entry_dir(self, key: str) -> Path:
+        return self.cache_dir / key
+
+    def get(self, key: Optional[str]) -> Optional[List[str]]:
+        """캐시 적중 시 결과 이미지를 새 파일로 복사하고 DB 저장용 상대 경로 반환"""
+        if not key or not self.enabled:
+            return None
+
+        entry = self._entry_dir(key)
+        manifest_path = entry / "manifest.json"
+        if not manifest_path.exists():
+            return None
+
+        try:
+            with open(manifest_path, encoding='utf-8') as f:
+                filenames = json.load(f)["files"]
+
+            # 결과는 선택/취소 시 삭제되므로 캐시 원본이 아닌 복사본을 넘김
+            result_paths = []
+            for i, filename in enumerate(filenames):
+                dest_name = f"{uuid.uuid4()}_result_{i}.png"
+                shutil.copy(str(entry / filename), str(self.result_dir / dest_name))
+                result_paths.append(f"uploads/virtual_fitting_results/{dest_name}")
+
+            # LRU 갱신
+            os.utime(str(entry), None)
+            logger.info(f"피팅 결과 캐시 적중: {key[:12]} ({len(result_paths)}개)")
+            return result_paths
+
+        except Exception as e:
+            logger.warning(f"피팅 결과 캐시 읽기 실패, 항목 삭제: {e}")
+            shutil.rmtree(entry, ignore_errors=True)
+            return None
+
+    def put(self, key: Optional[str], result_paths: List[str]):
+        """결과 이미지를 캐시에 저장"""
+        if not key or not self.enabled or not result_paths:
+            return
+
+        entry = self._entry_dir(key)
+        if entry.exists():
+            return
+
+        # 임시 디렉토리에 모두 쓴 뒤 rename하여 반쯤 쓰인 항목이 보이지 않도록 함
+        staging = self.cache_dir / f".tmp_{uuid.uuid4().hex}"
+        try:
+            staging.mkdir(parents=True)
+            filenames = []
+            for i, result_path in enumerate(result_paths):
+                source = self._resolve(result_path)
+                if source is None:
+                    raise FileNotFoundError(f"결과 이미지를 찾을 수 없음: {result_path}")
+                filename = f"{i}{source.suffix or '.png'}"
+                shutil.copy(str(source), str(staging / filename))
+                filenames.append(filename)
+
+            with open(staging / "manifest.json", 'w', encoding='utf-8') as f:
+                json.dump({"files": filenames}, f)
+
+            os.rename(str(staging), str(entry))
+            logger.info(f"피팅 결과 캐시 저장: {key[:12]} ({len(filenames)}개)")
+        except FileExistsError:
+            pass  # 다른 워커가 먼저 저장함
+        except OSError as e:
+            if not entry.exists():
+                logger.warning(f"피팅 결과 캐시 저장 실패: {e}")
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+        self.evict()
+
+    def evict(self):
+        """용량 초과 시 가장 오래 사용되지 않은 항목부터 삭제"""
+        with self._lock:
+            entries = []
+            total = 0
+            for entry in self.cache_dir.iterdir():
+                if not entry.is_dir() or entry.name.startswith('.tmp_'):
+                    continue
+                try:
+                    size = sum(f.stat().st_size for f in entry.iterdir())
+                    entries.append((entry.stat().st_mtime, size, entry))
+                    total += size
+                except OSError:
+                    continue
+
+            if total <= self.max_bytes:
+                return
+
+            entries.sort()
+            for _, size, entry in entries:
+                if total <= self.max_bytes:
+                    break
+                shutil.rmtree(entry, ignore_errors=True)
+                total -= size
+                logger.info(f"피팅 결과 캐시 삭제 (LRU): {entry.name[:12]}")
+
+
+# 전역 캐시 인스턴스
+fitting_result_cache = FittingResultCache()
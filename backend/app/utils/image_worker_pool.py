@@ -0,0 +1,133 @@
+"""
+이미지 처리 프로세스 풀
+
+배경 제거(u2net 추론)와 합성은 CPU를 수 초간 점유하므로 async 라우트에서 바로 호출하면
+같은 프로세스의 모든 요청이 멈춘다. 별도 프로세스 풀에서 실행하고 결과를 await로 받으며,
+대기 중인 작업이 한도를 넘으면 바로 거절해(503) 요청이 무한정 쌓이지 않도록 한다.
+"""
+
+import os
+import asyncio
+import logging
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ImageWorkerBusy(Exception):
+    """대기 작업 한도 초과"""
+
+
+class ImageJobError(Exception):
+    """이미지 작업 실패 (사용자에게 보여줄 메시지)"""
+
+
+# ===== 워커 프로세스에서 실행되는 작업 =====
+
+def _init_worker():
+    """워커 프로세스 시작 시 기본 모델 세션 예열 (첫 요청 지연 제거)"""
+    from app.utils.background_removal_service import background_removal_service
+
+    try:
+        background_removal_service.warmup()
+    except Exception as e:
+        logger.warning(f"rembg 세션 예열 실패 (첫 요청 시 생성): {e}")
+
+
+def compose_background(
+    original_image_path: str,
+    background_bytes: Optional[bytes] = None,
+    background_color: Optional[str] = None,
+    model_name: Optional[str] = None,
+    fitting_id: Optional[int] = None,
+    output_format: str = "PNG",
+    quality: Optional[int] = None,
+    max_size: Optional[int] = None,
+) -> bytes:
+    """원본 이미지 배경 제거 후 배경 이미지/색상과 합성 (output_format으로 한 번만 인코딩)
+
+    fitting_id가 있으면 배경 제거 결과(전경)를 피팅 결과별로 캐시해 다음 합성에 재사용한다.
+    max_size가 있으면 긴 변을 그 크기로 줄여 추론/합성한다 (미리보기).
+    """
+    from app.utils.background_removal_service import background_removal_service
+    from app.utils.cutout_cache import cutout_cache
+
+    model_name = background_removal_service.resolve_model(model_name)
+    foreground_bytes = cutout_cache.get(fitting_id, original_image_path, model_name, max_size)
+    if foreground_bytes is None:
+        if max_size:
+            # 원본 크기 전경이 이미 있으면 추론 없이 축소만
+            full_foreground = cutout_cache.get(fitting_id, original_image_path, model_name)
+            foreground_bytes = background_removal_service.remove_background_downscaled(
+                original_image_path, max_size, model_name, full_foreground
+            )
+        else:
+            foreground_bytes = background_removal_service.remove_background_advanced(original_image_path, model_name)
+        if not foreground_bytes:
+            raise ImageJobError("배경 제거에 실패했습니다.")
+        cutout_cache.put(fitting_id, original_image_path, model_name, foreground_bytes, max_size)
+
+    try:
+        foreground = background_removal_service.load_image(foreground_bytes)
+        background = background_removal_service.load_image(background_bytes) if background_bytes is not None else None
+    except Exception as e:
+        logger.error(f"합성 이미지 디코딩 실패: {e}")
+        raise ImageJobError("배경 이미지를 읽을 수 없습니다.")
+
+    try:
+        combined = background_removal_service.composite(foreground, background, background_color)
+        return background_removal_service.encode_image(combined, output_format, quality)
+    except Exception as e:
+        logger.error(f"이미지 합성 중 오류 발생: {e}")
+        raise ImageJobError("이미지 합성에 실패했습니다.")
+
+
+# ===== 풀 =====
+
+class ImageWorkerPool:
+    def __init__(self):
+        self.max_workers = int(os.getenv("IMAGE_WORKER_PROCESSES", 2))
+        # 실행 중 + 대기 중 작업 최대 수
+        self.max_pending = int(os.getenv("IMAGE_WORKER_MAX_PENDING", self.max_workers * 2))
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # fork 시 부모의 onnxruntime 스레드 상태가 복제되지 않도록 spawn 사용
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                logger.info(f"이미지 처리 프로세스 풀 시작: {self.max_workers}개")
+            return self._executor
+
+    async def run(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """작업을 풀에서 실행하고 결과 대기 (한도 초과 시 ImageWorkerBusy)"""
+        if not self._slots.acquire(blocking=False):
+            raise ImageWorkerBusy("이미지 처리 요청이 많습니다. 잠시 후 다시 시도해주세요.")
+
+        try:
+            future = self._get_executor().submit(func, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        # 요청이 취소돼도 작업이 끝날 때 슬롯 반환
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
+
+
+# 전역 이미지 처리 풀 인스턴스
+image_worker_pool = ImageWorkerPool()
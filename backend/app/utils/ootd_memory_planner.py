@@ -0,0 +1,190 @@
+"""
+OOTDiffusion GPU 메모리 플래너
+
+실행 전에 (model_type, samples, scale, 해상도)로 최대 GPU 메모리 사용량을 추정하고,
+현재 사용 가능한 메모리 안에서 가장 큰 (scale, samples) 조합을 고른다.
+실행 결과(최대 사용량, OOM 여부)를 기록해 추정치를 계속 보정한다.
+"""
+
+import os
+import json
+import subprocess
+import logging
+from typing import Dict, List, Optional, Tuple, Union
+
+from app.core.redis_config import redis_manager
+from app.utils.ootd_model_host import ootd_host_client
+
+logger = logging.getLogger(__name__)
+
+GB = 1024 ** 3
+
+# OOTDiffusion 입력 해상도 (run_ootd.py / 모델 호스트 모두 768x1024로 리사이즈)
+REFERENCE_PIXELS = 768 * 1024
+
+# 파이프라인 가중치 (UNet 2개 + VAE + 텍스트/이미지 인코더, fp16) 추정치
+BASE_MODEL_GB = {"hd": 7.5, "dc": 8.0}
+# OpenPose + Human Parsing
+PREPROCESS_GB = 1.0
+# 768x1024 기준 샘플 1장(CFG 분기 1개)당 활성화 메모리 초기 추정치
+DEFAULT_PER_SAMPLE_GB = 1.2
+
+# 시도해 볼 scale 후보 (요청값 이하만 사용)
+SCALE_CANDIDATES = [2.0, 1.5, 1.0]
+
+
+def is_oom_error(error: Union[Exception, str]) -> bool:
+    """GPU 메모리 부족 오류 여부 (예외 또는 오류 메시지)"""
+    message = str(error).lower()
+    return "out of memory" in message or "cublas" in message or "cuda error" in message
+
+
+class OOTDMemoryPlanner:
+    def __init__(self):
+        self.gpu_id = int(os.getenv("OOTD_GPU_ID", 0))
+        # 측정이 불가능한 환경에서 사용할 GPU 메모리 (GB, 미설정 시 계획 없이 요청값 사용)
+        self.fixed_budget_gb = float(os.getenv("OOTD_GPU_MEMORY_GB", 0)) or None
+        # 다른 프로세스/단편화 대비 여유분
+        self.reserve_gb = float(os.getenv("OOTD_GPU_RESERVE_GB", 0.5))
+        self.ema_alpha = 0.3
+        self.stats_key = "ootd_memory_planner"
+        self._local_stats: Dict[str, Dict[str, float]] = {}
+
+    # ===== 통계 =====
+
+    def _load_stats(self, model_type: str) -> Dict[str, float]:
+        stats = {"per_sample_gb": DEFAULT_PER_SAMPLE_GB, "safety": 1.1}
+        stats.update(self._local_stats.get(model_type, {}))
+
+        redis_client = redis_manager.get_client()
+        if redis_client:
+            try:
+                raw = redis_client.hget(self.stats_key, model_type)
+                if raw:
+                    stats.update(json.loads(raw))
+            except Exception as e:
+                logger.warning(f"메모리 플래너 통계 조회 실패: {e}")
+        return stats
+
+    def _save_stats(self, model_type: str, stats: Dict[str, float]):
+        self._local_stats[model_type] = stats
+
+        redis_client = redis_manager.get_client()
+        if redis_client:
+            try:
+                redis_client.hset(self.stats_key, model_type, json.dumps(stats))
+            except Exception as e:
+                logger.warning(f"메모리 플래너 통계 저장 실패: {e}")
+
+    # ===== 추정 =====
+
+    def estimate_gb(
+        self,
+        model_type: str,
+        samples: int,
+        scale: float,
+        pixels: int = REFERENCE_PIXELS,
+        include_weights: bool = True
+    ) -> float:
+        """최대 GPU 메모리 사용량 추정 (GB)"""
+        stats = self._load_stats(model_type)
+        # scale > 1이면 classifier-free guidance로 배치가 두 배
+        branches = 2 if scale > 1.0 else 1
+        activations = stats["per_sample_gb"] * samples * branches * (pixels / REFERENCE_PIXELS)
+        weights = BASE_MODEL_GB.get(model_type, 8.0) + PREPROCESS_GB if include_weights else 0.0
+        return (weights + activations) * stats["safety"]
+
+    def _nvidia_smi_free_gb(self) -> Optional[float]:
+        try:
+            output = subprocess.run(
+                ["nvidia-smi", "--query-gpu=memory.free", "--format=csv,noheader,nounits", "-i", str(self.gpu_id)],
+                capture_output=True, text=True, timeout=5
+            )
+            if output.returncode == 0 and output.stdout.strip():
+                return float(output.stdout.strip().splitlines()[0]) / 1024
+        except Exception:
+            pass
+        return None
+
+    def available_gb(self, model_type: str) -> Tuple[Optional[float], bool]:
+        """사용 가능한 메모리 (GB)와 가중치가 이미 올라가 있는지 여부"""
+        if ootd_host_client.enabled:
+            info = ootd_host_client.memory_info()
+            if info and "free_bytes" in info:
+                free_gb = info["free_bytes"] / GB
+                loaded = info.get("models", [])
+                if model_type in loaded:
+                    return free_gb - self.reserve_gb, True
+                # 다른 파이프라인이 밀려나면서 돌려받을 메모리 포함
+                if loaded and len(loaded) >= info.get("max_models", 1):
+                    free_gb += BASE_MODEL_GB.get(loaded[-1], 8.0)
+                return free_gb - self.reserve_gb, False
+
+        free_gb = self._nvidia_smi_free_gb() or self.fixed_budget_gb
+        if free_gb is None:
+            return None, False
+        return free_gb - self.reserve_gb, False
+
+    def _candidates(self, scale: float, samples: int) -> List[Tuple[float, int]]:
+        """선호 순서대로 정렬된 (scale, samples) 후보 (화질 유지를 위해 scale을 먼저 지킴)"""
+        scales = [scale] + [s for s in SCALE_CANDIDATES if s < scale]
+        return [(s, n) for s in scales for n in range(samples, 0, -1)]
+
+    def plan(
+        self,
+        model_type: str,
+        scale: float,
+        samples: int,
+        budget_gb: Optional[float] = None
+    ) -> Tuple[float, int]:
+        """사용 가능한 메모리에 맞는 가장 큰 (scale, samples) 선택"""
+        weights_loaded = False
+        if budget_gb is None:
+            budget_gb, weights_loaded = self.available_gb(model_type)
+        if budget_gb is None:
+            logger.info("GPU 메모리를 측정할 수 없어 요청 설정 그대로 실행")
+            return scale, samples
+
+        candidates = self._candidates(scale, samples)
+        for scale_try, samples_try in candidates:
+            estimate = self.estimate_gb(model_type, samples_try, scale_try, include_weights=not weights_loaded)
+            if estimate <= budget_gb:
+                logger.info(
+                    f"메모리 계획: scale={scale_try}, samples={samples_try} "
+                    f"(추정 {estimate:.1f}GB / 가용 {budget_gb:.1f}GB)"
+                )
+                return scale_try, samples_try
+
+        logger.warning(f"가용 메모리 {budget_gb:.1f}GB로는 최소 설정도 부족할 수 있음, 최소 설정으로 실행")
+        return candidates[-1]
+
+    def record(
+        self,
+        model_type: str,
+        scale: float,
+        samples: int,
+        success: bool,
+        oom: bool = False,
+        peak_bytes: Optional[int] = None
+    ):
+        """실행 결과로 추정치 보정"""
+        stats = self._load_stats(model_type)
+        branches = 2 if scale > 1.0 else 1
+
+        if success and peak_bytes:
+            # 측정된 최대 사용량에서 가중치를 뺀 나머지를 샘플당 활성화 메모리로 환산
+            activations = peak_bytes / GB - BASE_MODEL_GB.get(model_type, 8.0) - PREPROCESS_GB
+            if activations > 0:
+                observed = activations / (samples * branches)
+                stats["per_sample_gb"] += self.ema_alpha * (observed - stats["per_sample_gb"])
+            # 실측 기반이면 안전 계수를 천천히 낮춤
+            stats["safety"] = max(1.05, stats["safety"] * 0.98)
+        elif oom:
+            # 추정이 모자랐으므로 안전 계수 상향
+            stats["safety"] = min(2.0, stats["safety"] * 1.15)
+
+        self._save_stats(model_type, stats)
+
+
+# 전역 플래너 인스턴스
+ootd_memory_planner = OOTDMemoryPlanner()
@@ -0,0 +1,432 @@
+"""
+OOTDiffusion 모델 호스트
+
+워커 옆에서 상주하는 별도 프로세스로 OOTDiffusion 파이프라인을 한 번만 로드하고,
+로컬 IPC(multiprocessing.connection)로 추론 요청을 받아 처리한다.
+매 작업마다 run_ootd.py를 새로 실행하며 모델 가중치를 다시 읽던 비용을 없애기 위함.
+
+실행: python -m app.utils.ootd_model_host
+"""
+
+import os
+import sys
+import time
+import threading
+import subprocess
+import logging
+from pathlib import Path
+from multiprocessing import AuthenticationError
+from multiprocessing.connection import Listener, Client
+from typing import Dict, Any, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 프로젝트 루트 (backend)
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+OOTD_ROOT = PROJECT_ROOT / "app" / "api" / "ml_models" / "OOTDiffusion"
+
+# IPC 설정 (로컬 전용)
+OOTD_HOST_ADDRESS = (
+    os.getenv("OOTD_HOST_ADDR", "127.0.0.1"),
+    int(os.getenv("OOTD_HOST_PORT", 6390)),
+)
+
+# 인증 키 파일 (OOTD_HOST_AUTHKEY가 없을 때 같은 서버의 워커/호스트가 공유)
+OOTD_HOST_AUTHKEY_FILE = Path(os.getenv("OOTD_HOST_AUTHKEY_FILE") or PROJECT_ROOT / ".ootd_host_authkey")
+
+
+def load_authkey(key_file: Path = OOTD_HOST_AUTHKEY_FILE) -> bytes:
+    """IPC 인증 키 (OOTD_HOST_AUTHKEY > 공유 키 파일, 파일이 없으면 무작위 키로 생성)
+
+    연결은 pickle로 주고받으므로 키가 알려지면 호스트에서 임의 코드 실행이 가능하다.
+    워커마다 따로 키를 만들면 두 번째 워커부터 호스트에 인증하지 못하므로 파일로 공유한다.
+    """
+    key = os.getenv("OOTD_HOST_AUTHKEY")
+    if key:
+        return key.encode()
+
+    try:
+        if not key_file.exists():
+            # 임시 파일에 쓴 뒤 link로 게시 (동시에 시작한 워커 중 한 쪽 키만 남음)
+            staging = key_file.with_name(f"{key_file.name}.{os.getpid()}.tmp")
+            fd = os.open(staging, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(os.urandom(32).hex())
+            try:
+                os.link(staging, key_file)
+                logger.info(f"모델 호스트 인증 키 파일 생성: {key_file}")
+            except FileExistsError:
+                pass
+            finally:
+                staging.unlink(missing_ok=True)
+        key = key_file.read_text().strip()
+    except OSError as e:
+        logger.error(f"모델 호스트 인증 키 파일 사용 실패 ({key_file}): {e}")
+
+    if not key:
+        # 키 파일을 쓸 수 없으면 이 워커 전용 키 (슬롯 프로세스/모델 호스트는 환경변수로 상속)
+        logger.error("모델 호스트 인증 키를 공유할 수 없어 워커 전용 키 사용 (워커를 여러 개 띄우면 OOTD_HOST_AUTHKEY 설정 필요)")
+        key = os.urandom(32).hex()
+    os.environ["OOTD_HOST_AUTHKEY"] = key
+    return key.encode()
+
+
+OOTD_HOST_AUTHKEY = load_authkey()
+
+# run_ootd.py와 동일한 카테고리 매핑
+CATEGORY_NAMES = ["upperbody", "lowerbody", "dress"]
+CATEGORY_NAMES_UTILS = ["upper_body", "lower_body", "dresses"]
+
+
+class OOTDModelHostUnavailable(Exception):
+    """모델 호스트에 연결할 수 없음 (subprocess 방식으로 대체해야 함)"""
+
+
+class OOTDModelHostAuthError(OOTDModelHostUnavailable):
+    """모델 호스트 인증 실패 (다른 키를 쓰는 호스트가 이미 포트를 사용 중)"""
+
+
+class OOTDModelHost:
+    """OOTDiffusion 파이프라인을 메모리에 유지하며 추론을 수행하는 서버"""
+
+    def __init__(self, ootd_root: Path = OOTD_ROOT, gpu_id: int = 0):
+        self.ootd_root = ootd_root
+        self.run_dir = ootd_root / "run"
+        self.gpu_id = gpu_id
+        # 동시에 메모리에 올려둘 파이프라인 수 (hd/dc 둘 다 올리면 VRAM 부족 가능)
+        self.max_models = int(os.getenv("OOTD_HOST_MAX_MODELS", 1))
+
+        self._openpose = None
+        self._parsing = None
+        self._get_mask_location = None
+        self._models: Dict[str, Any] = {}
+
+    def _prepare_import_path(self):
+        """run_ootd.py와 같은 실행 환경 구성 (체크포인트가 run 기준 상대 경로)"""
+        for path in (str(self.ootd_root), str(self.run_dir)):
+            if path not in sys.path:
+                sys.path.insert(0, path)
+        os.chdir(str(self.run_dir))
+
+    def _load_preprocess(self):
+        """전처리 모델(OpenPose, Human Parsing) 로드 (최초 1회)"""
+        if self._openpose is not None:
+            return
+
+        from preprocess.openpose.run_openpose import OpenPose
+        from preprocess.humanparsing.run_parsing import Parsing
+        from utils_ootd import get_mask_location
+
+        logger.info("전처리 모델 로드 중...")
+        self._openpose = OpenPose(self.gpu_id)
+        self._parsing = Parsing(self.gpu_id)
+        self._get_mask_location = get_mask_location
+        logger.info("전처리 모델 로드 완료")
+
+    def _get_model(self, model_type: str):
+        """모델 타입별 파이프라인 반환 (없으면 로드)"""
+        if model_type in self._models:
+            return self._models[model_type]
+
+        if model_type not in ("hd", "dc"):
+            raise ValueError("model_type must be 'hd' or 'dc'!")
+
+        # 허용 개수를 넘으면 기존 파이프라인 해제
+        while self._models and len(self._models) >= self.max_models:
+            evicted, _ = self._models.popitem()
+            logger.info(f"파이프라인 해제: {evicted}")
+            self._empty_cuda_cache()
+
+        logger.info(f"OOTDiffusion 파이프라인 로드 중: {model_type}")
+        start = time.time()
+        if model_type == "hd":
+            from ootd.inference_ootd_hd import OOTDiffusionHD
+            model = OOTDiffusionHD(self.gpu_id)
+        else:
+            from ootd.inference_ootd_dc import OOTDiffusionDC
+            model = OOTDiffusionDC(self.gpu_id)
+        logger.info(f"파이프라인 로드 완료: {model_type} ({time.time() - start:.1f}s)")
+
+        self._models[model_type] = model
+        return model
+
+    def _empty_cuda_cache(self):
+        try:
+            import torch
+            torch.cuda.empty_cache()
+        except Exception:
+            pass
+
+    def warmup(self, model_types: List[str]):
+        """지정된 모델 타입을 미리 로드"""
+        self._load_preprocess()
+        for model_type in model_types:
+            self._get_model(model_type)
+
+    def run(self, request: Dict[str, Any]) -> List[str]:
+        """단일 추론 요청 처리 후 저장된 결과 이미지 경로 목록 반환"""
+        from PIL import Image
+
+        model_type = request["model_type"]
+        category = int(request["category"])
+        output_dir = Path(request["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+
+        if model_type == "hd" and category != 0:
+            raise ValueError("model_type 'hd' requires category == 0 (upperbody)!")
+
+        self._load_preprocess()
+        model = self._get_model(model_type)
+
+        cloth_img = Image.open(request["cloth_path"]).resize((768, 1024))
+        model_img = Image.open(request["model_path"]).resize((768, 1024))
+        keypoints = self._openpose(model_img.resize((384, 512)))
+        model_parse, _ = self._parsing(model_img.resize((384, 512)))
+
+        mask, mask_gray = self._get_mask_location(
+            model_type, CATEGORY_NAMES_UTILS[category], model_parse, keypoints
+        )
+        mask = mask.resize((768, 1024), Image.NEAREST)
+        mask_gray = mask_gray.resize((768, 1024), Image.NEAREST)
+        masked_vton_img = Image.composite(mask_gray, model_img, mask)
+
+        images = model(
+            model_type=model_type,
+            category=CATEGORY_NAMES[category],
+            image_garm=cloth_img,
+            image_vton=masked_vton_img,
+            mask=mask,
+            image_ori=model_img,
+            num_samples=int(request.get("samples", 4)),
+            num_steps=int(request.get("steps", 20)),
+            image_scale=float(request.get("scale", 2.0)),
+            seed=int(request.get("seed", -1)),
+        )
+
+        saved_paths = []
+        for image_idx, image in enumerate(images):
+            out_path = output_dir / f"out_{model_type}_{image_idx}.png"
+            image.save(str(out_path))
+            saved_paths.append(str(out_path))
+
+        return saved_paths
+
+    def _reset_peak_memory(self):
+        try:
+            import torch
+            torch.cuda.reset_peak_memory_stats(self.gpu_id)
+        except Exception:
+            pass
+
+    def _peak_memory(self) -> Optional[int]:
+        try:
+            import torch
+            return int(torch.cuda.max_memory_allocated(self.gpu_id))
+        except Exception:
+            return None
+
+    def memory_info(self) -> Dict[str, Any]:
+        """GPU 여유 메모리 (PyTorch 캐시에 잡혀 있지만 비어 있는 영역 포함)"""
+        info: Dict[str, Any] = {"models": list(self._models.keys()), "max_models": self.max_models}
+        try:
+            import torch
+            free, total = torch.cuda.mem_get_info(self.gpu_id)
+            cached_free = torch.cuda.memory_reserved(self.gpu_id) - torch.cuda.memory_allocated(self.gpu_id)
+            info.update({"free_bytes": int(free + cached_free), "total_bytes": int(total)})
+        except Exception as e:
+            logger.warning(f"GPU 메모리 조회 실패: {e}")
+        return info
+
+    def _run_safe(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            self._reset_peak_memory()
+            images = self.run(request)
+            return {"ok": True, "images": images, "peak_bytes": self._peak_memory()}
+        except Exception as e:
+            logger.error(f"모델 호스트 추론 실패: {e}")
+            # CUDA OOM 이후 다음 요청을 위해 캐시 정리
+            self._empty_cuda_cache()
+            return {"ok": False, "error": str(e)}
+
+    def _handle(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        op = message.get("op")
+        if op == "ping":
+            return {"ok": True, "models": list(self._models.keys())}
+        if op == "memory":
+            return {"ok": True, **self.memory_info()}
+        if op == "run":
+            return self._run_safe(message["request"])
+        return {"ok": False, "error": f"알 수 없는 요청: {op}"}
+
+    def serve(self, address=OOTD_HOST_ADDRESS, authkey: bytes = OOTD_HOST_AUTHKEY):
+        """IPC 요청 대기 루프 (요청은 한 번에 하나씩 처리하여 GPU 사용을 직렬화)"""
+        self._prepare_import_path()
+
+        with Listener(address, authkey=authkey) as listener:
+            logger.info(f"OOTDiffusion 모델 호스트 시작: {address}")
+
+            preload = [m for m in os.getenv("OOTD_HOST_PRELOAD", "").split(",") if m]
+            if preload:
+                self.warmup(preload)
+
+            while True:
+                try:
+                    conn = listener.accept()
+                except Exception as e:
+                    logger.warning(f"연결 수락 실패: {e}")
+                    continue
+
+                try:
+                    while True:
+                        try:
+                            message = conn.recv()
+                        except EOFError:
+                            break
+                        conn.send(self._handle(message))
+                except Exception as e:
+                    logger.warning(f"클라이언트 처리 중 오류: {e}")
+                finally:
+                    conn.close()
+
+
+class OOTDModelHostClient:
+    """워커 측 모델 호스트 클라이언트 (필요 시 호스트 프로세스 기동)"""
+
+    def __init__(self, address=OOTD_HOST_ADDRESS, authkey: bytes = OOTD_HOST_AUTHKEY):
+        self.address = address
+        self.authkey = authkey
+        self.enabled = os.getenv("OOTD_MODEL_HOST", "true").lower() in ("1", "true", "yes")
+        self.startup_timeout = float(os.getenv("OOTD_HOST_STARTUP_TIMEOUT", 30))
+        # 기동 실패 후 재시도까지 대기 시간 (그동안은 바로 subprocess로 대체)
+        self.retry_cooldown = float(os.getenv("OOTD_HOST_RETRY_COOLDOWN", 300))
+
+        self._process: Optional[subprocess.Popen] = None
+        self._unavailable_until = 0.0
+        # 마지막 추론의 최대 GPU 메모리 사용량 (메모리 플래너 보정용)
+        self.last_peak_bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _request(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            conn = Client(self.address, authkey=self.authkey)
+        except AuthenticationError as e:
+            raise OOTDModelHostAuthError(f"모델 호스트 인증 실패: {e}")
+        except Exception as e:
+            raise OOTDModelHostUnavailable(f"모델 호스트 연결 실패: {e}")
+
+        try:
+            conn.send(message)
+            return conn.recv()
+        except (EOFError, ConnectionError) as e:
+            raise OOTDModelHostUnavailable(f"모델 호스트 통신 실패: {e}")
+        finally:
+            conn.close()
+
+    def is_alive(self) -> bool:
+        """호스트 응답 여부 (인증 실패는 새 호스트를 띄워도 해결되지 않으므로 예외로 전달)"""
+        try:
+            return bool(self._request({"op": "ping"}).get("ok"))
+        except OOTDModelHostAuthError:
+            raise
+        except OOTDModelHostUnavailable:
+            return False
+
+    def ensure_started(self) -> bool:
+        """호스트가 없으면 프로세스를 띄우고 응답할 때까지 대기"""
+        if not self.enabled:
+            return False
+
+        with self._lock:
+            try:
+                return self._ensure_started()
+            except OOTDModelHostAuthError as e:
+                # 같은 포트에 새 호스트를 띄워도 bind에 실패하므로 조용히 대체하지 않고 설정 오류로 알림
+                if time.time() >= self._unavailable_until:
+                    logger.error(
+                        f"{e} - {self.address}의 모델 호스트가 다른 인증 키를 사용 중입니다. "
+                        f"워커들이 같은 OOTD_HOST_AUTHKEY(또는 OOTD_HOST_AUTHKEY_FILE)를 쓰도록 설정하세요. "
+                        f"{self.retry_cooldown:.0f}초 동안 subprocess 방식 사용"
+                    )
+                    self._unavailable_until = time.time() + self.retry_cooldown
+                return False
+
+    def _ensure_started(self) -> bool:
+        if self.is_alive():
+            return True
+
+        if time.time() < self._unavailable_until:
+            return False
+
+        if self._process is None or self._process.poll() is not None:
+            logger.info("OOTDiffusion 모델 호스트 프로세스 기동")
+            env = os.environ.copy()
+            # VRAM 파편화 완화 설정 (subprocess 방식과 동일)
+            env.setdefault('PYTORCH_CUDA_ALLOC_CONF', 'max_split_size_mb:128,garbage_collection_threshold:0.6')
+            self._process = subprocess.Popen(
+                [sys.executable, "-m", "app.utils.ootd_model_host"],
+                cwd=str(PROJECT_ROOT),
+                env=env,
+            )
+
+        deadline = time.time() + self.startup_timeout
+        while time.time() < deadline:
+            if self.is_alive():
+                logger.info("OOTDiffusion 모델 호스트 연결 성공")
+                return True
+            if self._process.poll() is not None:
+                break
+            time.sleep(0.5)
+
+        logger.warning("OOTDiffusion 모델 호스트 기동 실패, subprocess 방식 사용")
+        self._unavailable_until = time.time() + self.retry_cooldown
+        return False
+
+    def run(self, **request) -> List[str]:
+        """추론 요청 (호스트 오류가 아닌 추론 오류는 그대로 예외 발생)"""
+        if not self.ensure_started():
+            raise OOTDModelHostUnavailable("모델 호스트를 사용할 수 없습니다.")
+
+        self.last_peak_bytes = None
+        reply = self._request({"op": "run", "request": request})
+        if not reply.get("ok"):
+            raise Exception(f"OOTDiffusion 실행 실패 (모델 호스트): {reply.get('error')}")
+        self.last_peak_bytes = reply.get("peak_bytes")
+        return reply["images"]
+
+    def memory_info(self) -> Optional[Dict[str, Any]]:
+        """호스트 프로세스 기준 GPU 메모리 상태 (호스트를 쓸 수 없으면 None)"""
+        if not self.ensure_started():
+            return None
+        try:
+            reply = self._request({"op": "memory"})
+        except OOTDModelHostUnavailable:
+            return None
+        return reply if reply.get("ok") else None
+
+    def shutdown(self):
+        """이 클라이언트가 띄운 호스트 프로세스 종료"""
+        if self._process and self._process.poll() is None:
+            logger.info("OOTDiffusion 모델 호스트 종료")
+            self._process.terminate()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+        self._process = None
+
+
+# 전역 클라이언트 인스턴스
+ootd_host_client = OOTDModelHostClient()
+
+
+def main():
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    gpu_id = int(os.getenv("OOTD_GPU_ID", 0))
+    OOTDModelHost(gpu_id=gpu_id).serve()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+커서(keyset) 페이지네이션 유틸리티
+
+OFFSET은 뒤쪽 페이지로 갈수록 앞의 행을 모두 읽고 버리므로 느려진다.
+마지막 행의 정렬 키(예: created_at, id)를 불투명한 커서로 넘겨주고,
+다음 페이지는 "그 키 다음부터"를 인덱스로 바로 찾아 읽는다.
+"""
+
+import json
+import base64
+from datetime import datetime
+from typing import Any, List, Optional, Sequence
+
+from sqlalchemy import and_, or_
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "dt" in value:
+        return datetime.fromisoformat(value["dt"])
+    return value
+
+
+def encode_cursor(sort_key: str, values: Sequence[Any]) -> str:
+    """정렬 키 값들을 URL에 안전한 커서 문자열로 인코딩"""
+    payload = json.dumps({"k": sort_key, "v": [_encode_value(v) for v in values]}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: Optional[str], sort_key: str) -> Optional[List[Any]]:
+    """커서 디코딩 (정렬 기준이 다르거나 형식이 잘못되면 ValueError)"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        values = [_decode_value(v) for v in payload["v"]]
+    except Exception as e:
+        raise ValueError(f"잘못된 커서입니다: {e}")
+    if payload.get("k") != sort_key:
+        raise ValueError("정렬 기준이 다른 커서입니다.")
+    # NULL과의 비교는 항상 거짓이라 다음 페이지가 조용히 비게 되므로 거부
+    if any(v is None for v in values):
+        raise ValueError("커서에 빈 정렬 값이 있습니다.")
+    return values
+
+
+def keyset_filter(columns: Sequence[Any], values: Sequence[Any], descending: bool):
+    """(c1, c2, ...) > (v1, v2, ...) 조건 (내림차순이면 <)
+
+    행 값 비교(row constructor) 대신 OR로 풀어 써야 MySQL이 인덱스 범위 검색을 사용한다.
+    """
+    conditions = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        prefix = [c == v for c, v in zip(columns[:i], values[:i])]
+        compare = column < value if descending else column > value
+        conditions.append(and_(*prefix, compare))
+    return or_(*conditions)
+
+
+def next_cursor(items: Sequence[Any], limit: int, sort_key: str, attrs: Sequence[str]) -> Optional[str]:
+    """페이지가 가득 찼으면 마지막 항목 기준 다음 커서 반환"""
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    # ORM 객체 또는 캐시된 dict
+    if isinstance(last, dict):
+        return encode_cursor(sort_key, [last[attr] for attr in attrs])
+    return encode_cursor(sort_key, [getattr(last, attr) for attr in attrs])
@@ -0,0 +1,93 @@
+"""
+가상 피팅 상태 스트림 (Server-Sent Events)
+
+TaskQueue가 발행하는 프로세스별 Redis pub/sub 이벤트를 구독해 상태가 바뀔 때만 클라이언트로 전송한다.
+DB는 연결 시점과 완료/실패 시점에만 조회하므로 주기적 폴링을 대체한다.
+"""
+
+import json
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from starlette.concurrency import run_in_threadpool
+
+from app.core.redis_config import redis_manager
+from app.core.task_queue import task_queue
+
+logger = logging.getLogger(__name__)
+
+TERMINAL_STATUSES = ("COMPLETED", "FAILED")
+# 프록시가 유휴 연결을 끊지 않도록 주기적으로 주석 전송
+KEEPALIVE_SECONDS = 15
+# 연결이 끊기면 브라우저(EventSource)가 재연결할 때까지 대기 시간(ms)
+RETRY_MS = 3000
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "X-Accel-Buffering": "no",  # nginx 응답 버퍼링 해제
+}
+
+
+def format_sse(event: str, data: Any) -> str:
+    """SSE 메시지 포맷"""
+    payload = json.dumps(jsonable_encoder(data), ensure_ascii=False)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+async def stream_process_status(
+    request: Request,
+    process_id: int,
+    load_snapshot: Callable[[], Optional[Dict[str, Any]]]
+) -> AsyncIterator[str]:
+    """프로세스 상태 이벤트 스트림 (load_snapshot: DB 기준 현재 상태, 동기 함수)"""
+    yield f"retry: {RETRY_MS}\n\n"
+
+    pubsub = None
+    try:
+        # 현재 상태를 읽기 전에 먼저 구독하여 그 사이 이벤트를 놓치지 않도록 함
+        try:
+            pubsub = redis_manager.get_async_client().pubsub()
+            await pubsub.subscribe(task_queue.events_channel(process_id))
+        except Exception as e:
+            logger.warning(f"상태 이벤트 구독 실패 (현재 상태만 전송): {e}")
+            pubsub = None
+
+        snapshot = await run_in_threadpool(load_snapshot)
+        if snapshot is None:
+            yield format_sse("error", {"detail": "가상 피팅 처리를 찾을 수 없습니다."})
+            return
+
+        yield format_sse("status", snapshot)
+        # 이미 끝났거나 구독할 수 없으면 종료 (클라이언트는 재연결 또는 폴링)
+        if snapshot.get("status") in TERMINAL_STATUSES or pubsub is None:
+            return
+
+        loop = asyncio.get_running_loop()
+        last_sent = loop.time()
+        while not await request.is_disconnected():
+            message = await pubsub.get_message(ignore_subscribe_messages=True, timeout=1.0)
+
+            if message:
+                event = json.loads(message["data"])
+                if event.get("status") in TERMINAL_STATUSES:
+                    # 결과 이미지 등 최종 정보는 DB 기준으로 전송 후 종료
+                    final = await run_in_threadpool(load_snapshot)
+                    yield format_sse("status", final or event)
+                    return
+                yield format_sse("progress", event)
+                last_sent = loop.time()
+
+            elif loop.time() - last_sent >= KEEPALIVE_SECONDS:
+                yield ": keepalive\n\n"
+                last_sent = loop.time()
+
+    finally:
+        if pubsub is not None:
+            try:
+                await pubsub.unsubscribe()
+                await pubsub.close()
+            except Exception:
+                pass
@@ -1,10 +1,12 @@
 import os
+import re
 import uuid
+import random
 import asyncio
 import subprocess
 import sys
 from pathlib import Path
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import datetime, timezone
 import pytz
 from sqlalchemy.orm import Session
@@ -16,6 +18,9 @@ from app.models.virtual_fitting_process import VirtualFittingProcess
 from app.models.virtual_fittings import VirtualFittings
 from app.crud.virtual_fitting import VirtualFittingCRUD
 from app.core.task_queue import task_queue
+from app.utils.ootd_model_host import ootd_host_client, OOTDModelHostUnavailable
+from app.utils.fitting_result_cache import fitting_result_cache
+from app.utils.ootd_memory_planner import ootd_memory_planner, is_oom_error
 
 # 로깅 설정
 logging.basicConfig(level=logging.INFO)
@@ -74,6 +79,18 @@ class VirtualFittingServiceRedis:
             logger.warning(f"입력 이미지 경로 저장 실패(무시): {e}")
         
         logger.info(f"가상 피팅 프로세스 생성: {process.id}")
+
+        # 동일 입력/옵션 결과가 캐시에 있으면 큐를 거치지 않고 바로 완료
+        cache_key = fitting_result_cache.make_key(
+            "virtual_fitting",
+            [model_image_path, cloth_image_path],
+            {"category": category, "model_type": model_type, "scale": scale, "samples": samples}
+        )
+        cached_paths = fitting_result_cache.get(cache_key)
+        if cached_paths:
+            self._complete_with_results(db, process, cached_paths)
+            logger.info(f"캐시된 결과로 가상 피팅 완료: {process.id}")
+            return process.id
         
         # 작업 데이터 준비
         task_data = {
@@ -84,7 +101,8 @@ class VirtualFittingServiceRedis:
             "category": category,
             "model_type": model_type,
             "scale": scale,
-            "samples": samples
+            "samples": samples,
+            "cache_key": cache_key
         }
         
         # Redis 큐에 작업 추가
@@ -127,68 +145,42 @@ class VirtualFittingServiceRedis:
             process.model_image_path = task_data.get("model_image_path")
             process.cloth_image_path = task_data.get("cloth_image_path")
             db.commit()
-            
-            # 실제 가상 피팅 실행 (메모리 이슈 대비 재시도 로직)
-            base_scale = float(task_data.get("scale", 2.0))
-            base_samples = int(task_data.get("samples", 4))
 
-            attempts = [
-                (base_scale, base_samples),             # 1차: 원본
-                (min(base_scale, 1.5), min(base_samples, 2)),  # 2차: 스케일/샘플 감소
-                (1.0, 1),                               # 3차: 최소 설정
-            ]
+            # 같은 조합의 앞선 작업이 먼저 끝났으면 결과 재사용
+            cache_key = task_data.get("cache_key")
+            cached_paths = fitting_result_cache.get(cache_key)
+            if cached_paths:
+                self._complete_with_results(db, process, cached_paths)
+                logger.info(f"캐시된 결과로 가상 피팅 완료: {process_id}")
+                return True
+            
+            # 실제 가상 피팅 실행
+            task_queue.publish_progress(process_id, 10, "이미지 생성 중")
+            result_paths, scale_try, samples_try = self._generate_with_plan(task_data)
 
-            last_error: Optional[Exception] = None
-            result_paths = None
-            for scale_try, samples_try in attempts:
-                try:
-                    logger.info(f"가상 피팅 시도: scale={scale_try}, samples={samples_try}")
-                    result_paths = self._run_ootd_diffusion(
-                        task_data["model_image_path"],
-                        task_data["cloth_image_path"],
-                        task_data["category"],
-                        task_data["model_type"],
-                        scale_try,
-                        samples_try
-                    )
-                    # 성공
-                    break
-                except Exception as e:
-                    last_error = e
-                    err_msg = str(e)
-                    if "CUDA" in err_msg or "cublas" in err_msg.lower() or "out of memory" in err_msg.lower():
-                        logger.warning(f"GPU 메모리 관련 오류 감지, 재시도 진행: {err_msg}")
-                        continue
-                    else:
-                        logger.error(f"가상 피팅 실행 실패(재시도 불가 오류): {err_msg}")
-                        break
+            # 플래너 하향/OOM 재계획으로 요청과 다른 설정으로 생성했으면 같은 키로 캐시하지 않음
+            full_quality = (
+                scale_try == float(task_data.get("scale", 2.0))
+                and samples_try == int(task_data.get("samples", 4))
+            )
 
-            if not result_paths:
-                if last_error:
-                    raise last_error
-                raise Exception("생성된 결과 이미지를 찾을 수 없습니다.")
+            task_queue.publish_progress(process_id, 80, "결과 정리 중")
 
             # 결과 개수를 4개로 보장 (부족 시 추가 실행 또는 중복 채움)
             if len(result_paths) < 4:
                 try:
-                    # 부족한 개수만큼 1씩 추가 실행하여 보충
+                    # 부족한 개수를 새 시드로 한 번에 추가 생성
                     missing = 4 - len(result_paths)
-                    for i in range(missing):
-                        extra = self._run_ootd_diffusion(
-                            task_data["model_image_path"],
-                            task_data["cloth_image_path"],
-                            task_data["category"],
-                            task_data["model_type"],
-                            scale_try,
-                            1
-                        )
-                        if extra:
-                            result_paths.extend(extra[:1])
+                    extra, top_up_scale = self._run_top_up(task_data, scale_try, missing, self._seeds_from_paths(result_paths))
+                    result_paths.extend(extra[:missing])
+                    if top_up_scale != scale_try:
+                        full_quality = False
                 except Exception as e:
                     logger.warning(f"추가 생성 실패, 중복으로 채움: {e}")
-                # 그래도 부족하면 기존 결과 중복으로 채우기
+                # 그래도 부족하면 기존 결과 중복으로 채우기 (중복이 섞인 결과는 캐시하지 않음)
                 while len(result_paths) < 4 and result_paths:
                     result_paths.append(result_paths[-1])
+                    full_quality = False
             
             if not result_paths:
                 raise Exception("생성된 결과 이미지를 찾을 수 없습니다.")
@@ -221,6 +213,11 @@ class VirtualFittingServiceRedis:
             
             db.commit()
             logger.info(f"가상 피팅 완료: {process_id}")
+
+            if full_quality:
+                fitting_result_cache.put(cache_key, result_paths)
+            else:
+                logger.info(f"요청보다 낮은 설정/중복 결과라 캐시 저장 생략: {process_id}")
             
             # 입력 이미지는 선택 페이지에서 미리보기를 위해 유지
             # 최종 선택 또는 취소 시 정리
@@ -250,6 +247,101 @@ class VirtualFittingServiceRedis:
         finally:
             db.close()
     
+    def _generate_with_plan(self, task_data: Dict[str, Any]) -> Tuple[List[str], float, int]:
+        """메모리 플래너가 고른 설정으로 OOTDiffusion 실행 (OOM 시 보정 후 한 번만 재계획), (결과 경로, 사용한 scale, samples) 반환"""
+        model_type = task_data["model_type"]
+        scale_try, samples_try = ootd_memory_planner.plan(
+            model_type,
+            float(task_data.get("scale", 2.0)),
+            int(task_data.get("samples", 4))
+        )
+        # 결과 파일명에 남기기 위해 시드를 직접 지정
+        seed = self._new_seed()
+
+        for replanned in (False, True):
+            try:
+                logger.info(f"가상 피팅 실행: scale={scale_try}, samples={samples_try}, seed={seed}")
+                result_paths = self._run_ootd_diffusion(
+                    task_data["model_image_path"],
+                    task_data["cloth_image_path"],
+                    task_data["category"],
+                    model_type,
+                    scale_try,
+                    samples_try,
+                    seed
+                )
+                ootd_memory_planner.record(
+                    model_type, scale_try, samples_try, success=True,
+                    peak_bytes=ootd_host_client.last_peak_bytes
+                )
+                if not result_paths:
+                    raise Exception("생성된 결과 이미지를 찾을 수 없습니다.")
+                return result_paths, scale_try, samples_try
+
+            except Exception as e:
+                if replanned or not is_oom_error(e):
+                    raise
+                ootd_memory_planner.record(model_type, scale_try, samples_try, success=False, oom=True)
+
+                # 보정된 추정치로 현재보다 작은 설정 중에서 다시 계획
+                next_plan = ootd_memory_planner.plan(model_type, scale_try, max(samples_try - 1, 1))
+                if next_plan == (scale_try, samples_try):
+                    raise
+                logger.warning(f"GPU 메모리 부족, 재계획: {(scale_try, samples_try)} -> {next_plan}")
+                scale_try, samples_try = next_plan
+
+    def _new_seed(self, used: Optional[List[int]] = None) -> int:
+        """사용하지 않은 랜덤 시드"""
+        while True:
+            seed = random.randint(0, 2 ** 31 - 1)
+            if not used or seed not in used:
+                return seed
+
+    def _run_top_up(
+        self,
+        task_data: Dict[str, Any],
+        scale: float,
+        missing: int,
+        used_seeds: List[int]
+    ) -> Tuple[List[str], float]:
+        """부족한 샘플을 한 번의 실행으로 추가 생성 (기존 결과와 다른 시드 사용), (결과 경로, 사용한 scale) 반환"""
+        scale_try, samples_try = ootd_memory_planner.plan(task_data["model_type"], scale, missing)
+        seed = self._new_seed(used_seeds)
+
+        logger.info(f"부족한 샘플 추가 생성: {samples_try}개, seed={seed}")
+        extra = self._run_ootd_diffusion(
+            task_data["model_image_path"],
+            task_data["cloth_image_path"],
+            task_data["category"],
+            task_data["model_type"],
+            scale_try,
+            samples_try,
+            seed
+        )
+        ootd_memory_planner.record(
+            task_data["model_type"], scale_try, samples_try, success=True,
+            peak_bytes=ootd_host_client.last_peak_bytes
+        )
+        return extra, scale_try
+
+    def _seeds_from_paths(self, result_paths: List[str]) -> List[int]:
+        """결과 파일명({id}_seed{seed}_result_{i}.png)에서 시드 추출"""
+        seeds = []
+        for path in result_paths:
+            match = re.search(r"_seed(\d+)_result_", path)
+            if match:
+                seeds.append(int(match.group(1)))
+        return seeds
+
+    def _complete_with_results(self, db: Session, process: VirtualFittingProcess, result_paths: List[str]):
+        """결과 이미지 경로를 저장하고 완료 처리"""
+        for i, relative_path in enumerate(result_paths[:6]):
+            setattr(process, f'result_image_{i+1}', relative_path)
+        process.status = 'COMPLETED'
+        process.error_message = None
+        process.completed_at = datetime.now(pytz.timezone('Asia/Seoul'))
+        db.commit()
+
     def _run_ootd_diffusion(
         self,
         model_image_path: str,
@@ -257,34 +349,50 @@ class VirtualFittingServiceRedis:
         category: int,
         model_type: str,
         scale: float,
-        samples: int
+        samples: int,
+        seed: int = -1
     ) -> List[str]:  # List[Path]에서 List[str]로 변경
-        """OOTDiffusion 실행"""
-        
+        """OOTDiffusion 실행 (상주 모델 호스트 우선, 실패 시 subprocess)"""
+
         # 경로 검증
         if not self.ootd_model_path.exists():
             raise FileNotFoundError(f"OOTDiffusion 모델 경로를 찾을 수 없습니다: {self.ootd_model_path}")
+
+        # 실행별 고유 ID (출력 디렉토리/결과 파일명에 사용)
+        unique_id = str(uuid.uuid4())
         
+        processed_model_path, processed_cloth_path = self._prepare_inputs(model_image_path, cloth_image_path)
+
+        # 상주 모델 호스트 사용 (모델 재로딩 없이 추론)
+        ootd_host_client.last_peak_bytes = None
+        if ootd_host_client.enabled:
+            # 호스트가 결과를 저장할 실행별 출력 디렉토리
+            temp_output_dir = self.temp_dir / unique_id
+            temp_output_dir.mkdir(parents=True, exist_ok=True)
+            try:
+                ootd_host_client.run(
+                    model_path=str(processed_model_path),
+                    cloth_path=str(processed_cloth_path),
+                    model_type=model_type,
+                    category=category,
+                    scale=scale,
+                    samples=samples,
+                    seed=seed,
+                    output_dir=str(temp_output_dir),
+                )
+                return self._move_result_images(
+                    unique_id, model_type, samples, source_dir=temp_output_dir, seed=seed
+                )
+            except OOTDModelHostUnavailable as e:
+                logger.warning(f"모델 호스트 사용 불가, subprocess로 실행: {e}")
+            finally:
+                import shutil
+                shutil.rmtree(temp_output_dir, ignore_errors=True)
+
         run_ootd_path = self.ootd_model_path / "run_ootd.py"
         if not run_ootd_path.exists():
             raise FileNotFoundError(f"run_ootd.py 파일을 찾을 수 없습니다: {run_ootd_path}")
-        
-        # 고유한 출력 디렉토리 생성
-        unique_id = str(uuid.uuid4())
-        temp_output_dir = self.temp_dir / unique_id
-        temp_output_dir.mkdir(parents=True, exist_ok=True)
-        
-        # 절대 경로로 변환
-        model_image_abs = Path(model_image_path).resolve()
-        cloth_image_abs = Path(cloth_image_path).resolve()
-        
-        # 이미지 전처리: RGBA를 RGB로 변환
-        processed_model_path = self._preprocess_image(model_image_abs, "model")
-        processed_cloth_path = self._preprocess_image(cloth_image_abs, "cloth")
-        
-        logger.info(f"모델 이미지: {model_image_abs} -> {processed_model_path}")
-        logger.info(f"의류 이미지: {cloth_image_abs} -> {processed_cloth_path}")
-        
+
         # Python 실행 파일 경로
         python_executable = sys.executable
         
@@ -297,11 +405,17 @@ class VirtualFittingServiceRedis:
             "--model_type", model_type,
             "--category", str(category),
             "--scale", str(scale),
-            "--sample", str(samples)
+            "--sample", str(samples),
+            "--seed", str(seed)
         ]
         
+        # 실행별 작업 디렉토리 (run과 같은 깊이에 두어 "../checkpoints" 상대 경로는 그대로 유지하고
+        # "./images_output" 출력만 실행마다 분리 → 동시 실행 시 결과 파일 덮어쓰기 방지)
+        run_work_dir = self.ootd_model_path.parent / f"_run_{unique_id}"
+        (run_work_dir / "images_output").mkdir(parents=True, exist_ok=True)
+        
         logger.info(f"실행 명령어: {' '.join(cmd)}")
-        logger.info(f"작업 디렉토리: {self.ootd_model_path}")
+        logger.info(f"작업 디렉토리: {run_work_dir}")
         
         # subprocess 실행 (CUDA 메모리 설정 추가)
         env = os.environ.copy()
@@ -310,34 +424,49 @@ class VirtualFittingServiceRedis:
         # 일부 환경에서 xFormers 비활성화가 안정적인 경우가 있어 옵션 제공 (없으면 무시)
         # env.setdefault('XFORMERS_DISABLED', '1')
 
-        result = subprocess.run(
-            cmd,
-            cwd=str(self.ootd_model_path),
-            capture_output=True,
-            text=True,
-            timeout=3600,  # 60분 타임아웃
-            shell=False,
-            env=env
-        )
-        
-        logger.info(f"subprocess 반환 코드: {result.returncode}")
-        logger.info(f"stdout: {result.stdout}")
-        
-        if result.stderr:
-            logger.warning(f"stderr: {result.stderr}")
-        
-        if result.returncode != 0:
-            raise Exception(f"OOTDiffusion 실행 실패 (코드: {result.returncode}): {result.stderr}")
-        
-        # 결과 이미지들을 최종 위치로 이동
-        result_paths = self._move_result_images(unique_id, model_type, samples)
-        
-        # 임시 디렉토리 정리
         import shutil
-        shutil.rmtree(temp_output_dir, ignore_errors=True)
-        
-        return result_paths
+        try:
+            result = subprocess.run(
+                cmd,
+                cwd=str(run_work_dir),
+                capture_output=True,
+                text=True,
+                timeout=3600,  # 60분 타임아웃
+                shell=False,
+                env=env
+            )
+            
+            logger.info(f"subprocess 반환 코드: {result.returncode}")
+            logger.info(f"stdout: {result.stdout}")
+            
+            if result.stderr:
+                logger.warning(f"stderr: {result.stderr}")
+            
+            if result.returncode != 0:
+                raise Exception(f"OOTDiffusion 실행 실패 (코드: {result.returncode}): {result.stderr}")
+            
+            # 이 실행의 출력 디렉토리에서만 결과 수집
+            return self._move_result_images(
+                unique_id, model_type, samples, source_dir=run_work_dir / "images_output", seed=seed
+            )
+        finally:
+            # 실행별 작업 디렉토리 정리
+            shutil.rmtree(run_work_dir, ignore_errors=True)
     
+    def _prepare_inputs(self, model_image_path: str, cloth_image_path: str) -> Tuple[Path, Path]:
+        """입력 이미지를 절대 경로로 변환하고 전처리"""
+        # 절대 경로로 변환
+        model_image_abs = Path(model_image_path).resolve()
+        cloth_image_abs = Path(cloth_image_path).resolve()
+        
+        # 이미지 전처리: RGBA를 RGB로 변환
+        processed_model_path = self._preprocess_image(model_image_abs, "model")
+        processed_cloth_path = self._preprocess_image(cloth_image_abs, "cloth")
+        
+        logger.info(f"모델 이미지: {model_image_abs} -> {processed_model_path}")
+        logger.info(f"의류 이미지: {cloth_image_abs} -> {processed_cloth_path}")
+        return processed_model_path, processed_cloth_path
+
     def _preprocess_image(self, image_path: Path, image_type: str) -> Path:
         """이미지 전처리: RGBA를 RGB로 변환"""
         try:
@@ -368,12 +497,19 @@ class VirtualFittingServiceRedis:
             # 전처리 실패 시 원본 경로 반환
             return image_path
     
-    def _move_result_images(self, unique_id: str, model_type: str, samples: int) -> List[str]:
-        """결과 이미지들을 최종 위치로 이동 (상대 경로 반환)"""
+    def _move_result_images(
+        self,
+        unique_id: str,
+        model_type: str,
+        samples: int,
+        source_dir: Path,
+        seed: Optional[int] = None
+    ) -> List[str]:
+        """결과 이미지들을 최종 위치로 이동 (상대 경로 반환, 시드를 알면 파일명에 기록)"""
         result_paths = []
-        
-        # OOTDiffusion 출력 디렉토리에서 이미지 찾기
-        ootd_output_dir = self.ootd_model_path / "images_output"
+
+        # 실행별 출력 디렉토리에서만 이미지 찾기 (공유 images_output은 동시 실행 시 덮어써짐)
+        ootd_output_dir = source_dir
         
         logger.info(f"결과 이미지 검색 디렉토리: {ootd_output_dir}")
         
@@ -384,7 +520,10 @@ class VirtualFittingServiceRedis:
             
             if source_path.exists():
                 # 최종 저장 경로 (절대 경로)
-                filename = f"{unique_id}_result_{i}.png"
+                if seed is not None and seed >= 0:
+                    filename = f"{unique_id}_seed{seed}_result_{i}.png"
+                else:
+                    filename = f"{unique_id}_result_{i}.png"
                 dest_path = self.output_dir / filename
                 
                 # 파일 이동
@@ -1,12 +1,24 @@
+import os
 import time
 import signal
 import sys
 import logging
-from typing import Dict, Any
+import threading
+import multiprocessing
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from typing import Dict, Any, List
 
-from app.core.task_queue import task_queue
+import pytz
+
+from app.core.task_queue import task_queue, VISIBILITY_TIMEOUT
+from app.db.database import SessionLocal
+from app.models.virtual_fitting_process import VirtualFittingProcess
 from app.utils.virtual_fitting_service import fitting_service_redis
 from app.utils.fast_fitting_service import fast_fitting_service
+from app.utils.background_custom_service import background_custom_service
+from app.utils.ootd_model_host import ootd_host_client
 
 # 로깅 설정
 logging.basicConfig(
@@ -15,87 +27,266 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# 작업 타입별 기본 실행 슬롯
+# - process: 별도 프로세스에서 실행 (GPU/CPU 바운드 작업, 슬롯 수만큼 직렬화)
+# - thread: 워커 프로세스 내 스레드에서 실행 (원격 API 호출 등 I/O 대기 위주 작업)
+DEFAULT_SLOT_CONFIG = {
+    "virtual_fitting": {"mode": "process", "slots": 1},
+    "fast_fitting": {"mode": "thread", "slots": 4},
+    "background_custom": {"mode": "process", "slots": 2},
+}
+
+# 작업 타입별 처리 함수와 로그용 이름 (처리 함수가 dict를 반환하면 작업 상태에 결과로 기록)
+TASK_HANDLERS = {
+    "virtual_fitting": (fitting_service_redis.process_virtual_fitting_task, "가상 피팅"),
+    "fast_fitting": (fast_fitting_service.process_fast_fitting_task, "빠른 가상 피팅"),
+    "background_custom": (background_custom_service.process_background_custom_task, "배경 커스텀"),
+}
+
+
+def load_slot_config() -> Dict[str, Dict[str, Any]]:
+    """환경변수(WORKER_<TYPE>_MODE, WORKER_<TYPE>_SLOTS)로 슬롯 설정 덮어쓰기"""
+    config = {}
+    for task_type, default in DEFAULT_SLOT_CONFIG.items():
+        prefix = f"WORKER_{task_type.upper()}"
+        mode = os.getenv(f"{prefix}_MODE", default["mode"]).lower()
+        if mode not in ("process", "thread"):
+            logger.warning(f"알 수 없는 실행 모드 {mode} ({task_type}), 기본값 사용")
+            mode = default["mode"]
+        slots = max(1, int(os.getenv(f"{prefix}_SLOTS", default["slots"])))
+        config[task_type] = {"mode": mode, "slots": slots}
+    return config
+
+
+def execute_task(task: Dict[str, Any]) -> bool:
+    """작업 처리 (프로세스/스레드 슬롯에서 실행)"""
+    task_type = task.get("type")
+    task_id = task.get("id")
+
+    logger.info(f"작업 처리 시작: {task_id} (타입: {task_type})")
+
+    handler = TASK_HANDLERS.get(task_type)
+    if not handler:
+        logger.warning(f"알 수 없는 작업 타입: {task_type}")
+        task_queue.update_task_status(task_id, "FAILED", {"error": "알 수 없는 작업 타입"})
+        return False
+
+    process_func, label = handler
+    try:
+        # 재전달된 작업을 알아볼 수 있도록 task_id를 함께 전달
+        result = process_func({**task["data"], "task_id": task_id})
+        success = bool(result)
+
+        if success:
+            task_queue.update_task_status(task_id, "COMPLETED", result if isinstance(result, dict) else None)
+            logger.info(f"{label} 작업 완료: {task_id}")
+        else:
+            task_queue.update_task_status(task_id, "FAILED", {"error": "처리 실패"})
+            logger.error(f"{label} 작업 실패: {task_id}")
+
+        return success
+
+    except Exception as e:
+        logger.error(f"작업 처리 중 오류 발생: {e}")
+        task_queue.update_task_status(task_id, "FAILED", {"error": str(e)})
+        return False
+
+
+def mark_process_failed(process_id: int, error_message: str):
+    """처리 프로세스를 FAILED로 변경 (워커가 죽어 작업이 회수된 경우)"""
+    db = SessionLocal()
+    try:
+        process = db.query(VirtualFittingProcess).filter(
+            VirtualFittingProcess.id == process_id
+        ).first()
+        if process and process.status in ('QUEUED', 'PROCESSING'):
+            process.status = 'FAILED'
+            process.error_message = error_message[:1000]
+            process.completed_at = datetime.now(pytz.timezone('Asia/Seoul'))
+            db.commit()
+            logger.info(f"회수된 작업의 프로세스 실패 처리: {process_id}")
+    except Exception as e:
+        logger.error(f"프로세스 실패 처리 중 오류: {e}")
+    finally:
+        db.close()
+
+
 class VirtualFittingWorker:
     def __init__(self):
         self.running = True
+        self.slot_config = load_slot_config()
+        self.executors: Dict[str, Executor] = {}
+        self.active: Dict[str, int] = {task_type: 0 for task_type in self.slot_config}
+        self.inflight: Dict[str, Dict[str, Any]] = {}  # 리스를 유지할 작업 (task_id -> task)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        # 하트비트 주기는 리스 유효 시간보다 충분히 짧게
+        self.heartbeat_interval = float(os.getenv("WORKER_HEARTBEAT_INTERVAL", max(VISIBILITY_TIMEOUT / 4, 1)))
         self.setup_signal_handlers()
-    
+
     def setup_signal_handlers(self):
         """시그널 핸들러 설정"""
         signal.signal(signal.SIGINT, self.signal_handler)
         signal.signal(signal.SIGTERM, self.signal_handler)
-    
+
     def signal_handler(self, signum, frame):
         """종료 시그널 처리"""
         logger.info(f"종료 시그널 수신: {signum}")
         self.running = False
-    
+
     def process_task(self, task: Dict[str, Any]) -> bool:
-        """작업 처리"""
-        task_type = task.get("type")
-        task_id = task.get("id")
-        
-        logger.info(f"작업 처리 시작: {task_id} (타입: {task_type})")
-        
+        """작업 처리 (현재 프로세스에서 동기 실행)"""
+        return execute_task(task)
+
+    def _new_executor(self, task_type: str) -> Executor:
+        """작업 타입 설정에 맞는 실행기 생성"""
+        config = self.slot_config[task_type]
+        if config["mode"] == "process":
+            # fork 시 DB 커넥션 풀이 공유되지 않도록 spawn 사용
+            return ProcessPoolExecutor(
+                max_workers=config["slots"], mp_context=multiprocessing.get_context("spawn")
+            )
+        return ThreadPoolExecutor(
+            max_workers=config["slots"], thread_name_prefix=f"{task_type}-slot"
+        )
+
+    def _create_executors(self):
+        """작업 타입별 실행기 생성"""
+        for task_type, config in self.slot_config.items():
+            self.executors[task_type] = self._new_executor(task_type)
+            logger.info(f"슬롯 구성: {task_type} = {config['mode']} x {config['slots']}")
+
+    def _rebuild_executor(self, task_type: str, broken: Executor):
+        """슬롯 프로세스가 죽어 망가진 실행기를 새로 생성 (이미 다른 쪽에서 교체했으면 그대로 둠)"""
+        with self._lock:
+            if self.executors.get(task_type) is not broken:
+                return
+            self.executors[task_type] = self._new_executor(task_type)
+        broken.shutdown(wait=False)
+        logger.warning(f"슬롯 프로세스 비정상 종료로 실행기 재생성: {task_type}")
+
+    def _free_task_types(self) -> List[str]:
+        """빈 슬롯이 있는 작업 타입 목록"""
+        with self._lock:
+            return [
+                task_type for task_type, config in self.slot_config.items()
+                if self.active[task_type] < config["slots"]
+            ]
+
+    def _submit(self, task: Dict[str, Any]):
+        """작업을 타입별 슬롯에 제출"""
+        task_type = task["type"]
+        with self._lock:
+            self.active[task_type] += 1
+            self.inflight[task["id"]] = task
+            executor = self.executors[task_type]
+
         try:
-            if task_type == "virtual_fitting":
-                # 가상 피팅 작업 처리
-                success = fitting_service_redis.process_virtual_fitting_task(task["data"])
-                
-                if success:
-                    task_queue.update_task_status(task_id, "COMPLETED")
-                    logger.info(f"작업 완료: {task_id}")
-                else:
-                    task_queue.update_task_status(task_id, "FAILED", {"error": "처리 실패"})
-                    logger.error(f"작업 실패: {task_id}")
-                
-                return success
-            
-            elif task_type == "fast_fitting":
-                # 빠른 가상 피팅 작업 처리
-                success = fast_fitting_service.process_fast_fitting_task(task["data"])
-                
-                if success:
-                    task_queue.update_task_status(task_id, "COMPLETED")
-                    logger.info(f"빠른 가상 피팅 작업 완료: {task_id}")
-                else:
-                    task_queue.update_task_status(task_id, "FAILED", {"error": "처리 실패"})
-                    logger.error(f"빠른 가상 피팅 작업 실패: {task_id}")
-                
-                return success
-            
-            else:
-                logger.warning(f"알 수 없는 작업 타입: {task_type}")
-                task_queue.update_task_status(task_id, "FAILED", {"error": "알 수 없는 작업 타입"})
-                return False
-                
+            future = executor.submit(execute_task, task)
         except Exception as e:
-            logger.error(f"작업 처리 중 오류 발생: {e}")
-            task_queue.update_task_status(task_id, "FAILED", {"error": str(e)})
-            return False
-    
+            # 제출 실패 시 슬롯/리스 상태를 되돌리지 않으면 이 타입을 다시 받지 못하고 리스도 계속 연장됨
+            self._release(task)
+            if isinstance(e, BrokenProcessPool):
+                # 슬롯 프로세스가 죽어 실행기가 망가진 경우: 실행기를 다시 만들고 작업은 시작 전이므로 큐로 되돌림
+                logger.error(f"슬롯 실행기 사용 불가, 작업 되돌림: {task['id']} - {e}")
+                self._rebuild_executor(task_type, executor)
+                task_queue.requeue_task(task)
+            else:
+                logger.error(f"작업 제출 실패: {task['id']} - {e}")
+                task_queue.update_task_status(task["id"], "FAILED", {"error": str(e)})
+                task_queue.ack_task(task["id"])
+            return
+
+        future.add_done_callback(lambda f, t=task, ex=executor: self._on_task_done(t, f, ex))
+
+    def _release(self, task: Dict[str, Any]):
+        """작업이 차지한 슬롯 반환 및 리스 연장 대상에서 제외"""
+        with self._lock:
+            self.active[task["type"]] -= 1
+            self.inflight.pop(task["id"], None)
+
+    def _on_task_done(self, task: Dict[str, Any], future: Future, executor: Executor):
+        self._release(task)
+
+        exc = future.exception()
+        if exc:
+            # 프로세스 비정상 종료 등 execute_task 밖에서 발생한 오류
+            logger.error(f"작업 슬롯 오류: {task.get('id')} - {exc}")
+            task_queue.update_task_status(task.get("id"), "FAILED", {"error": str(exc)})
+            process_id = task.get("data", {}).get("process_id")
+            if process_id:
+                mark_process_failed(process_id, f"작업 처리 중 슬롯 프로세스가 종료되었습니다: {exc}")
+
+            if isinstance(exc, BrokenProcessPool):
+                # 슬롯 프로세스가 죽으면(OOM 등) 실행기 전체가 망가지므로 다음 작업을 위해 다시 생성
+                self._rebuild_executor(task["type"], executor)
+
+        task_queue.ack_task(task["id"])
+
+    def _heartbeat_loop(self):
+        """처리 중 작업의 리스 연장 및 다른 워커가 남긴 만료 작업 회수"""
+        while not self._stop_event.wait(self.heartbeat_interval):
+            with self._lock:
+                task_ids = list(self.inflight.keys())
+            task_queue.heartbeat(task_ids)
+
+            for task in task_queue.reap_expired():
+                process_id = task.get("data", {}).get("process_id")
+                if process_id:
+                    mark_process_failed(process_id, "작업 처리 중 워커가 응답하지 않아 실패했습니다.")
+
+    def dispatch(self, task: Dict[str, Any]):
+        """작업 분배"""
+        if task.get("type") not in self.slot_config:
+            execute_task(task)  # 알 수 없는 타입은 즉시 실패 처리
+            task_queue.ack_task(task["id"])
+            return
+
+        self._submit(task)
+
+    def _shutdown(self):
+        """실행 중인 작업 완료 대기 (완료될 때까지 하트비트 유지)"""
+        for executor in self.executors.values():
+            executor.shutdown(wait=True)
+        self._stop_event.set()
+
     def run(self):
         """워커 실행"""
         logger.info("가상 피팅 워커 시작")
-        
+
+        # OOTDiffusion 모델 호스트 미리 기동 (첫 작업의 콜드 스타트 방지)
+        if ootd_host_client.enabled:
+            ootd_host_client.ensure_started()
+
+        # 단일 큐 시절에 쌓인 작업을 타입별 서브 큐로 이동
+        task_queue.migrate_legacy_queue()
+
+        self._create_executors()
+        threading.Thread(target=self._heartbeat_loop, name="worker-heartbeat", daemon=True).start()
+
         while self.running:
             try:
-                # 큐에서 작업 가져오기 (10초 타임아웃)
-                task = task_queue.dequeue_task(timeout=10)
-                
+                # 슬롯이 남은 타입의 서브 큐에서만 가져옴 (가득 찬 타입은 큐에 그대로 대기)
+                free_types = self._free_task_types()
+                if not free_types:
+                    time.sleep(0.5)
+                    continue
+
+                # 큐에서 작업 가져오기 (짧은 타임아웃으로 슬롯 상태를 자주 확인)
+                task = task_queue.dequeue_task(timeout=1, task_types=free_types)
+
                 if task:
-                    self.process_task(task)
-                else:
-                    # 작업이 없으면 잠시 대기
-                    time.sleep(1)
-                    
+                    self.dispatch(task)
+
             except KeyboardInterrupt:
                 logger.info("키보드 인터럽트로 종료")
                 break
             except Exception as e:
                 logger.error(f"워커 실행 중 오류: {e}")
                 time.sleep(5)  # 오류 발생 시 5초 대기
-        
+
+        self._shutdown()
+        ootd_host_client.shutdown()
         logger.info("가상 피팅 워커 종료")
 
 def main():
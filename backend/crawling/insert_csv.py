@@ -1,7 +1,17 @@
 import pandas as pd
-import re
+import numpy as np
+import sys
+import time
+import argparse
 import pymysql
 import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+# 백엔드(app) 모듈 사용 (스키마 보완 SQL, 캐시 무효화)
+BACKEND_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_ROOT))
 
 # 데이터베이스 연결 설정
 DB_CONFIG = {
@@ -13,39 +23,62 @@ DB_CONFIG = {
     'port': 3307
 }
 
-def clean_likes(likes_str):
-    """likes 데이터를 숫자로 변환"""
-    if pd.isna(likes_str) or likes_str == '':
-        return 0
-    
-    likes_str = str(likes_str).strip()
-    
-    if '천' in likes_str:
-        number = re.findall(r'[\d.]+', likes_str)
-        if number:
-            return int(float(number[0]) * 1000)
-    elif '만' in likes_str:
-        number = re.findall(r'[\d.]+', likes_str)
-        if number:
-            return int(float(number[0]) * 10000)
-    else:
-        number = re.findall(r'\d+', likes_str)
-        if number:
-            return int(number[0])
-    
-    return 0
+# CSV 컬럼 → (DB 컬럼, 최대 길이)
+COLUMN_MAP = {
+    'product': ('product_name', 100),
+    'product_link': ('product_url', 255),
+    'image_link': ('product_image_url', 255),
+    'brand': ('brand_name', 50),
+    'gender': ('gender', 10),
+    'main_category': ('main_category', 20),
+    'sub_category': ('sub_category', 30),
+}
+
+DB_COLUMNS = [
+    'product_name', 'product_url', 'product_image_url', 'brand_name',
+    'likes', 'gender', 'main_category', 'sub_category'
+]
+
+# product_url이 같은 상품은 최신 크롤링 값으로 갱신 (product_id, 찜 목록 유지)
+UPSERT_QUERY = f"""
+INSERT INTO clothing_items ({', '.join(DB_COLUMNS)})
+VALUES ({', '.join(['%s'] * len(DB_COLUMNS))})
+ON DUPLICATE KEY UPDATE {', '.join(f'{col} = VALUES({col})' for col in DB_COLUMNS if col != 'product_url')}
+"""
+
+def clean_likes(likes):
+    """likes 데이터를 숫자로 변환 (예: '1.9만' → 19000, '3천' → 3000, '124' → 124)"""
+    text = likes.fillna('').astype(str).str.strip()
+    number = pd.to_numeric(text.str.extract(r'([\d.]+)', expand=False), errors='coerce')
+    # '천'을 '만'보다 먼저 확인 (기존 규칙 유지)
+    multiplier = np.select([text.str.contains('천'), text.str.contains('만')], [1000, 10000], default=1)
+    # 단위가 없으면 정수 부분만 사용
+    number = number.where(multiplier != 1, np.floor(number))
+    return (number * multiplier).fillna(0).astype(np.int64)
 
 def clean_column_names(df):
     """컬럼명에서 BOM 제거 및 정리"""
-    new_columns = []
-    for col in df.columns:
-        # BOM 제거 (ï»¿ 제거)
-        clean_col = col.replace('ï»¿', '').strip()
-        new_columns.append(clean_col)
-    
-    df.columns = new_columns
+    df.columns = [col.replace('ï»¿', '').replace('﻿', '').strip() for col in df.columns]
     return df
 
+def clean_chunk(df):
+    """CSV 청크를 DB 행 목록으로 변환 (프로세스 풀에서 실행, 반환: (행 목록, 제외된 행 수))"""
+    df = clean_column_names(df)
+
+    cleaned = pd.DataFrame(index=df.index)
+    for csv_col, (db_col, max_len) in COLUMN_MAP.items():
+        values = df[csv_col] if csv_col in df else pd.Series('', index=df.index)
+        cleaned[db_col] = values.where(values.notna(), '').astype(str).str.slice(0, max_len)
+    cleaned['likes'] = clean_likes(df['likes'] if 'likes' in df else pd.Series(0, index=df.index))
+
+    # upsert 키가 없는 행 제외, 같은 청크 안의 중복은 마지막 행만 사용
+    valid = cleaned[cleaned['product_url'].str.strip() != '']
+    valid = valid.drop_duplicates('product_url', keep='last')
+    skipped = len(cleaned) - len(valid)
+
+    rows = list(valid[DB_COLUMNS].itertuples(index=False, name=None))
+    return [tuple(int(v) if isinstance(v, np.integer) else v for v in row) for row in rows], skipped
+
 def connect_to_db():
     """데이터베이스 연결"""
     try:
@@ -56,87 +89,114 @@ def connect_to_db():
         print(f"❌ 데이터베이스 연결 실패: {e}")
         return None
 
-def insert_data_to_db(df, connection):
-    """데이터를 데이터베이스에 삽입"""
-    cursor = connection.cursor()
-    
-    # INSERT 쿼리 준비
-    insert_query = """
-    INSERT INTO clothing_items (product_name, product_url, product_image_url, brand_name, likes, gender, main_category, sub_category) 
-    VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+def ensure_unique_product_url(connection):
+    """upsert 키(product_url 유니크 인덱스) 확인 (중복 상품이 없을 때만 추가, 반환: 적재 가능 여부)
+
+    중복 상품 삭제는 상품 행을 지우므로 여기서 하지 않고 마이그레이션 스크립트로만 수행한다.
     """
-    
+    from app.db.schema_updates import CLOTHING_URL_DUPLICATE_COUNT_SQL, CLOTHING_URL_UNIQUE_SQL
+
+    with connection.cursor() as cursor:
+        cursor.execute("SHOW INDEX FROM clothing_items WHERE Column_name = 'product_url' AND Non_unique = 0")
+        if cursor.fetchall():
+            return True
+
+        cursor.execute(CLOTHING_URL_DUPLICATE_COUNT_SQL)
+        duplicates = int(cursor.fetchone()[0] or 0)
+        if duplicates:
+            print(f"❌ product_url 유니크 인덱스가 없고 중복 상품이 {duplicates}개 있어 적재를 중단합니다.")
+            print("   먼저 중복을 정리하세요: python scripts/migrate_clothing_product_url.py --apply")
+            return False
+
+        cursor.execute(CLOTHING_URL_UNIQUE_SQL)
+    connection.commit()
+    print("✅ product_url 유니크 인덱스 추가 완료 (중복 상품 없음)")
+    return True
+
+def iter_cleaned_chunks(reader, workers):
+    """청크 정리 (workers > 1이면 프로세스 풀에서 병렬 처리, 순서 유지)"""
+    if workers <= 1:
+        for chunk in reader:
+            yield clean_chunk(chunk)
+        return
+
+    # 읽기를 앞서 나가 메모리가 불어나지 않도록 진행 중인 청크 수 제한
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for chunk in reader:
+            pending.append(executor.submit(clean_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def insert_data_to_db(reader, connection, batch_size, workers):
+    """청크 단위로 정리하여 upsert (반환: 처리 행 수)"""
     success_count = 0
     error_count = 0
-    
+    skipped_count = 0
+    started = time.time()
+
+    cursor = connection.cursor()
     try:
-        # 배치 삽입을 위한 데이터 준비
-        batch_data = []
-        
-        for index, row in df.iterrows():
-            try:
-                # 안전한 데이터 접근
-                product_name = str(row.get('product', ''))[:100] if pd.notna(row.get('product', '')) else ''
-                product_url = str(row.get('product_link', ''))[:255] if pd.notna(row.get('product_link', '')) else ''
-                product_image_url = str(row.get('image_link', ''))[:255] if pd.notna(row.get('image_link', '')) else ''
-                brand_name = str(row.get('brand', ''))[:50] if pd.notna(row.get('brand', '')) else ''
-                likes = clean_likes(row.get('likes', 0))
-                gender = str(row.get('gender', ''))[:10] if pd.notna(row.get('gender', '')) else ''
-                main_category = str(row.get('main_category', ''))[:20] if pd.notna(row.get('main_category', '')) else ''
-                sub_category = str(row.get('sub_category', ''))[:30] if pd.notna(row.get('sub_category', '')) else ''
-                
-                batch_data.append((
-                    product_name, product_url, product_image_url, brand_name,
-                    likes, gender, main_category, sub_category
-                ))
-                
-            except Exception as e:
-                print(f"행 {index} 처리 중 오류: {e}")
-                error_count += 1
-                continue
-        
-        print(f"처리할 데이터: {len(batch_data)}개")
-        
-        # 배치 단위로 삽입 (100개씩)
-        batch_size = 100
-        total_batches = len(batch_data) // batch_size + (1 if len(batch_data) % batch_size > 0 else 0)
-        
-        for i in range(0, len(batch_data), batch_size):
-            batch = batch_data[i:i+batch_size]
-            
-            try:
-                cursor.executemany(insert_query, batch)
-                connection.commit()
-                success_count += len(batch)
-                
-                current_batch = i // batch_size + 1
-                print(f"배치 {current_batch}/{total_batches} 완료 - {success_count}개 삽입됨")
-                
-            except Exception as e:
-                print(f"배치 {current_batch} 삽입 실패: {e}")
-                print(f"오류 상세: {str(e)}")
-                error_count += len(batch)
-                connection.rollback()
-        
-        print(f"\n✅ 삽입 완료!")
-        print(f"성공: {success_count}개")
+        for chunk_index, (rows, skipped) in enumerate(iter_cleaned_chunks(reader, workers), start=1):
+            skipped_count += skipped
+
+            for i in range(0, len(rows), batch_size):
+                batch = rows[i:i + batch_size]
+                try:
+                    # PyMySQL이 다중 행 INSERT ... VALUES (...), (...) 한 문장으로 전송
+                    cursor.executemany(UPSERT_QUERY, batch)
+                    connection.commit()
+                    success_count += len(batch)
+                except Exception as e:
+                    print(f"청크 {chunk_index} 배치 삽입 실패: {e}")
+                    error_count += len(batch)
+                    connection.rollback()
+
+            elapsed = time.time() - started
+            print(f"청크 {chunk_index} 완료 - 누적 {success_count}개 ({success_count / max(elapsed, 1e-6):.0f}행/초)")
+
+        print(f"\n✅ 적재 완료! ({time.time() - started:.1f}초)")
+        print(f"성공(삽입/갱신): {success_count}개")
+        print(f"제외(URL 없음/중복): {skipped_count}개")
         print(f"실패: {error_count}개")
-        
+
     except Exception as e:
-        print(f"❌ 삽입 중 오류 발생: {e}")
+        print(f"❌ 적재 중 오류 발생: {e}")
         connection.rollback()
-    
+
     finally:
         cursor.close()
 
+    return success_count
+
+def invalidate_catalog_cache():
+    """백엔드 카탈로그 캐시(카테고리/패싯 집계, 상품 목록) 무효화"""
+    try:
+        # Redis 설정(.env) 사용
+        from dotenv import load_dotenv
+        load_dotenv(BACKEND_ROOT / ".env")
+
+        from app.utils.catalog_facets import catalog_facet_index
+        catalog_facet_index.invalidate()
+        print("✅ 카탈로그 캐시 무효화 완료")
+    except Exception as e:
+        print(f"⚠️ 카탈로그 캐시 무효화 실패 (캐시 만료 후 반영됨): {e}")
+
 def main():
-    print("=== 로컬 CSV 데이터를 데이터베이스에 직접 삽입 ===\n")
-    
-    # 1. CSV 파일 읽기 (상대경로)
-    print("1. CSV 파일 읽기 중...")
-    csv_file_path = "./통합.csv"  # 현재 디렉토리의 통합.csv
-    
-    # 파일 존재 확인
+    parser = argparse.ArgumentParser(description="크롤링 CSV를 clothing_items 테이블에 적재 (product_url 기준 upsert)")
+    parser.add_argument("--file", default="./통합.csv", help="CSV 파일 경로 (기본: ./통합.csv)")
+    parser.add_argument("--chunk-size", type=int, default=20000, help="한 번에 읽어 정리할 행 수")
+    parser.add_argument("--batch-size", type=int, default=5000, help="INSERT 한 문장에 담을 행 수")
+    parser.add_argument("--workers", type=int, default=max(1, min(4, (os.cpu_count() or 2) - 1)),
+                        help="정리 작업 프로세스 수 (1이면 단일 프로세스)")
+    args = parser.parse_args()
+
+    print("=== 로컬 CSV 데이터를 데이터베이스에 적재 (upsert) ===\n")
+
+    # 1. CSV 파일 확인
+    csv_file_path = args.file
     if not os.path.exists(csv_file_path):
         print(f"❌ CSV 파일을 찾을 수 없습니다: {csv_file_path}")
         print("현재 디렉토리:", os.getcwd())
@@ -145,44 +205,29 @@ def main():
             if file.endswith('.csv'):
                 print(f"  - {file}")
         return
-    
-    try:
-        # UTF-8 BOM 처리를 위해 encoding 명시
-        df = pd.read_csv(csv_file_path, encoding='utf-8-sig')
-        
-        # 컬럼명 정리
-        df = clean_column_names(df)
-        
-        print(f"✅ {len(df)}개의 데이터를 읽었습니다.")
-    except Exception as e:
-        print(f"❌ CSV 읽기 실패: {e}")
-        return
-    
-    # 2. 데이터 미리보기
-    print(f"\n2. 데이터 미리보기:")
-    print(f"정리된 컬럼: {list(df.columns)}")
-    
-    # 첫 번째 행 데이터 확인
-    if len(df) > 0:
-        first_row = df.iloc[0]
-        print(f"첫 번째 행 샘플:")
-        for col in df.columns:
-            value = first_row[col]
-            print(f"  {col}: {value}")
-    
-    # 3. 데이터베이스 연결
-    print(f"\n3. 데이터베이스 연결 중...")
+
+    # 2. 데이터베이스 연결 및 upsert 키 확인
+    print("1. 데이터베이스 연결 중...")
     connection = connect_to_db()
     if not connection:
         return
-    
-    # 4. 데이터 삽입
-    print(f"\n4. 데이터 삽입 시작...")
-    insert_data_to_db(df, connection)
-    
-    # 5. 연결 종료
-    connection.close()
+
+    try:
+        if not ensure_unique_product_url(connection):
+            return
+
+        # 3. CSV를 청크 단위로 읽으며 적재 (UTF-8 BOM 처리를 위해 encoding 명시)
+        print(f"\n2. 적재 시작 (청크 {args.chunk_size}행, 배치 {args.batch_size}행, 프로세스 {args.workers}개)...")
+        reader = pd.read_csv(csv_file_path, encoding='utf-8-sig', chunksize=args.chunk_size, dtype=str)
+        processed = insert_data_to_db(reader, connection, args.batch_size, args.workers)
+    finally:
+        # 4. 연결 종료
+        connection.close()
+
+    # 5. 카탈로그 캐시 무효화
+    if processed:
+        invalidate_catalog_cache()
     print("\n✅ 모든 작업이 완료되었습니다!")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -8,6 +8,15 @@ from dotenv import load_dotenv
 
 from app.models import *  # 테이블 생성용
 from app.db.database import SessionLocal, engine, get_db
+from app.core.cache import get_cache_metrics
+from app.db.pool_metrics import get_pool_metrics
+from app.utils.image_worker_pool import image_worker_pool
+from app.db.schema_updates import (
+    ensure_feed_counter_columns,
+    ensure_fulltext_indexes,
+    check_clothing_product_url_unique,
+    ensure_background_custom_task_id_column,
+)
 
 # from app.db.create_tables import create_tables # 테이블 생성 함수
 
@@ -37,6 +46,13 @@ load_dotenv()
 # 데이터베이스 테이블 생성
 # Base.metadata.drop_all(bind=engine) # 기존 테이블 삭제(테스트용)
 Base.metadata.create_all(bind=engine)
+# 기존 테이블에 추가된 컬럼 반영
+ensure_feed_counter_columns(engine)
+ensure_background_custom_task_id_column(engine)
+# 검색용 FULLTEXT 인덱스
+ensure_fulltext_indexes(engine)
+# 상품 적재 upsert 키 확인 (없으면 경고만, 중복 정리는 마이그레이션 스크립트/적재 스크립트에서)
+check_clothing_product_url_unique(engine)
 
 # 로깅 설정
 logging.basicConfig(
@@ -115,12 +131,30 @@ app.include_router(
 app.include_router(background_custom_router)
 
 
+# 종료 시 이미지 처리 프로세스 풀 정리
+@app.on_event("shutdown")
+async def shutdown_image_workers():
+    image_worker_pool.shutdown()
+
+
 # 서버 상태 확인 엔드포인트
 @app.get("/health")
 async def health_check():
     return {"status": "healthy"}
 
 
+# DB 커넥션 풀 상태 확인 엔드포인트
+@app.get("/health/db")
+async def db_pool_metrics():
+    return get_pool_metrics(engine)
+
+
+# 읽기 캐시 적중률 확인 엔드포인트
+@app.get("/health/cache")
+async def cache_metrics():
+    return get_cache_metrics()
+
+
 # 루트 엔드포인트
 @app.get("/")
 async def root():
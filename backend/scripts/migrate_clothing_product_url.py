@@ -0,0 +1,50 @@
+#!/usr/bin/env python3
+"""
+clothing_items.product_url 유니크 인덱스 마이그레이션
+
+product_url이 같은 상품 중 가장 먼저 적재된 product_id만 남기고(찜 목록은 남는 상품으로 옮김)
+나머지를 삭제한 뒤 유니크 인덱스(상품 적재 upsert 키)를 추가한다.
+상품 행을 삭제하므로 서버 시작 시에는 실행하지 않으며, --apply 없이 실행하면 중복 수만 확인한다.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+from sqlalchemy import text
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.db.database import engine
+from app.db.schema_updates import (
+    CLOTHING_URL_DUPLICATE_COUNT_SQL,
+    has_clothing_product_url_unique,
+    migrate_clothing_product_url_unique,
+)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="product_url 중복 상품 정리 후 유니크 인덱스 추가")
+    parser.add_argument("--apply", action="store_true", help="실제로 중복 상품을 삭제하고 인덱스 추가")
+    args = parser.parse_args()
+
+    if has_clothing_product_url_unique(engine):
+        print("product_url 유니크 인덱스가 이미 있습니다.")
+        sys.exit(0)
+
+    with engine.connect() as conn:
+        duplicates = conn.execute(text(CLOTHING_URL_DUPLICATE_COUNT_SQL)).scalar()
+    print(f"삭제 대상 중복 상품: {duplicates}개")
+
+    if not args.apply:
+        print("확인만 했습니다. 적용하려면 --apply 옵션을 주세요.")
+        sys.exit(0)
+
+    removed = migrate_clothing_product_url_unique(engine)
+    print(f"✅ 중복 상품 {removed}개 정리, 유니크 인덱스 추가 완료")
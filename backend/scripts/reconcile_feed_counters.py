@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+피드 좋아요/댓글 카운터 보정 스크립트
+
+실제 LikedFeeds/FeedComments 행 수와 feeds.like_count/comment_count가 다른 피드를 바로잡는다.
+--interval을 주면 주기적으로 반복 실행한다 (예: cron 대신 상주 실행).
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+# 프로젝트 루트를 Python 경로에 추가
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+# 환경변수 로드
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.models import *  # 모델 관계 설정용
+from app.db.database import SessionLocal
+from app.crud.feed_counters import reconcile_feed_counters
+
+
+def run_once():
+    db = SessionLocal()
+    try:
+        fixed = reconcile_feed_counters(db)
+        print(f"피드 카운터 보정 완료: {fixed}개 피드 수정")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="피드 좋아요/댓글 카운터 보정")
+    parser.add_argument("--interval", type=int, default=0, help="반복 주기(초), 0이면 한 번만 실행")
+    args = parser.parse_args()
+
+    run_once()
+    while args.interval > 0:
+        time.sleep(args.interval)
+        run_once()
@@ -0,0 +1,12 @@
+import fakeredis
+import pytest
+
+from app.core.redis_config import redis_manager
+
+
+@pytest.fixture
+def fake_redis(monkeypatch):
+    """작업 큐가 사용하는 Redis 클라이언트를 메모리 fakeredis로 교체"""
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(redis_manager, "get_client", lambda: client)
+    return client
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from app.utils.cutout_cache import ForegroundCutoutCache
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("CUTOUT_CACHE_ENABLED", "true")
+    return ForegroundCutoutCache(cache_dir=tmp_path / "cutouts")
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "result.png"
+    path.write_bytes(b"fitting result")
+    return str(path)
+
+
+def _touch(path: str, mtime_ns: int):
+    os.utime(path, ns=(mtime_ns, mtime_ns))
+
+
+def test_get_returns_stored_foreground(cache, source):
+    cache.put(1, source, "u2net", b"foreground")
+
+    assert cache.get(1, source, "u2net") == b"foreground"
+
+
+def test_miss_for_other_fitting_or_model(cache, source):
+    cache.put(1, source, "u2net", b"foreground")
+
+    assert cache.get(2, source, "u2net") is None
+    assert cache.get(1, source, "isnet-general-use") is None
+    assert cache.get(None, source, "u2net") is None
+
+
+def test_preview_size_is_kept_separately(cache, source):
+    cache.put(1, source, "u2net", b"full")
+    cache.put(1, source, "u2net", b"preview", max_size=512)
+
+    assert cache.get(1, source, "u2net") == b"full"
+    assert cache.get(1, source, "u2net", max_size=512) == b"preview"
+    assert cache.get(1, source, "u2net", max_size=1024) is None
+
+
+def test_changed_source_misses_and_put_removes_stale_entries(cache, source):
+    _touch(source, 1_000_000_000_000_000_000)
+    cache.put(1, source, "u2net", b"old")
+    cache.put(1, source, "u2net", b"old preview", max_size=512)
+
+    # 원본이 덮어써지면 서명이 바뀌어 이전 전경은 쓰이지 않음
+    _touch(source, 1_000_000_001_000_000_000)
+    assert cache.get(1, source, "u2net") is None
+
+    cache.put(1, source, "u2net", b"new")
+
+    assert cache.get(1, source, "u2net") == b"new"
+    assert len(list(cache._entry_dir(1).glob("*.png"))) == 1
+
+
+def test_missing_source_is_not_cached(cache, tmp_path):
+    missing = str(tmp_path / "missing.png")
+    cache.put(1, missing, "u2net", b"foreground")
+
+    assert cache.get(1, missing, "u2net") is None
+    assert not cache.cache_dir.exists()
+
+
+def test_invalidate_removes_only_that_fitting(cache, source):
+    cache.put(1, source, "u2net", b"one")
+    cache.put(2, source, "u2net", b"two")
+
+    cache.invalidate(1)
+    cache.invalidate(3)
+
+    assert cache.get(1, source, "u2net") is None
+    assert cache.get(2, source, "u2net") == b"two"
+
+
+def test_disabled_cache_stores_nothing(tmp_path, source, monkeypatch):
+    monkeypatch.setenv("CUTOUT_CACHE_ENABLED", "false")
+    cache = ForegroundCutoutCache(cache_dir=tmp_path / "cutouts")
+
+    cache.put(1, source, "u2net", b"foreground")
+
+    assert cache.get(1, source, "u2net") is None
+    assert not cache.cache_dir.exists()
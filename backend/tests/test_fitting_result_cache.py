@@ -0,0 +1,117 @@
+import os
+from pathlib import Path
+
+import pytest
+
+from app.utils.fitting_result_cache import FittingResultCache
+
+PARAMS = {"category": "upperbody", "samples": 2, "steps": 20, "scale": 2.0, "seed": 42}
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setenv("FITTING_CACHE_ENABLED", "true")
+    cache = FittingResultCache(cache_dir=tmp_path / "cache", max_bytes=10 * 1024 * 1024)
+    cache.result_dir = tmp_path / "results"
+    cache.result_dir.mkdir()
+    return cache
+
+
+def _write(path: Path, data: bytes) -> str:
+    path.write_bytes(data)
+    return str(path)
+
+
+def _copied(cache, result_path: str) -> Path:
+    return cache.result_dir / Path(result_path).name
+
+
+def test_make_key_depends_on_content_and_params(cache, tmp_path):
+    person = _write(tmp_path / "person.png", b"person")
+    cloth = _write(tmp_path / "cloth.png", b"cloth")
+
+    key = cache.make_key("ootd", [person, cloth], PARAMS)
+
+    assert key == cache.make_key("ootd", [person, cloth], dict(reversed(list(PARAMS.items()))))
+    assert key != cache.make_key("ootd", [person, cloth], {**PARAMS, "seed": 7})
+    assert key != cache.make_key("gradio", [person, cloth], PARAMS)
+    assert key != cache.make_key("ootd", [cloth, person], PARAMS)
+
+    # 같은 경로라도 내용이 바뀌면 다른 키
+    _write(tmp_path / "cloth.png", b"cloth v2")
+    assert key != cache.make_key("ootd", [person, cloth], PARAMS)
+
+
+def test_make_key_is_none_for_missing_input_or_disabled(cache, tmp_path, monkeypatch):
+    person = _write(tmp_path / "person.png", b"person")
+
+    assert cache.make_key("ootd", [person, str(tmp_path / "missing.png")], PARAMS) is None
+
+    # URL과 빈 입력은 파일을 읽지 않고 키에 포함
+    assert cache.make_key("ootd", [person, "https://example.com/cloth.png", None], PARAMS) is not None
+
+    monkeypatch.setenv("FITTING_CACHE_ENABLED", "false")
+    disabled = FittingResultCache(cache_dir=tmp_path / "disabled")
+    assert disabled.make_key("ootd", [person], PARAMS) is None
+
+
+def test_put_then_get_returns_fresh_copies(cache, tmp_path):
+    results = [_write(tmp_path / "r0.png", b"result-0"), _write(tmp_path / "r1.png", b"result-1")]
+
+    cache.put("abc123", results)
+    first = cache.get("abc123")
+    second = cache.get("abc123")
+
+    assert len(first) == 2
+    assert all(p.startswith("uploads/virtual_fitting_results/") for p in first)
+    assert [_copied(cache, p).read_bytes() for p in first] == [b"result-0", b"result-1"]
+    # 결과는 선택/취소 시 삭제되므로 매번 다른 파일
+    assert set(first).isdisjoint(second)
+
+    # 원본 결과가 지워져도 캐시는 유지됨
+    os.remove(results[0])
+    assert _copied(cache, cache.get("abc123")[0]).read_bytes() == b"result-0"
+
+
+def test_get_miss_returns_none(cache):
+    assert cache.get("missing") is None
+    assert cache.get(None) is None
+
+
+def test_put_keeps_existing_entry(cache, tmp_path):
+    cache.put("abc123", [_write(tmp_path / "old.png", b"old")])
+    cache.put("abc123", [_write(tmp_path / "new.png", b"new")])
+
+    assert _copied(cache, cache.get("abc123")[0]).read_bytes() == b"old"
+
+
+def test_put_with_missing_result_leaves_no_entry(cache, tmp_path):
+    cache.put("abc123", [str(tmp_path / "missing.png")])
+
+    assert cache.get("abc123") is None
+    assert list(cache.cache_dir.iterdir()) == []
+
+
+def test_corrupt_entry_is_dropped(cache, tmp_path):
+    cache.put("abc123", [_write(tmp_path / "r0.png", b"result-0")])
+    (cache.cache_dir / "abc123" / "manifest.json").write_text("{not json")
+
+    assert cache.get("abc123") is None
+    assert not (cache.cache_dir / "abc123").exists()
+
+
+def test_evict_removes_least_recently_used_entry(cache, tmp_path):
+    payload = b"x" * 1000
+    for key in ("old", "used", "new"):
+        cache.put(key, [_write(tmp_path / f"{key}.png", payload)])
+    for age, key in enumerate(("new", "old", "used")):
+        stamp = 1_000_000 - age * 100
+        os.utime(cache.cache_dir / key, (stamp, stamp))
+
+    # 오래된 항목이라도 읽으면 최근 사용으로 갱신됨
+    cache.get("used")
+    cache.max_bytes = 2500
+    cache.evict()
+
+    assert sorted(p.name for p in cache.cache_dir.iterdir()) == ["new", "used"]
+
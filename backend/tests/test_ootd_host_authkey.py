@@ -0,0 +1,27 @@
+import os
+import stat
+
+from app.utils.ootd_model_host import load_authkey
+
+
+def test_workers_share_generated_key_file(tmp_path, monkeypatch):
+    monkeypatch.delenv("OOTD_HOST_AUTHKEY", raising=False)
+    key_file = tmp_path / "authkey"
+
+    first = load_authkey(key_file)
+    # 두 번째 워커는 환경변수를 물려받지 않아도 같은 파일에서 같은 키를 읽음
+    monkeypatch.delenv("OOTD_HOST_AUTHKEY", raising=False)
+    second = load_authkey(key_file)
+
+    assert first == second
+    assert len(first) == 64
+    assert stat.S_IMODE(os.stat(key_file).st_mode) == 0o600
+    assert list(tmp_path.iterdir()) == [key_file]
+
+
+def test_configured_key_wins_over_key_file(tmp_path, monkeypatch):
+    monkeypatch.setenv("OOTD_HOST_AUTHKEY", "configured")
+    key_file = tmp_path / "authkey"
+
+    assert load_authkey(key_file) == b"configured"
+    assert not key_file.exists()
@@ -0,0 +1,103 @@
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import Column, DateTime, Integer, MetaData, Table, create_engine, select
+
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter, next_cursor
+
+SORT_KEY = "feeds:created_at:desc"
+
+
+@pytest.fixture
+def feeds():
+    engine = create_engine("sqlite://")
+    metadata = MetaData()
+    table = Table(
+        "feeds",
+        metadata,
+        Column("feed_id", Integer, primary_key=True),
+        Column("created_at", DateTime, nullable=False),
+    )
+    metadata.create_all(engine)
+    base = datetime(2024, 1, 1, 12, 0, 0)
+    # 같은 created_at이 여러 개인 경우(동점)도 포함
+    rows = [{"feed_id": i, "created_at": base + timedelta(minutes=i // 3)} for i in range(1, 23)]
+    with engine.begin() as conn:
+        conn.execute(table.insert(), rows)
+    return engine, table
+
+
+def _all_pages(engine, table, descending, limit):
+    columns = [table.c.created_at, table.c.feed_id]
+    order = [c.desc() for c in columns] if descending else [c.asc() for c in columns]
+    pages, cursor = [], None
+    with engine.connect() as conn:
+        while True:
+            query = select(table).order_by(*order).limit(limit)
+            values = decode_cursor(cursor, SORT_KEY)
+            if values:
+                query = query.where(keyset_filter(columns, values, descending))
+            items = [row._mapping for row in conn.execute(query)]
+            if items:
+                pages.append([item["feed_id"] for item in items])
+            cursor = next_cursor(items, limit, SORT_KEY, ["created_at", "feed_id"])
+            if cursor is None:
+                return pages
+
+
+def test_cursor_round_trip_keeps_datetime():
+    created_at = datetime(2024, 5, 6, 7, 8, 9, 123456)
+    cursor = encode_cursor(SORT_KEY, [created_at, 42])
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor, SORT_KEY) == [created_at, 42]
+
+
+def test_empty_cursor_means_first_page():
+    assert decode_cursor(None, SORT_KEY) is None
+    assert decode_cursor("", SORT_KEY) is None
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-a-cursor!!",
+        encode_cursor("feeds:like_count:desc", [3, 1]),
+        encode_cursor(SORT_KEY, [None, 1]),
+    ],
+)
+def test_invalid_cursor_raises_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, SORT_KEY)
+
+
+@pytest.mark.parametrize("descending", [True, False])
+@pytest.mark.parametrize("limit", [1, 4, 5, 22])
+def test_keyset_pages_cover_every_row_once(feeds, descending, limit):
+    engine, table = feeds
+    pages = _all_pages(engine, table, descending, limit)
+
+    seen = [feed_id for page in pages for feed_id in page]
+    expected = list(range(22, 0, -1)) if descending else list(range(1, 23))
+    assert seen == expected
+    assert all(len(page) == limit for page in pages[:-1])
+
+
+def test_next_cursor_is_none_for_short_page():
+    items = [{"created_at": datetime(2024, 1, 1), "feed_id": 1}]
+
+    assert next_cursor(items, 2, SORT_KEY, ["created_at", "feed_id"]) is None
+    assert next_cursor([], 2, SORT_KEY, ["created_at", "feed_id"]) is None
+
+
+def test_next_cursor_accepts_dicts_and_objects():
+    created_at = datetime(2024, 1, 1, 9, 30)
+    as_dict = {"created_at": created_at, "feed_id": 7}
+    as_object = SimpleNamespace(created_at=created_at, feed_id=7)
+
+    from_dict = next_cursor([as_dict], 1, SORT_KEY, ["created_at", "feed_id"])
+    from_object = next_cursor([as_object], 1, SORT_KEY, ["created_at", "feed_id"])
+
+    assert from_dict == from_object
+    assert decode_cursor(from_dict, SORT_KEY) == [created_at, 7]
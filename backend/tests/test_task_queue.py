@@ -0,0 +1,116 @@
+import json
+import time
+
+import pytest
+
+from app.core import task_queue as task_queue_module
+from app.core.task_queue import TaskQueue
+
+
+@pytest.fixture
+def queue(fake_redis):
+    queue = TaskQueue("test_queue")
+    queue.reliable = True
+    return queue
+
+
+def _take(queue, task_type="virtual_fitting", data=None):
+    task_id = queue.enqueue_task(task_type, data or {"process_id": 1, "user_id": 1})
+    task = queue.dequeue_task(timeout=1, task_types=[task_type])
+    assert task["id"] == task_id
+    return task
+
+
+def _expire(fake_redis, queue, task_id):
+    fake_redis.zadd(queue.lease_key, {task_id: time.time() - 1})
+
+
+def test_dequeue_moves_task_to_processing_with_lease(queue, fake_redis):
+    task = _take(queue)
+
+    assert fake_redis.llen(queue.sub_queue_name("virtual_fitting")) == 0
+    assert fake_redis.llen(queue.processing_list) == 1
+    assert fake_redis.zscore(queue.lease_key, task["id"]) > time.time()
+    assert queue.get_task_status(task["id"])["status"] == "PROCESSING"
+
+
+def test_heartbeat_extends_live_lease(queue, fake_redis):
+    task = _take(queue)
+    _expire(fake_redis, queue, task["id"])
+
+    queue.heartbeat([task["id"]])
+
+    assert fake_redis.zscore(queue.lease_key, task["id"]) > time.time()
+    assert queue.reap_expired() == []
+    assert fake_redis.llen(queue.processing_list) == 1
+
+
+def test_heartbeat_does_not_revive_acked_task(queue, fake_redis):
+    task = _take(queue)
+    queue.ack_task(task["id"])
+
+    queue.heartbeat([task["id"]])
+
+    assert fake_redis.zscore(queue.lease_key, task["id"]) is None
+    assert fake_redis.llen(queue.processing_list) == 0
+    assert fake_redis.hget(queue.inflight_key, task["id"]) is None
+
+
+def test_reap_requeues_expired_task(queue, fake_redis):
+    task = _take(queue)
+    _expire(fake_redis, queue, task["id"])
+
+    assert queue.reap_expired() == []
+
+    # 처리 중 목록/리스에서 빠지고 시도 횟수가 늘어난 채 서브 큐로 돌아감
+    assert fake_redis.llen(queue.processing_list) == 0
+    assert fake_redis.zscore(queue.lease_key, task["id"]) is None
+    requeued = json.loads(fake_redis.lindex(queue.sub_queue_name("virtual_fitting"), 0))
+    assert requeued["id"] == task["id"]
+    assert requeued["attempts"] == 1
+    status = queue.get_task_status(task["id"])
+    assert status["status"] == "QUEUED"
+    assert status["attempts"] == 1
+
+    # 재전달된 작업을 다시 가져갈 수 있음
+    again = queue.dequeue_task(timeout=1, task_types=["virtual_fitting"])
+    assert again["id"] == task["id"]
+    assert queue.get_task_status(task["id"])["attempts"] == 2
+
+
+def test_reap_fails_task_after_max_attempts(queue, fake_redis, monkeypatch):
+    monkeypatch.setattr(task_queue_module, "MAX_ATTEMPTS", 2)
+    task = _take(queue)
+    _expire(fake_redis, queue, task["id"])
+    queue.reap_expired()
+
+    queue.dequeue_task(timeout=1, task_types=["virtual_fitting"])
+    _expire(fake_redis, queue, task["id"])
+    dead = queue.reap_expired()
+
+    assert [t["id"] for t in dead] == [task["id"]]
+    assert dead[0]["attempts"] == 2
+    assert fake_redis.llen(queue.sub_queue_name("virtual_fitting")) == 0
+    assert fake_redis.llen(queue.processing_list) == 0
+    assert queue.get_task_status(task["id"])["status"] == "FAILED"
+
+
+def test_reap_gives_grace_lease_to_task_without_lease(queue, fake_redis):
+    task = _take(queue)
+    # 처리 중 목록으로 옮긴 직후 리스를 받기 전에 워커가 죽은 경우
+    fake_redis.zrem(queue.lease_key, task["id"])
+
+    assert queue.reap_expired() == []
+
+    assert fake_redis.llen(queue.processing_list) == 1
+    assert fake_redis.zscore(queue.lease_key, task["id"]) > time.time()
+
+
+def test_reap_is_not_repeated_by_second_reaper(queue, fake_redis):
+    task = _take(queue)
+    _expire(fake_redis, queue, task["id"])
+
+    queue.reap_expired()
+    queue.reap_expired()
+
+    assert fake_redis.llen(queue.sub_queue_name("virtual_fitting")) == 1
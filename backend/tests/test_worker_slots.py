@@ -0,0 +1,82 @@
+import os
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+from app.core.task_queue import task_queue
+from app.workers import virtual_fitting_worker
+from app.workers.virtual_fitting_worker import VirtualFittingWorker
+
+
+@pytest.fixture
+def worker(monkeypatch, fake_redis):
+    monkeypatch.setattr(VirtualFittingWorker, "setup_signal_handlers", lambda self: None)
+    monkeypatch.setattr(
+        virtual_fitting_worker, "load_slot_config",
+        lambda: {"virtual_fitting": {"mode": "process", "slots": 1}}
+    )
+    failed_processes = []
+    monkeypatch.setattr(
+        virtual_fitting_worker, "mark_process_failed",
+        lambda process_id, message: failed_processes.append(process_id)
+    )
+
+    worker = VirtualFittingWorker()
+    worker.failed_processes = failed_processes
+    worker._create_executors()
+    yield worker
+    for executor in worker.executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _kill_slot(worker):
+    """슬롯 프로세스를 강제 종료해 실행기를 망가뜨림"""
+    executor = worker.executors["virtual_fitting"]
+    with pytest.raises(BrokenProcessPool):
+        executor.submit(os._exit, 1).result(timeout=60)
+    return executor
+
+
+def _dequeued_task(process_id=1):
+    task_queue.enqueue_task("virtual_fitting", {"process_id": process_id, "user_id": 1})
+    return task_queue.dequeue_task(timeout=1, task_types=["virtual_fitting"])
+
+
+def test_submit_to_broken_pool_requeues_and_recovers(worker, fake_redis):
+    broken = _kill_slot(worker)
+    task = _dequeued_task()
+
+    worker._submit(task)
+
+    # 슬롯/리스 상태가 원래대로 돌아오고 작업은 시작 전 상태로 큐에 다시 들어감
+    assert worker.active["virtual_fitting"] == 0
+    assert worker.inflight == {}
+    assert worker._free_task_types() == ["virtual_fitting"]
+    assert task_queue.get_task_status(task["id"])["status"] == "QUEUED"
+    assert fake_redis.llen(task_queue.sub_queue_name("virtual_fitting")) == 1
+    assert fake_redis.llen(task_queue.processing_list) == 0
+
+    # 새 실행기로 교체되어 다시 작업을 받을 수 있음
+    assert worker.executors["virtual_fitting"] is not broken
+    assert worker.executors["virtual_fitting"].submit(pow, 2, 3).result(timeout=60) == 8
+
+
+def test_slot_crash_during_task_fails_task_and_recovers(worker, fake_redis):
+    broken = _kill_slot(worker)
+    task = _dequeued_task(process_id=7)
+    with worker._lock:
+        worker.active["virtual_fitting"] += 1
+        worker.inflight[task["id"]] = task
+
+    future = Future()
+    future.set_exception(BrokenProcessPool("slot died"))
+    worker._on_task_done(task, future, broken)
+
+    assert worker.active["virtual_fitting"] == 0
+    assert worker.inflight == {}
+    assert task_queue.get_task_status(task["id"])["status"] == "FAILED"
+    assert worker.failed_processes == [7]
+    assert fake_redis.llen(task_queue.processing_list) == 0
+    assert worker.executors["virtual_fitting"] is not broken
+    assert worker.executors["virtual_fitting"].submit(pow, 2, 3).result(timeout=60) == 8
@@ -27,6 +27,26 @@ export const processBackgroundCustom = async (fittingId, backgroundFile) => {
   }
 };
 
+// 배경 커스텀 작업 완료 대기 (작업 큐에서 처리, 완료/실패할 때까지 상태 조회)
+export const waitForBackgroundCustomJob = async (taskId, { interval = 1000, timeout = 180000 } = {}) => {
+  const startedAt = Date.now();
+  while (Date.now() - startedAt < timeout) {
+    const response = await axios.get(
+      `${API_BASE_URL}/api/background-custom/jobs/${taskId}`,
+      { withCredentials: true }
+    );
+    const job = response.data;
+    if (job.status === 'COMPLETED') {
+      return job;
+    }
+    if (job.status === 'FAILED') {
+      throw new Error(job.error || '배경 커스텀 처리에 실패했습니다.');
+    }
+    await new Promise((resolve) => setTimeout(resolve, interval));
+  }
+  throw new Error('배경 커스텀 처리 시간이 초과되었습니다.');
+};
+
 // 배경 커스텀 결과 이미지 조회
 export const getCustomResultImage = async (customFittingId) => {
   try {
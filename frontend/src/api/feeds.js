@@ -385,11 +385,15 @@ export const getCommentReplies = async (feedId, commentId, params = {}) => {
  */
 export const getMyFeeds = async (params = {}) => {
   try {
-    const { page = 1, size = 10 } = params
+    const { page = 1, size = 10, cursor } = params
     const queryParams = new URLSearchParams({
       page: page.toString(),
       size: size.toString(),
     })
+    // 다음 페이지는 응답의 next_cursor로 요청 (keyset 조회)
+    if (cursor) {
+      queryParams.append("cursor", cursor)
+    }
 
     console.log("📤 getMyFeeds 요청:", {
       url: `/my-feeds?${queryParams}`,
@@ -53,6 +53,35 @@ export const getFittingStatus = async (processId) => {
   }
 }
 
+// 가상 피팅 상태 스트림 구독 (SSE, 상태가 바뀔 때만 수신) - 반환값: 구독 해제 함수
+export const subscribeFittingStatus = (processId, { onStatus, onProgress, onError } = {}) => {
+  const source = new EventSource(`${API_BASE_URL}/api/virtual-fitting-redis/status/${processId}/stream`, {
+    withCredentials: true,
+  })
+
+  source.addEventListener("status", (event) => {
+    const data = JSON.parse(event.data)
+    // 완료/실패 후에는 서버가 스트림을 닫으므로 자동 재연결하지 않도록 직접 종료
+    if (data.status === "COMPLETED" || data.status === "FAILED") {
+      source.close()
+    }
+    onStatus?.(data)
+  })
+
+  source.addEventListener("progress", (event) => {
+    onProgress?.(JSON.parse(event.data))
+  })
+
+  source.onerror = () => {
+    // 재연결 중(CONNECTING)에는 브라우저가 알아서 다시 연결, 인증 실패 등으로 닫힌 경우만 알림
+    if (source.readyState === EventSource.CLOSED) {
+      onError?.()
+    }
+  }
+
+  return () => source.close()
+}
+
 // 사용자의 프로세스 목록 조회 (백엔드에 이미 구현됨)
 export const getUserFittingProcesses = async (status = null, page = 1, perPage = 20) => {
   try {
@@ -2,6 +2,7 @@ import React, { useState, useEffect, useRef } from 'react';
 import { useParams, useNavigate, useSearchParams } from 'react-router-dom';
 import axios from 'axios';
 import { isLoggedIn } from '../../api/auth';
+import { waitForBackgroundCustomJob } from '../../api/backgroundCustomAPI';
 import Header from '../../components/Header/Header';
 import Footer from '../../components/Footer/Footer';
 import styles from './BackgroundCustomPage.module.css';
@@ -245,8 +246,9 @@ const BackgroundCustomPage = () => {
       });
 
       if (response.data.success) {
-        // Base64 데이터 URL을 직접 사용
-        setPreviewImage(response.data.image_url);
+        // 서버에 잠시 보관되는 축소 미리보기 이미지 URL
+        const previewUrl = response.data.image_url;
+        setPreviewImage(previewUrl.startsWith('data:') ? previewUrl : `${API_BASE_URL}${previewUrl}`);
         
         // 성공 메시지
         console.log('미리보기 생성 완료:', response.data.message);
@@ -347,8 +349,9 @@ const BackgroundCustomPage = () => {
       });
 
       if (response.data.success) {
-        // Base64 데이터 URL을 직접 사용
-        setPreviewImage(response.data.image_url);
+        // 서버에 잠시 보관되는 축소 미리보기 이미지 URL
+        const previewUrl = response.data.image_url;
+        setPreviewImage(previewUrl.startsWith('data:') ? previewUrl : `${API_BASE_URL}${previewUrl}`);
       } else {
         setError(response.data.message || '미리보기 생성 중 오류가 발생했습니다.');
       }
@@ -422,6 +425,11 @@ const BackgroundCustomPage = () => {
         withCredentials: true,
       });
 
+        // 작업 큐에 등록된 경우 워커 처리가 끝날 때까지 대기
+        if (response.data.success && response.data.status === 'QUEUED') {
+          await waitForBackgroundCustomJob(response.data.task_id);
+        }
+
         if (response.data.success) {
           alert('배경 커스텀이 완료되었습니다!');
           
@@ -14,7 +14,8 @@ import {
   cancelFittingProcess,
   deleteFittingResult,
   getProcessImageUrl,
-  getFittingResultImageUrl
+  getFittingResultImageUrl,
+  subscribeFittingStatus
 } from "../../api/virtual_fitting"
 import styles from "./VirtualFittingMainPage.module.css"
 
@@ -37,6 +38,9 @@ const VirtualFittingMainPage = () => {
   // 자동 새로고침을 위한 ref
   const intervalRef = useRef(null)
   const hasActiveProcesses = useRef(false)
+  // 진행 중 프로세스별 상태 스트림 구독 해제 함수 (process_id -> close)
+  const streamsRef = useRef({})
+  const canStream = typeof window !== 'undefined' && typeof window.EventSource !== 'undefined'
 
   // 데이터 로드 함수 (useCallback으로 메모이제이션)
   const loadData = useCallback(async (showRefreshing = false) => {
@@ -146,9 +150,55 @@ const VirtualFittingMainPage = () => {
     }
   }, [searchParams, setSearchParams, loadData])
 
-  // 자동 새로고침 설정 (allProcesses가 변경될 때만)
+  // 진행 중 프로세스 상태 스트림 구독 (폴링 대신 상태가 바뀔 때만 갱신, 완료/실패 시 목록 새로고침)
   useEffect(() => {
-    if (hasActiveProcesses.current) {
+    if (!canStream) return
+
+    const activeIds = allProcesses
+      .filter(p => p.status === 'PROCESSING' || p.status === 'QUEUED')
+      .map(p => p.process_id)
+
+    // 더 이상 진행 중이 아닌 프로세스의 스트림 정리
+    Object.keys(streamsRef.current).forEach(id => {
+      if (!activeIds.includes(Number(id))) {
+        streamsRef.current[id]()
+        delete streamsRef.current[id]
+      }
+    })
+
+    const updateStatus = (processId, status) => {
+      setAllProcesses(prev => prev.map(p => (
+        p.process_id === processId ? { ...p, status } : p
+      )))
+    }
+
+    activeIds.forEach(processId => {
+      if (streamsRef.current[processId]) return
+      streamsRef.current[processId] = subscribeFittingStatus(processId, {
+        onStatus: (data) => {
+          if (data.status === 'COMPLETED' || data.status === 'FAILED') {
+            // 결과 이미지/저장 목록/큐 정보까지 함께 갱신
+            loadData()
+          } else if (data.status) {
+            updateStatus(processId, data.status)
+          }
+        },
+        onProgress: (data) => updateStatus(processId, data.status || 'PROCESSING'),
+        // 스트림을 쓸 수 없으면 기존 주기 새로고침으로 대체
+        onError: () => setupAutoRefresh(),
+      })
+    })
+  }, [allProcesses, canStream, loadData, setupAutoRefresh])
+
+  // 언마운트 시 스트림 정리
+  useEffect(() => () => {
+    Object.values(streamsRef.current).forEach(close => close())
+    streamsRef.current = {}
+  }, [])
+
+  // 자동 새로고침 설정 (스트림을 지원하지 않는 브라우저만)
+  useEffect(() => {
+    if (hasActiveProcesses.current && !canStream) {
       setupAutoRefresh()
     }
 
@@ -158,7 +208,7 @@ const VirtualFittingMainPage = () => {
         clearInterval(intervalRef.current)
       }
     }
-  }, [setupAutoRefresh])
+  }, [setupAutoRefresh, canStream])
 
   // 새로운 가상 피팅 시작
   const handleStartNewFitting = () => {
@@ -192,8 +242,8 @@ const VirtualFittingMainPage = () => {
       // 즉시 데이터 새로고침 (큐 정보 포함)
       await loadData()
       
-      // 자동 새로고침 재설정
-      setupAutoRefresh()
+      // 자동 새로고침 재설정 (스트림을 쓰면 목록 변경 시 자동으로 다시 구독)
+      if (!canStream) setupAutoRefresh()
       
       alert('작업이 취소되었습니다.')
       
@@ -206,7 +256,7 @@ const VirtualFittingMainPage = () => {
   // 수동 새로고침
   const handleManualRefresh = async () => {
     await loadData(true)
-    setupAutoRefresh() // 자동 새로고침 재설정
+    if (!canStream) setupAutoRefresh() // 자동 새로고침 재설정
   }
 
   // 상태별 아이콘 렌더링